@@ -1,12 +1,29 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sqlite3
 import time
 import functools
+import atexit
+import base64
+import hashlib
+import heapq
 import os
+import queue
+import re
 import threading
+import traceback
+import uuid
 import json
-from datetime import datetime, date, timedelta
-from flask import Flask, render_template, jsonify, request, send_from_directory, redirect
+import logging
+import logging.handlers
+import math
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta, timezone
+from urllib.parse import urlsplit
+from flask import Flask, Response, render_template, jsonify, request, send_from_directory, redirect
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from webauthn import (
@@ -29,18 +46,149 @@ from webauthn.helpers.structs import (
     ResidentKeyRequirement,
 )
 from webauthn.helpers.cose import COSEAlgorithmIdentifier
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to Flask's stdlib JSON encoder
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    ZoneInfo = None  # Python < 3.9: timezone names can't be validated
+
+try:
+    import ijson
+except ImportError:
+    ijson = None  # SimpleFin account lists are parsed in one go instead of streamed
 
 app = Flask(__name__)
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0  # Never cache static files — forces browser/SW to always get fresh JS/CSS
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson so every jsonify() call serializes straight to bytes"""
+    # Dates keep Flask's formatting; anything orjson can't handle goes through Flask's default hook
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Same argument handling as jsonify(), without relying on Flask's private _prepare_response_obj
+        if args and kwargs:
+            raise TypeError("jsonify() behavior undefined when passed both args and kwargs")
+        obj = args[0] if len(args) == 1 else (list(args) if args else kwargs or None)
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=self.options),
+                                        mimetype=self.mimetype)
+
+if orjson:
+    app.json = OrjsonProvider(app)
+
 # --- CONFIGURATION ---
 URL = "https://api.trycrew.com/willow/graphql"
+CREW_TIMEOUT = 30  # seconds; bounds how long a request thread can wait on Crew
+
+# Small pool for overlapping independent Crew round trips within one request
+crew_io_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="crew-io")
+
+# Shared HTTP session for Crew, LunchFlow, SimpleFin and Splitwise: keeps TLS connections alive per host
+# instead of a fresh handshake on every call. Retries only cover idempotent methods (never transfers/POSTs).
+# pool_maxsize covers the sync workers plus crew_io_executor hitting the same host at once without discarding sockets.
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32,
+                                           max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504],
+                                                             raise_on_status=False)))
+
+def decode_json_response(response):
+    """Parse a JSON response body with orjson when installed (SimpleFin transaction payloads get large)"""
+    return orjson.loads(response.content) if orjson else response.json()
+
+def encode_json(obj):
+    """Serialize a value for a TEXT column, with orjson when installed"""
+    return orjson.dumps(obj).decode() if orjson else json.dumps(obj)
+
+def decode_json(text):
+    """Parse JSON text from SQLite (a TEXT column or json_group_array result), with orjson when installed"""
+    return orjson.loads(text) if orjson else json.loads(text)
 # In app.py
 DB_FILE = os.environ.get("DB_FILE", "savings_data.db")
 
+# Per-connection tuning (journal_mode=WAL is persistent and set once in init_db)
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",  # Safe under WAL: fsync at checkpoints instead of every commit
+    "PRAGMA busy_timeout=30000",  # Wait for the writer instead of failing with "database is locked"
+    "PRAGMA cache_size=-65536",  # 64 MB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA journal_size_limit=67108864",  # Truncate the WAL back to 64 MB after checkpoints instead of letting it grow
+)
+
+SQLITE_CACHED_STATEMENTS = 256  # Per-connection prepared-statement cache (sqlite3 default is 128)
+
+def db_connect(**kwargs):
+    """Open a SQLite connection with the app's PRAGMAs applied"""
+    kwargs.setdefault("cached_statements", SQLITE_CACHED_STATEMENTS)
+    conn = sqlite3.connect(DB_FILE, **kwargs)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+class SQLitePool:
+    """Reusable connections shared across request threads. Connections are opened lazily up to `size`;
+    under WAL any of them can read while one writes (busy_timeout serializes concurrent writers).
+    read_only pools set PRAGMA query_only so a reader handle can never take the write lock."""
+    def __init__(self, size=8, read_only=False, acquire_timeout=30):
+        self.size = size
+        self.acquire_timeout = acquire_timeout  # seconds to wait for a connection once all `size` are in use
+        self.read_only = read_only
+        self.idle = queue.Queue()
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self):
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                can_open = self.opened < self.size
+                if can_open:
+                    self.opened += 1
+            if can_open:
+                conn = None
+                try:
+                    conn = db_connect(check_same_thread=False)
+                    if self.read_only:
+                        conn.execute("PRAGMA query_only=ON")
+                except Exception:
+                    # Give the slot back, or enough failed opens would leave every caller waiting on idle forever
+                    if conn is not None:
+                        conn.close()
+                    with self.lock:
+                        self.opened -= 1
+                    raise
+            else:
+                try:
+                    conn = self.idle.get(timeout=self.acquire_timeout)
+                except queue.Empty:
+                    raise RuntimeError(f"Timed out after {self.acquire_timeout}s waiting for a database connection") from None
+        try:
+            yield conn
+        finally:
+            # Never hand the next caller a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+            self.idle.put(conn)
+
+db_pool = SQLitePool()
+db_read_pool = SQLitePool(size=4, read_only=True)  # For read-only API handlers polled while the sync writes
+
 def get_or_create_secret_key():
     """Get secret key from database, or generate and save a new one"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
 
     # Create app_config table if it doesn't exist
@@ -82,7 +230,7 @@ class User(UserMixin):
 @login_manager.user_loader
 def load_user(user_id):
     """Load user from database for Flask-Login session"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("SELECT id, username, email FROM users WHERE id = ?", (user_id,))
     row = c.fetchone()
@@ -95,6 +243,14 @@ def load_user(user_id):
 RP_ID = os.environ.get('RP_ID', 'localhost')  # Relying Party ID (your domain)
 RP_NAME = "SimpleCrew"
 ORIGIN = os.environ.get('ORIGIN', 'http://localhost:8080')
+WEBAUTHN_ORIGIN_SCHEMES = ('http', 'https')
+
+def parse_webauthn_origin(origin):
+    """Split an origin URL once; returns None unless it is http(s) with a host"""
+    parsed = urlsplit(origin)
+    if parsed.scheme not in WEBAUTHN_ORIGIN_SCHEMES or not parsed.hostname:
+        return None
+    return parsed
 
 # Global flag to ensure background thread starts only once
 _background_thread_started = False
@@ -102,12 +258,35 @@ _background_thread_lock = threading.Lock()
 
 # Track last SimpleFin sync time per account (limit to once per hour per account)
 _last_simplefin_sync = {}  # Dictionary: account_id -> timestamp
+_last_simplefin_sync_loaded = False  # Seeded from simplefin_config.last_sync once per process
 _simplefin_sync_interval = 3600  # 1 hour in seconds
+# Balance each SimpleFin card's pocket was last reconciled to: (account_id, pocket_id) -> (balance, time.monotonic())
+_reconciled_pocket_balance = {}
+# Last fully processed SimpleFin batch response, so an identical response can skip the parse/DB/transfer pass
+_simplefin_batch_digest = None
+_simplefin_batch_etag = None
+POCKET_RECHECK_INTERVAL = 6 * 3600  # Re-read the pocket at least this often even if the card balance hasn't moved
+# New SimpleFin cards get their first transaction sync here instead of on the request thread
+simplefin_initial_sync_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="simplefin-initial")
+_simplefin_initial_syncs = set()  # account_ids with an initial sync queued, running or waiting to retry
+SIMPLEFIN_INITIAL_SYNC_RETRY_DELAY = 60  # seconds before the first retry of a failed initial sync (doubles each time)
+SIMPLEFIN_INITIAL_SYNC_MAX_RETRY_DELAY = 3600
+_simplefin_initial_syncs_lock = threading.Lock()
+
+# Credit card sync logging: records are buffered and written once per run (warnings and errors go out
+# immediately). LOG_LEVEL=DEBUG shows the per-account lines that are hidden by default.
+sync_logger = logging.getLogger("simplecrew.sync")
+sync_logger.setLevel(getattr(logging, os.environ.get("LOG_LEVEL", "INFO").upper(), logging.INFO))
+sync_logger.propagate = False
+_sync_log_stream = logging.StreamHandler(sys.stdout)
+_sync_log_stream.setFormatter(logging.Formatter("%(message)s"))
+sync_log_buffer = logging.handlers.MemoryHandler(capacity=200, flushLevel=logging.WARNING, target=_sync_log_stream)
+sync_logger.addHandler(sync_log_buffer)
 
 def get_simplefin_sync_interval():
     """Get the SimpleFin sync interval from database or return default"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
         c.execute("SELECT sync_interval FROM simplefin_config LIMIT 1")
         row = c.fetchone()
@@ -119,11 +298,9 @@ def get_simplefin_sync_interval():
 
 def should_sync_simplefin(account_id):
     """Check if SimpleFin account should sync now based on schedule or interval"""
-    import json
-    from datetime import datetime, timezone
 
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
         c.execute("SELECT sync_times, sync_timezone FROM simplefin_config LIMIT 1")
         row = c.fetchone()
@@ -189,13 +366,14 @@ class SimpleCache:
         self.store = {}
         self.ttl = ttl_seconds
 
-    def get(self, key):
+    def get(self, key, max_age=None):
+        """max_age (seconds) overrides the default TTL for data that goes stale faster"""
         if key in self.store:
             timestamp, data = self.store[key]
-            if time.time() - timestamp < self.ttl:
+            if time.time() - timestamp < (self.ttl if max_age is None else max_age):
                 return data
             else:
-                del self.store[key]  # Expired
+                self.store.pop(key, None)  # Expired (another thread may have dropped it already)
         return None
 
     def set(self, key, data):
@@ -204,8 +382,24 @@ class SimpleCache:
     def clear(self):
         self.store = {}
 
+    def delete(self, key):
+        """Drop one exact key (invalidate() only matches the part before the first ":")"""
+        self.store.pop(key, None)
+
+    def invalidate(self, *prefixes):
+        """Drop entries whose key is one of `prefixes` or starts with "<prefix>:" (cached() keys add ":<args>")"""
+        for key in list(self.store):
+            if key.split(":", 1)[0] in prefixes:
+                self.store.pop(key, None)
+
 cache = SimpleCache(ttl_seconds=300)
 
+# Invalidation groups for mutations that don't need to drop everything
+CC_CONFIG_CACHE_KEYS = ("cc_status",)  # Credit card tracking config shown by /api/lunchflow/credit-card-status
+# Anything derived from Crew balances or pockets, plus the serialized bodies of the ETag'd views
+POCKET_CACHE_KEYS = CC_CONFIG_CACHE_KEYS + ("financial_data", "transactions", "tx_detail", "subaccounts", "family",
+                                            "cards", "expenses", "goals", "trends", "body")
+
 def cached(key_prefix):
     """Decorator to cache function results. Supports force_refresh=True kwarg."""
     def decorator(func):
@@ -230,11 +424,41 @@ def cached(key_prefix):
         return wrapper
     return decorator
 
+def etag_cached(key_prefix):
+    """Decorator for read-only JSON views that return plain data. Keeps the serialized body
+    in the cache next to the data (so it expires and clears with it) and answers If-None-Match with 304."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = f"body:{key_prefix}"
+            entry = None if request.args.get('refresh') == 'true' else cache.get(cache_key)
+
+            if entry is None:
+                data = func(*args, **kwargs)
+                response = jsonify(data)
+                if isinstance(data, dict) and "error" in data:
+                    return response  # Never pin an error body
+                body = response.get_data()
+                entry = (body, hashlib.blake2b(body, digest_size=16).hexdigest())
+                cache.set(cache_key, entry)
+
+            body, etag = entry
+            if request.if_none_match.contains(etag):
+                response = app.response_class(status=304)
+            else:
+                response = app.response_class(body, mimetype='application/json')
+            response.set_etag(etag)
+            return response
+        return wrapper
+    return decorator
+
 
 # 1. UPDATE DATABASE SCHEMA
 def init_db():
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
+    # WAL lets readers keep going while the sync thread or a request writes
+    c.execute("PRAGMA journal_mode=WAL")
     c.execute('''CREATE TABLE IF NOT EXISTS history (date TEXT PRIMARY KEY, balance REAL)''')
     c.execute('''CREATE TABLE IF NOT EXISTS groups (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE)''')
     
@@ -251,10 +475,13 @@ def init_db():
     except sqlite3.OperationalError:
         print("Migrating DB: Adding sort_order column...")
         c.execute("ALTER TABLE pocket_links ADD COLUMN sort_order INTEGER DEFAULT 0")
+
+    # Group membership is looked up/cleared by group_id (pocket_id is already the primary key)
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_pocketlinks_group ON pocket_links(group_id)''')
     
     # SimpleFin global configuration (one access URL for all accounts)
     c.execute('''CREATE TABLE IF NOT EXISTS simplefin_config (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        id INTEGER PRIMARY KEY CHECK (id = 1),
         access_url TEXT NOT NULL,
         is_valid INTEGER DEFAULT 1,
         created_at TEXT DEFAULT CURRENT_TIMESTAMP
@@ -300,6 +527,9 @@ def init_db():
         c.execute("ALTER TABLE credit_card_config ADD COLUMN batch_mode INTEGER DEFAULT 1")
         conn.commit()
 
+    # Provider-wide lookups/deletes (e.g. SimpleFin disconnect); account_id lookups already use its UNIQUE index
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_cccfg_provider ON credit_card_config(provider)''')
+
     # Migration: Move simplefin_access_url to new simplefin_config table
     # First check if credit_card_config has the old column with data
     has_old_data = False
@@ -322,7 +552,7 @@ def init_db():
         existing_url = c.fetchone()
         if not existing_url:
             print("🔄 Migrating SimpleFin access URL to new table...", flush=True)
-            c.execute("INSERT INTO simplefin_config (access_url) VALUES (?)", (old_access_url,))
+            c.execute("INSERT INTO simplefin_config (id, access_url) VALUES (1, ?)", (old_access_url,))
             conn.commit()
             print("✅ Migrated SimpleFin access URL successfully", flush=True)
         else:
@@ -368,6 +598,14 @@ def init_db():
         c.execute("ALTER TABLE simplefin_config ADD COLUMN sync_timezone TEXT")
         conn.commit()
 
+    # Migration: Add updated_at column to simplefin_config if it doesn't exist
+    try:
+        c.execute("SELECT updated_at FROM simplefin_config LIMIT 1")
+    except sqlite3.OperationalError:
+        print("Migrating DB: Adding updated_at column to simplefin_config...")
+        c.execute("ALTER TABLE simplefin_config ADD COLUMN updated_at TEXT")
+        conn.commit()
+
     # Store seen credit card transactions to avoid duplicates
     c.execute('''CREATE TABLE IF NOT EXISTS credit_card_transactions (
         transaction_id TEXT PRIMARY KEY,
@@ -380,16 +618,23 @@ def init_db():
         created_at TEXT DEFAULT CURRENT_TIMESTAMP
     )''')
 
+    # Indexes so transaction listings are served in index order and per-account lookups avoid full scans
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_cctx_sort ON credit_card_transactions(date DESC, created_at DESC)''')
+    # account_id-first composite serves both per-account lookups and the filtered listing's ORDER BY ... LIMIT
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_cctx_account_date ON credit_card_transactions(account_id, date DESC, created_at DESC)''')
+    c.execute('''DROP INDEX IF EXISTS idx_cctx_account''')  # Superseded by idx_cctx_account_date
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_cctx_created ON credit_card_transactions(created_at)''')
+
     # Onboarding flow tables
     c.execute('''CREATE TABLE IF NOT EXISTS onboarding_config (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        id INTEGER PRIMARY KEY CHECK (id = 1),
         is_completed INTEGER DEFAULT 0,
         completed_at TEXT,
         created_at TEXT DEFAULT CURRENT_TIMESTAMP
     )''')
 
     c.execute('''CREATE TABLE IF NOT EXISTS crew_config (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        id INTEGER PRIMARY KEY CHECK (id = 1),
         bearer_token TEXT NOT NULL,
         is_valid INTEGER DEFAULT 1,
         created_at TEXT DEFAULT CURRENT_TIMESTAMP,
@@ -397,7 +642,7 @@ def init_db():
     )''')
 
     c.execute('''CREATE TABLE IF NOT EXISTS lunchflow_config (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        id INTEGER PRIMARY KEY CHECK (id = 1),
         api_key TEXT NOT NULL,
         is_valid INTEGER DEFAULT 1,
         created_at TEXT DEFAULT CURRENT_TIMESTAMP,
@@ -425,6 +670,15 @@ def init_db():
         created_at TEXT DEFAULT CURRENT_TIMESTAMP
     )''')
 
+    # Latest Splitwise friends list (refreshed whenever /get_friends is read) so get-creditors can answer from SQLite
+    c.execute('''CREATE TABLE IF NOT EXISTS splitwise_friends_cache (
+        friend_id INTEGER PRIMARY KEY,
+        first_name TEXT,
+        last_name TEXT,
+        balance REAL NOT NULL DEFAULT 0,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )''')
+
     # Track processed Splitwise expenses (deduplication by expense_id and friend_id)
     c.execute('''CREATE TABLE IF NOT EXISTS splitwise_expenses (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -477,6 +731,13 @@ def init_db():
         c.execute("ALTER TABLE splitwise_pocket_config ADD COLUMN tracked_friends TEXT")
         conn.commit()
 
+    try:
+        c.execute("SELECT last_known_balance FROM splitwise_pocket_config LIMIT 1")
+    except sqlite3.OperationalError:
+        print("Migrating DB: Adding last_known_balance column to splitwise_pocket_config...")
+        c.execute("ALTER TABLE splitwise_pocket_config ADD COLUMN last_known_balance REAL")
+        conn.commit()
+
     # Migration: Add friend_id and friend_name to splitwise_pocket_config if needed
     try:
         c.execute("SELECT friend_id FROM splitwise_pocket_config LIMIT 1")
@@ -564,11 +825,26 @@ def init_db():
         FOREIGN KEY (user_id) REFERENCES users(id)
     )''')
 
+    # Migration: Pin single-row config tables to id = 1 so writes can upsert on the primary key.
+    # Keep the row readers would have used: the first valid one where readers filter on is_valid, else the first row.
+    for table, has_is_valid in (('onboarding_config', False), ('crew_config', True),
+                                ('lunchflow_config', True), ('simplefin_config', True)):
+        if has_is_valid:
+            keep_id = f"COALESCE((SELECT MIN(id) FROM {table} WHERE is_valid = 1), (SELECT MIN(id) FROM {table}))"
+        else:
+            keep_id = f"(SELECT MIN(id) FROM {table})"
+        c.execute(f"DELETE FROM {table} WHERE id != {keep_id}")
+        c.execute(f"UPDATE {table} SET id = 1 WHERE id != 1")
+
     conn.commit()
 
     # Auto-migrate env vars to database on first run
     migrate_tokens_to_db(c, conn)
 
+    # Refresh planner statistics so the indexes above are actually chosen
+    c.execute("ANALYZE")
+    conn.commit()
+
     conn.close()
 
 def migrate_tokens_to_db(cursor, connection):
@@ -580,8 +856,9 @@ def migrate_tokens_to_db(cursor, connection):
     if not has_crew:
         bearer = os.environ.get("BEARER_TOKEN")
         if bearer:
-            cursor.execute("INSERT INTO crew_config (bearer_token) VALUES (?)", (bearer,))
-            cursor.execute("INSERT INTO onboarding_config (is_completed, completed_at) VALUES (1, CURRENT_TIMESTAMP)")
+            cursor.execute("INSERT INTO crew_config (id, bearer_token) VALUES (1, ?)", (bearer,))
+            cursor.execute("""INSERT INTO onboarding_config (id, is_completed, completed_at) VALUES (1, 1, CURRENT_TIMESTAMP)
+                              ON CONFLICT(id) DO UPDATE SET is_completed = 1, completed_at = CURRENT_TIMESTAMP""")
             print("✅ Migrated BEARER_TOKEN from env vars to database")
 
     # Check if already migrated LunchFlow API key
@@ -591,25 +868,26 @@ def migrate_tokens_to_db(cursor, connection):
     if not has_lunchflow:
         api_key = os.environ.get("LUNCHFLOW_API_KEY")
         if api_key and api_key != "none":
-            cursor.execute("INSERT INTO lunchflow_config (api_key) VALUES (?)", (api_key,))
+            cursor.execute("INSERT INTO lunchflow_config (id, api_key) VALUES (1, ?)", (api_key,))
             print("✅ Migrated LUNCHFLOW_API_KEY from env vars to database")
 
     connection.commit()
 
 def log_balance(balance):
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     today = datetime.now().strftime("%Y-%m-%d")
     try:
         c.execute("INSERT OR REPLACE INTO history (date, balance) VALUES (?, ?)", (today, balance))
         conn.commit()
+        cache.delete("body:history")  # /api/history serves a cached body
     except Exception as e:
         print(f"DB Error: {e}")
     finally:
         conn.close()
 
 def get_history():
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("SELECT date, balance FROM history ORDER BY date ASC")
     data = c.fetchall()
@@ -626,7 +904,7 @@ def generate_challenge():
 
 def get_user_credentials(user_id):
     """Get all passkey credentials for a user"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("""
         SELECT credential_id, public_key, sign_count, transports, nickname
@@ -650,7 +928,7 @@ def get_user_credentials(user_id):
 
 def save_credential(user_id, credential_data):
     """Save new passkey credential to database"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
 
     c.execute("""
@@ -673,7 +951,7 @@ def save_credential(user_id, credential_data):
 
 def update_sign_count(credential_id, new_sign_count):
     """Update sign count after successful authentication"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
 
     c.execute("""
@@ -687,7 +965,7 @@ def update_sign_count(credential_id, new_sign_count):
 
 def cleanup_expired_sessions():
     """Remove expired WebAuthn challenges"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("DELETE FROM webauthn_sessions WHERE expires_at < ?",
               (datetime.now().isoformat(),))
@@ -695,13 +973,22 @@ def cleanup_expired_sessions():
     conn.close()
 
 # --- TOKEN RETRIEVAL HELPERS ---
+# One long-lived connection serves the single-row config lookups that nearly every request makes,
+# so their pages and the parsed schema stay warm instead of reopening the database each time
+_config_conn = None
+_config_conn_lock = threading.Lock()
+
+def query_config_row(sql, params=()):
+    """Fetch one row from a config table over the shared lookup connection"""
+    global _config_conn
+    with _config_conn_lock:
+        if _config_conn is None:
+            _config_conn = db_connect(check_same_thread=False)
+        return _config_conn.execute(sql, params).fetchone()
+
 def get_crew_bearer_token():
     """Get Crew bearer token (database first, then env var fallback)"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("SELECT bearer_token FROM crew_config WHERE is_valid = 1 LIMIT 1")
-    row = c.fetchone()
-    conn.close()
+    row = query_config_row("SELECT bearer_token FROM crew_config WHERE is_valid = 1 LIMIT 1")
 
     if row and row[0]:
         return row[0]
@@ -711,11 +998,7 @@ def get_crew_bearer_token():
 
 def get_lunchflow_api_key():
     """Get LunchFlow API key (database first, then env var fallback)"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("SELECT api_key FROM lunchflow_config WHERE is_valid = 1 LIMIT 1")
-    row = c.fetchone()
-    conn.close()
+    row = query_config_row("SELECT api_key FROM lunchflow_config WHERE is_valid = 1 LIMIT 1")
 
     if row and row[0]:
         return row[0]
@@ -724,31 +1007,69 @@ def get_lunchflow_api_key():
     env_key = os.environ.get("LUNCHFLOW_API_KEY")
     return env_key if env_key and env_key != "none" else None
 
+SPLITWISE_KEY_CACHE_TTL = 30  # seconds; key writes (save-key, account update, disconnect) invalidate it sooner
+
 def get_splitwise_api_key():
-    """Get Splitwise API key from database"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("SELECT api_key FROM splitwise_config WHERE is_valid = 1 LIMIT 1")
-    row = c.fetchone()
-    conn.close()
-    return row[0] if row else None
+    """Get Splitwise API key from database (memoized briefly; most Splitwise handlers look it up more than once)"""
+    api_key = cache.get("splitwise_api_key", max_age=SPLITWISE_KEY_CACHE_TTL)
+    if api_key:
+        return api_key
+    row = query_config_row("SELECT api_key FROM splitwise_config WHERE is_valid = 1 LIMIT 1")
+    api_key = row[0] if row else None
+    if api_key:
+        cache.set("splitwise_api_key", api_key)
+    return api_key
 
 def get_splitwise_user_id():
     """Get Splitwise user ID from database"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("SELECT user_id FROM splitwise_config LIMIT 1")
-    row = c.fetchone()
-    conn.close()
+    row = query_config_row("SELECT user_id FROM splitwise_config LIMIT 1")
     return row[0] if row else None
 
+SPLITWISE_API_BASE = "https://secure.splitwise.com/api/v3.0"
+
+def splitwise_get(path, api_key, timeout=30, headers=None):
+    """GET a Splitwise API path over the shared session. The bearer token is sent per call rather than set on
+    http_session, which also talks to Crew and SimpleFin."""
+    return http_session.get(f"{SPLITWISE_API_BASE}{path}", headers={**(headers or {}), "Authorization": f"Bearer {api_key}"},
+                            timeout=timeout)
+
+SPLITWISE_FRIENDS_CACHE_TTL = 10  # seconds; the Splitwise screen polls several endpoints that all need /get_friends
+# Validators from the last full /get_friends response: (api_key, etag, last_modified, friends). Kept past the cache
+# TTL so a refresh can be a conditional GET that Splitwise answers with 304 when nothing changed.
+_splitwise_friends_validators = None
+
+def fetch_splitwise_friends(api_key, max_age=SPLITWISE_FRIENDS_CACHE_TTL):
+    """Splitwise friends list (with balances), or None if Splitwise rejects the request.
+    Reused for a few seconds across endpoints; pass max_age=0 to force a fresh read before moving money."""
+    global _splitwise_friends_validators
+    friends = cache.get("splitwise_friends", max_age=max_age)
+    if friends is not None:
+        return friends
+
+    validators = _splitwise_friends_validators
+    conditional_headers = {}
+    if validators and validators[0] == api_key:
+        if validators[1]:
+            conditional_headers["If-None-Match"] = validators[1]
+        if validators[2]:
+            conditional_headers["If-Modified-Since"] = validators[2]
+
+    response = splitwise_get("/get_friends", api_key, headers=conditional_headers)
+    if response.status_code == 304 and conditional_headers:
+        friends = validators[3]
+    elif response.status_code == 200:
+        friends = decode_json_response(response).get("friends", [])
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        _splitwise_friends_validators = (api_key, etag, last_modified, friends) if etag or last_modified else None
+    else:
+        return None
+
+    cache.set("splitwise_friends", friends)
+    return friends
+
 def get_webauthn_rp_id():
     """Get WebAuthn Relying Party ID (database first, then env var fallback)"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("SELECT rp_id FROM webauthn_config WHERE is_valid = 1 ORDER BY id DESC LIMIT 1")
-    row = c.fetchone()
-    conn.close()
+    row = query_config_row("SELECT rp_id FROM webauthn_config WHERE is_valid = 1 ORDER BY id DESC LIMIT 1")
 
     if row and row[0]:
         return row[0]
@@ -758,11 +1079,7 @@ def get_webauthn_rp_id():
 
 def get_webauthn_origin():
     """Get WebAuthn origin URL (database first, then env var fallback)"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("SELECT origin FROM webauthn_config WHERE is_valid = 1 ORDER BY id DESC LIMIT 1")
-    row = c.fetchone()
-    conn.close()
+    row = query_config_row("SELECT origin FROM webauthn_config WHERE is_valid = 1 ORDER BY id DESC LIMIT 1")
 
     if row and row[0]:
         return row[0]
@@ -772,11 +1089,7 @@ def get_webauthn_origin():
 
 def get_fcm_config():
     """Get VAPID configuration from database"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("""SELECT vapid_public_key, vapid_private_key, is_valid FROM fcm_config LIMIT 1""")
-    row = c.fetchone()
-    conn.close()
+    row = query_config_row("""SELECT vapid_public_key, vapid_private_key, is_valid FROM fcm_config LIMIT 1""")
 
     if row and row[2]:  # is_valid = 1
         return {
@@ -792,7 +1105,7 @@ def send_sync_complete_notification(user_id, transaction_count, account_names):
         return  # VAPID not configured, skip silently
 
     # Get active tokens for user
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("SELECT token FROM fcm_tokens WHERE user_id = ? AND is_active = 1", (user_id,))
     tokens = [row[0] for row in c.fetchall()]
@@ -812,7 +1125,7 @@ def send_sync_complete_notification(user_id, transaction_count, account_names):
 
     # Send via Web Push
     try:
-        from pywebpush import webpush, WebPushException
+        from pywebpush import webpush, WebPushException  # Heavy optional dependency, only needed for push sends
 
         # Build notification payload
         payload = json.dumps({
@@ -860,7 +1173,7 @@ def send_sync_complete_notification(user_id, transaction_count, account_names):
 
         # Mark invalid tokens as inactive
         if failed_tokens:
-            conn = sqlite3.connect(DB_FILE)
+            conn = db_connect()
             c = conn.cursor()
             for token in failed_tokens:
                 c.execute("UPDATE fcm_tokens SET is_active = 0 WHERE token = ?", (token,))
@@ -878,7 +1191,7 @@ def send_splitwise_notification(user_id, friends_changed):
         return  # VAPID not configured, skip silently
 
     # Get active tokens for user
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("SELECT token FROM fcm_tokens WHERE user_id = ? AND is_active = 1", (user_id,))
     tokens = [row[0] for row in c.fetchall()]
@@ -898,7 +1211,7 @@ def send_splitwise_notification(user_id, friends_changed):
 
     # Send via Web Push
     try:
-        from pywebpush import webpush, WebPushException
+        from pywebpush import webpush, WebPushException  # Heavy optional dependency, only needed for push sends
 
         payload = json.dumps({
             "notification": {
@@ -934,7 +1247,7 @@ def send_splitwise_notification(user_id, friends_changed):
 
         # Mark invalid tokens as inactive
         if failed_tokens:
-            conn = sqlite3.connect(DB_FILE)
+            conn = db_connect()
             c = conn.cursor()
             for token in failed_tokens:
                 c.execute("UPDATE fcm_tokens SET is_active = 0 WHERE token = ?", (token,))
@@ -956,21 +1269,83 @@ def get_crew_headers():
         "user-agent": "Crew/1 CFNetwork/3860.300.31 Darwin/25.2.0",
     }
 
+# Key paths into GraphQL responses, split once instead of chaining .get() per request
+CASH_TRANSACTIONS_PATH = ('data', 'account', 'cashTransactions')
+CURRENT_USER_PATH = ('data', 'currentUser')
+
+def dig(obj, path, default=None):
+    """Walk a key path through nested response dicts; a missing or null step returns default"""
+    for key in path:
+        if not isinstance(obj, dict):
+            return default
+        obj = obj.get(key)
+    return default if obj is None else obj
+
+GET_SUBACCOUNT_QUERY = """query GetSubaccount($id: ID!) { node(id: $id) { ... on Subaccount { id overallBalance } } }"""
+GET_SUBACCOUNT_BODY = {"operationName": "GetSubaccount", "query": GET_SUBACCOUNT_QUERY}
+# Fixed-shape CurrentUser requests (no variables), built once
+CURRENT_USER_ACCOUNTS_BODY = {"operationName": "CurrentUser",
+                              "query": "query CurrentUser { currentUser { accounts { id displayName } } }"}
+CREW_TOKEN_CHECK_BODY = {"operationName": "CurrentUser", "query": "query CurrentUser { currentUser { id accounts { id } } }"}
+
+def read_pocket_balance(pocket_id, headers):
+    """Current balance of a pocket in dollars, or None if Crew didn't return one (errors, deleted pocket).
+    Callers must skip the transfer on None; treating it as $0 would refill the whole pocket."""
+    response = http_session.post(URL, headers=headers, json={**GET_SUBACCOUNT_BODY, "variables": {"id": pocket_id}}, timeout=CREW_TIMEOUT)
+    crew_data = response.json()
+    if crew_data.get("errors"):
+        return None
+    try:
+        return crew_data["data"]["node"]["overallBalance"] / 100.0
+    except (KeyError, TypeError):
+        return None
+
+def fetch_pocket_balances(pocket_ids, headers):
+    """Balances in dollars for several pockets from one aliased GraphQL request: {pocket_id: balance}.
+    A balance is None when it couldn't be read (any GraphQL error, or a missing alias/overallBalance);
+    callers must look those up again with read_pocket_balance rather than treat them as 0."""
+    pocket_ids = list(pocket_ids)
+    if not pocket_ids:
+        return {}
+    params = ", ".join(f"$id{i}: ID!" for i in range(len(pocket_ids)))
+    fields = " ".join(f"p{i}: node(id: $id{i}) {{ ... on Subaccount {{ id overallBalance }} }}" for i in range(len(pocket_ids)))
+    response = http_session.post(URL, headers=headers, json={
+        "operationName": "GetSubaccounts",
+        "variables": {f"id{i}": pocket_id for i, pocket_id in enumerate(pocket_ids)},
+        "query": f"query GetSubaccounts({params}) {{ {fields} }}"
+    }, timeout=CREW_TIMEOUT)
+    payload = response.json()
+    if payload.get("errors"):
+        # One bad id can null its alias or fail the whole document; don't guess which answers are still good
+        return dict.fromkeys(pocket_ids)
+    data = payload.get("data") or {}
+    balances = {}
+    for i, pocket_id in enumerate(pocket_ids):
+        try:
+            balances[pocket_id] = data[f"p{i}"]["overallBalance"] / 100.0
+        except (KeyError, TypeError):
+            balances[pocket_id] = None
+    return balances
+
 # --- DATA FETCHERS ---
-@cached("primary_account_id")
+CHECKING_ID_CACHE_TTL = 600  # seconds; the Checking account/subaccount ids never change for a Crew login
+
+# @cached only keeps dict results, so the account id string is cached by hand
 def get_primary_account_id():
+    account_id = cache.get("primary_account_id", max_age=CHECKING_ID_CACHE_TTL)
+    if account_id:
+        return account_id
     try:
         headers = get_crew_headers()
         if not headers: return None
-        query_string = """ query CurrentUser { currentUser { accounts { id displayName } } } """
-        response = requests.post(URL, headers=headers, json={"operationName": "CurrentUser", "query": query_string})
+        response = http_session.post(URL, headers=headers, json=CURRENT_USER_ACCOUNTS_BODY, timeout=CREW_TIMEOUT)
         data = response.json()
         accounts = data.get("data", {}).get("currentUser", {}).get("accounts", [])
-        for acc in accounts:
-            if acc.get("displayName") == "Checking":
-                return acc.get("id")
-        if accounts: return accounts[0].get("id")
-        return None
+        account_id = next((acc.get("id") for acc in accounts if acc.get("displayName") == "Checking"), None)
+        if not account_id and accounts: account_id = accounts[0].get("id")
+        if account_id:
+            cache.set("primary_account_id", account_id)
+        return account_id
     except Exception as e:
         print(f"Error fetching Account ID: {e}")
         return None
@@ -983,7 +1358,7 @@ def get_financial_data():
 
         # We fetch all accounts and subaccounts
         query_string = """ query CurrentUser { currentUser { accounts { subaccounts { id goal overallBalance name } } } } """
-        response = requests.post(URL, headers=headers, json={"operationName": "CurrentUser", "query": query_string})
+        response = http_session.post(URL, headers=headers, json={"operationName": "CurrentUser", "query": query_string}, timeout=CREW_TIMEOUT)
         data = response.json()
 
         results = {
@@ -1022,6 +1397,10 @@ def get_financial_data():
         print(f"Error in get_financial_data: {e}")
         return {"error": str(e)}
 
+def transaction_sort_key(tx):
+    """Sort key for the merged activity feed (used with reverse=True)"""
+    return (not tx.get("isPending", False), tx.get("date") or "")
+
 @cached("transactions")
 def get_transactions_data(search_term=None, min_date=None, max_date=None, min_amount=None, max_amount=None):
     try:
@@ -1033,13 +1412,13 @@ def get_transactions_data(search_term=None, min_date=None, max_date=None, min_am
         filters = {}
         if search_term: filters["fuzzySearch"] = search_term
         variables = {"pageSize": 100, "accountId": account_id, "searchFilters": filters}
-        response = requests.post(URL, headers=headers, json={"operationName": "RecentActivity", "variables": variables, "query": query_string})
+        response = http_session.post(URL, headers=headers, json={"operationName": "RecentActivity", "variables": variables, "query": query_string}, timeout=CREW_TIMEOUT)
         if response.status_code != 200: return {"error": f"API Error: {response.text}"}
         data = response.json()
         if 'errors' in data: return {"error": data['errors'][0]['message']}
         txs = []
         try:
-            edges = data.get('data', {}).get('account', {}).get('cashTransactions', {}).get('edges', [])
+            edges = dig(data, CASH_TRANSACTIONS_PATH, {}).get('edges') or []
             for edge in edges:
                 node = edge['node']
                 amt = node['amount'] / 100.0
@@ -1073,6 +1452,8 @@ def get_transactions_data(search_term=None, min_date=None, max_date=None, min_am
                 })
         except Exception as e:
             return {"error": f"Parse Error: {str(e)}"}
+        # Keep the cached list newest-first so api_transactions can merge into it without re-sorting
+        txs.sort(key=transaction_sort_key, reverse=True)
         return {"transactions": txs}
     except Exception as e:
         return {"error": str(e)}
@@ -1094,13 +1475,13 @@ def get_user_profile_info():
         } 
         """
         
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "CurrentUser", 
             "query": query_string
-        })
+        }, timeout=CREW_TIMEOUT)
         
         data = response.json()
-        user = data.get("data", {}).get("currentUser", {})
+        user = dig(data, CURRENT_USER_PATH, {})
         
         return {
             "firstName": user.get("firstName", ""),
@@ -1129,14 +1510,14 @@ def get_intercom_data():
         
         variables = {"platform": "WEB"}
         
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "IntercomToken",
             "variables": variables,
             "query": query_string
-        })
+        }, timeout=CREW_TIMEOUT)
         
         data = response.json()
-        user = data.get("data", {}).get("currentUser", {})
+        user = dig(data, CURRENT_USER_PATH, {})
         
         if not user:
             return {"error": "User data not found"}
@@ -1158,7 +1539,7 @@ def get_transaction_detail(activity_id):
         if not headers: return {"error": "Credentials not found"}
         query_string = """ query ActivityDetail($activityId: ID!, $isTransfer: Boolean = false) { cashTransaction: node(id: $activityId) @skip(if: $isTransfer) { ... on CashTransaction { ...CashTransactionActivity __typename } __typename } pendingTransfer: node(id: $activityId) @include(if: $isTransfer) { ... on Transfer { ...PendingTransferActivity __typename } __typename } } fragment CashTransactionFields on CashTransaction { id amount avatarFallbackColor currencyCode description externalMemo imageUrl isSplit note occurredAt quickCleanName ruleSuggestionString status title type __typename } fragment NameableAccount on Account { id displayName belongsToCurrentUser isChildAccount isExternalAccount avatarUrl icon type mask owner { displayName avatarUrl avatarColor __typename } __typename } fragment NameableSubaccount on Subaccount { id type belongsToCurrentUser isChildAccount isExternalAccount displayName avatarUrl icon piggyBanked isPrimary status account { id __typename } owner { displayName avatarUrl avatarColor __typename } primaryOwner { id __typename } __typename } fragment NameableCashTransaction on CashTransaction { __typename id amount description externalMemo avatarFallbackColor imageUrl quickCleanName title type account { ...NameableAccount __typename } subaccount { ...NameableSubaccount __typename } } fragment RelatedTransactions on CashTransaction { id status occurredAt relatedTransactions { id occurredAt __typename } transfer { id type status scheduledSettlement __typename } __typename } fragment TransferFields on Transfer { id amount formattedErrorCode isCancellable note occurredAt scheduledSettlement status type accountFrom { ...NameableAccount __typename } accountTo { ...NameableAccount __typename } subaccountFrom { ...NameableSubaccount __typename } subaccountTo { ...NameableSubaccount __typename } permittedActions { transferReassign __typename } __typename } fragment CashTransactionActivity on CashTransaction { ...CashTransactionFields ...NameableCashTransaction ...RelatedTransactions account { id subaccounts { id belongsToCurrentUser clearedBalance displayName isExternalAccount owner { displayName __typename } __typename } __typename } latestDebitCardTransactionDetail { id merchantAddress1 merchantCity merchantCountry merchantName merchantState merchantZip __typename } debitCard { id name type cardOwner: user { id displayedFirstName __typename } __typename } transfer { ...TransferFields accountTo { id primaryOwner { id displayedFirstName __typename } __typename } __typename } subaccount { id displayName __typename } permittedActions { cashTransactionReassign cashTransactionSplit cashTransactionUndo __typename } __typename } fragment PendingTransferActivity on Transfer { ...TransferFields __typename } """
         variables = {"isTransfer": False, "activityId": activity_id}
-        response = requests.post(URL, headers=headers, json={"operationName": "ActivityDetail", "variables": variables, "query": query_string})
+        response = http_session.post(URL, headers=headers, json={"operationName": "ActivityDetail", "variables": variables, "query": query_string}, timeout=CREW_TIMEOUT)
         data = response.json()
         node = data.get('data', {}).get('cashTransaction') or data.get('data', {}).get('pendingTransfer')
         if not node: return {"error": "Details not found"}
@@ -1210,7 +1591,7 @@ def get_expenses_data():
             } 
         } 
         """
-        response = requests.post(URL, headers=headers, json={"operationName": "CurrentUser", "query": query_string})
+        response = http_session.post(URL, headers=headers, json={"operationName": "CurrentUser", "query": query_string}, timeout=CREW_TIMEOUT)
         data = response.json()
         accounts = data.get("data", {}).get("currentUser", {}).get("accounts", [])
         
@@ -1266,11 +1647,11 @@ def get_goals_data():
         
         # 1. Fetch from API
         query_string = """ query CurrentUser { currentUser { accounts { subaccounts { goal overallBalance name id } } } } """
-        response = requests.post(URL, headers=headers, json={"operationName": "CurrentUser", "query": query_string})
+        response = http_session.post(URL, headers=headers, json={"operationName": "CurrentUser", "query": query_string}, timeout=CREW_TIMEOUT)
         data = response.json()
         
         # 2. Fetch Groups and Links from DB
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
         
         c.execute("SELECT id, name FROM groups")
@@ -1344,9 +1725,9 @@ def get_monthly_trends():
         start_of_month = date(today.year, today.month, 1).strftime("%Y-%m-%dT00:00:00Z")
         query_string = """ query RecentActivity($accountId: ID!, $cursor: String, $pageSize: Int = 100) { account: node(id: $accountId) { ... on Account { cashTransactions(first: $pageSize, after: $cursor) { edges { node { amount occurredAt } } } } } } """
         variables = {"pageSize": 100, "accountId": account_id}
-        response = requests.post(URL, headers=headers, json={"operationName": "RecentActivity", "variables": variables, "query": query_string})
+        response = http_session.post(URL, headers=headers, json={"operationName": "RecentActivity", "variables": variables, "query": query_string}, timeout=CREW_TIMEOUT)
         data = response.json()
-        edges = data.get('data', {}).get('account', {}).get('cashTransactions', {}).get('edges', [])
+        edges = dig(data, CASH_TRANSACTIONS_PATH, {}).get('edges') or []
         earned = 0.0
         spent = 0.0
         for edge in edges:
@@ -1427,7 +1808,7 @@ def get_subaccounts_list(force_refresh=False):
           displayedFirstName
         }
         """
-        response = requests.post(URL, headers=headers, json={"operationName": "TransferScreen", "query": query_string})
+        response = http_session.post(URL, headers=headers, json={"operationName": "TransferScreen", "query": query_string}, timeout=CREW_TIMEOUT)
         data = response.json()
         if 'errors' in data: return {"error": data['errors'][0]['message']}
 
@@ -1505,7 +1886,7 @@ def get_family_subaccounts():
             }
         }
         """
-        response = requests.post(URL, headers=headers, json={"operationName": "FamilySubaccounts", "query": query_string})
+        response = http_session.post(URL, headers=headers, json={"operationName": "FamilySubaccounts", "query": query_string}, timeout=CREW_TIMEOUT)
         data = response.json()
 
         current_user = data.get("data", {}).get("currentUser", {})
@@ -1563,30 +1944,18 @@ def get_family_subaccounts():
     except Exception as e:
         return {"error": str(e)}
 
-def get_configured_timezone():
-    """Get the user's configured timezone from database, defaults to local system time"""
-    try:
-        from zoneinfo import ZoneInfo
-    except ImportError:
-        from datetime import timezone as tz_module
-        # Fallback for Python < 3.9
-        return None
+SIMPLEFIN_ACCESS_URL_CACHE_TTL = 60  # seconds
 
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("SELECT sync_timezone FROM simplefin_config LIMIT 1")
-        row = c.fetchone()
-        conn.close()
+def get_simplefin_access_url():
+    """Stored SimpleFin access URL (None if not connected); cached briefly since it only changes on claim/disconnect"""
+    cached_url = cache.get("simplefin_access_url", max_age=SIMPLEFIN_ACCESS_URL_CACHE_TTL)
+    if cached_url:
+        return cached_url[0]
 
-        if row and row[0]:
-            try:
-                return ZoneInfo(row[0])
-            except:
-                return None
-        return None
-    except:
-        return None
+    row = query_config_row("SELECT access_url FROM simplefin_config LIMIT 1")
+    access_url = row[0] if row and row[0] else None
+    cache.set("simplefin_access_url", (access_url,))  # 1-tuple so "not connected" is cached too
+    return access_url
 
 def move_money(from_id, to_id, amount, memo=""):
     try:
@@ -1595,7 +1964,7 @@ def move_money(from_id, to_id, amount, memo=""):
         query_string = """ mutation InitiateTransferScottie($input: InitiateTransferInput!) { initiateTransfer(input: $input) { result { id __typename } __typename } } """
         amount_cents = int(round(float(amount) * 100))
         variables = {"input": {"amount": amount_cents, "accountFromId": from_id, "accountToId": to_id, "note": memo or "Transfer"}}
-        response = requests.post(URL, headers=headers, json={"operationName": "InitiateTransferScottie", "variables": variables, "query": query_string})
+        response = http_session.post(URL, headers=headers, json={"operationName": "InitiateTransferScottie", "variables": variables, "query": query_string}, timeout=CREW_TIMEOUT)
         data = response.json()
         if 'errors' in data: return {"error": data['errors'][0]['message']}
         print("🧹 Clearing Cache after transaction...")
@@ -1604,13 +1973,68 @@ def move_money(from_id, to_id, amount, memo=""):
     except Exception as e:
         return {"error": str(e)}
 
+def move_money_batch(transfers, headers):
+    """Run several (from_id, to_id, amount, memo) transfers as one aliased GraphQL mutation.
+    Returns a list of move_money-style results in the same order, or None if Crew rejected the document
+    before running it (no error carries a path, so nothing moved and the caller can fall back to move_money).
+    Mutation fields run in order and a failed one can null all of data after earlier ones moved money, so any
+    error tied to a field marks every transfer without its own result as failed rather than resendable."""
+    transfers = list(transfers)
+    if not transfers:
+        return []
+    params = ", ".join(f"$in{i}: InitiateTransferInput!" for i in range(len(transfers)))
+    fields = " ".join(f"t{i}: initiateTransfer(input: $in{i}) {{ result {{ id __typename }} __typename }}" for i in range(len(transfers)))
+    variables = {f"in{i}": {"amount": int(round(float(amount) * 100)), "accountFromId": from_id, "accountToId": to_id, "note": memo or "Transfer"}
+                 for i, (from_id, to_id, amount, memo) in enumerate(transfers)}
+    response = http_session.post(URL, headers=headers, json={
+        "operationName": "InitiateTransfers",
+        "variables": variables,
+        "query": f"mutation InitiateTransfers({params}) {{ {fields} }}"
+    }, timeout=CREW_TIMEOUT)
+    data = response.json()
+    all_errors = data.get("errors") or []
+    if not data.get("data") and not any(err.get("path") for err in all_errors):
+        return None  # Parse/validation rejection: no field ran
+
+    errors = {}
+    for err in all_errors:
+        path = err.get("path") or []
+        if path:
+            errors.setdefault(path[0], err.get("message", "Transfer failed"))
+    print("🧹 Clearing Cache after transaction...")
+    cache.clear()
+    results_data = data.get("data") or {}
+    results = []
+    for i in range(len(transfers)):
+        alias = f"t{i}"
+        if results_data.get(alias):
+            results.append({"success": True, "result": results_data[alias]})
+        else:
+            # Outcome unknown or failed; never resend it
+            results.append({"error": errors.get(alias, "Transfer status unknown; check the pocket before retrying")})
+    return results
+
+def get_checking_subaccount_id():
+    """ID of the Checking subaccount, or None if it can't be found"""
+    checking_id = cache.get("checking_subaccount_id", max_age=CHECKING_ID_CACHE_TTL)
+    if checking_id:
+        return checking_id
+
+    all_subs = get_subaccounts_list()
+    if "error" in all_subs:
+        return None
+    checking_id = next((sub["id"] for sub in all_subs.get("subaccounts", []) if sub["name"] == "Checking"), None)
+    if checking_id:
+        cache.set("checking_subaccount_id", checking_id)
+    return checking_id
+
 @cached("family")
 def get_family_data():
     try:
         headers = get_crew_headers()
         if not headers: return {"error": "Credentials not found"}
         query_string = """ query FamilyScreen { currentUser { id family { id children { id dob cardColor imageUrl displayedFirstName spendAccount { id overallBalance subaccounts { id displayName clearedBalance } } scheduledAllowance { id totalAmount } } parents { id isApplying cardColor imageUrl displayedFirstName } } } } """
-        response = requests.post(URL, headers=headers, json={"operationName": "FamilyScreen", "query": query_string})
+        response = http_session.post(URL, headers=headers, json={"operationName": "FamilyScreen", "query": query_string}, timeout=CREW_TIMEOUT)
         data = response.json()
         family_node = data.get("data", {}).get("currentUser", {}).get("family", {})
         children = []
@@ -1668,11 +2092,11 @@ def create_pocket(name, target_amount, initial_amount, note):
             }
         }
 
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "CreateSubaccount",
             "variables": variables,
             "query": query_string
-        })
+        }, timeout=CREW_TIMEOUT)
 
         data = response.json()
         
@@ -1744,7 +2168,7 @@ def get_cards_data():
         """
         
         # We only execute the Physical card query for now as requested
-        res_phys = requests.post(URL, headers=headers, json={"operationName": "PhysicalCards", "query": query_phys})
+        res_phys = http_session.post(URL, headers=headers, json={"operationName": "PhysicalCards", "query": query_phys}, timeout=CREW_TIMEOUT)
         data_phys = res_phys.json()
         
         all_cards = []
@@ -1853,7 +2277,7 @@ def get_cards_data():
         }
         """
 
-        res_virtual = requests.post(URL, headers=headers, json={"operationName": "VirtualCards", "query": query_virtual})
+        res_virtual = http_session.post(URL, headers=headers, json={"operationName": "VirtualCards", "query": query_virtual}, timeout=CREW_TIMEOUT)
         data_virtual = res_virtual.json()
 
         virtual_cards = []
@@ -2013,11 +2437,11 @@ def delete_subaccount_action(sub_id):
         
         variables = {"id": sub_id}
 
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "DeleteSubaccount",
             "variables": variables,
             "query": query_string
-        })
+        }, timeout=CREW_TIMEOUT)
 
         data = response.json()
         
@@ -2027,7 +2451,7 @@ def delete_subaccount_action(sub_id):
         # --- NEW: Clean up local DB ---
         # This ensures the deleted pocket is removed from your local grouping table
         try:
-            conn = sqlite3.connect(DB_FILE)
+            conn = db_connect()
             c = conn.cursor()
             c.execute("DELETE FROM pocket_groups WHERE pocket_id = ?", (sub_id,))
             conn.commit()
@@ -2064,11 +2488,11 @@ def delete_bill_action(bill_id):
         
         variables = {"id": bill_id}
 
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "DeleteBill",
             "variables": variables,
             "query": query_string
-        })
+        }, timeout=CREW_TIMEOUT)
 
         data = response.json()
         
@@ -2107,10 +2531,10 @@ def get_bill_funding_source():
         }
         """
         
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "CurrentUser",
             "query": query_string
-        })
+        }, timeout=CREW_TIMEOUT)
 
         data = response.json()
         
@@ -2139,22 +2563,10 @@ def set_spend_pocket_action(user_id, pocket_id, card_id=None):
         # Resolve "Checking" to a real ID
         resolved_pocket_id = pocket_id
         if pocket_id == "Checking":
-            all_subs = get_subaccounts_list()
-
-            if "error" in all_subs:
+            resolved_pocket_id = get_checking_subaccount_id()
+            if not resolved_pocket_id:
                 return {"error": "Could not resolve Checking ID"}
 
-            found_id = None
-            for sub in all_subs.get("subaccounts", []):
-                if sub["name"] == "Checking":
-                    found_id = sub["id"]
-                    break
-
-            if found_id:
-                resolved_pocket_id = found_id
-            else:
-                return {"error": "Checking subaccount not found"}
-
         # Check if this is a virtual card by looking it up
         is_virtual_card = False
         if card_id:
@@ -2190,11 +2602,11 @@ def set_spend_pocket_action(user_id, pocket_id, card_id=None):
                 }
             }
 
-            response = requests.post(URL, headers=headers, json={
+            response = http_session.post(URL, headers=headers, json={
                 "operationName": "UpdateVirtualDebitCard",
                 "variables": variables,
                 "query": query_string
-            })
+            }, timeout=CREW_TIMEOUT)
         else:
             # Use setSpendSubaccount mutation for physical cards (user's global setting)
             query_string = """
@@ -2225,11 +2637,11 @@ def set_spend_pocket_action(user_id, pocket_id, card_id=None):
                 }
             }
 
-            response = requests.post(URL, headers=headers, json={
+            response = http_session.post(URL, headers=headers, json={
                 "operationName": "SetActiveSpendPocketScottie",
                 "variables": variables,
                 "query": query_string
-            })
+            }, timeout=CREW_TIMEOUT)
 
         data = response.json()
 
@@ -2318,11 +2730,11 @@ def create_bill_action(name, amount, frequency_key, day_of_month, match_string=N
             }
         }
 
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "CreateBill",
             "variables": variables,
             "query": query_string
-        })
+        }, timeout=CREW_TIMEOUT)
 
         data = response.json()
         
@@ -2355,7 +2767,7 @@ def login():
     if current_user.is_authenticated:
         return redirect('/')
 
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("SELECT COUNT(*) FROM users")
     user_count = c.fetchone()[0]
@@ -2368,11 +2780,11 @@ def login():
 @app.route('/api/auth/login', methods=['POST'])
 def api_login():
     """Handle login form submission"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     username = data.get('username')
     password = data.get('password')
 
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("SELECT id, username, email, password_hash FROM users WHERE username = ?", (username,))
     row = c.fetchone()
@@ -2402,7 +2814,7 @@ def api_logout():
 @app.route('/api/auth/register', methods=['POST'])
 def api_register():
     """Handle registration - only allowed if no users exist"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
 
     # Check if users already exist (single-tenant model)
@@ -2411,7 +2823,7 @@ def api_register():
         conn.close()
         return jsonify({"success": False, "error": "Registration is disabled"}), 403
 
-    data = request.json
+    data = request.get_json(silent=True) or {}
     username = data.get('username')
     email = data.get('email')
     password = data.get('password')
@@ -2447,7 +2859,7 @@ def api_register():
 @login_required
 def api_change_password():
     """Handle password change"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     current_password = data.get('current_password')
     new_password = data.get('new_password')
 
@@ -2457,7 +2869,7 @@ def api_change_password():
     if len(new_password) < 8:
         return jsonify({"success": False, "error": "Password must be at least 8 characters"}), 400
 
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("SELECT password_hash FROM users WHERE id = ?", (current_user.id,))
     row = c.fetchone()
@@ -2476,7 +2888,6 @@ def api_change_password():
 
 def base64url_to_bytes(base64url_string):
     """Convert base64url string to bytes"""
-    import base64
     # Add padding if needed
     padding = 4 - (len(base64url_string) % 4)
     if padding != 4:
@@ -2519,7 +2930,7 @@ def webauthn_register_options():
     session_id = os.urandom(16).hex()
     expires_at = datetime.now() + timedelta(minutes=15)
 
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("""
         INSERT INTO webauthn_sessions (id, user_id, challenge, operation, expires_at)
@@ -2542,7 +2953,7 @@ def webauthn_register_options():
 @login_required
 def webauthn_register_verify():
     """Verify passkey registration response"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     session_id = data.get('sessionId')
     credential = data.get('credential')
     nickname = data.get('nickname', 'Passkey')
@@ -2552,7 +2963,7 @@ def webauthn_register_verify():
     print(f"[WebAuthn Register Verify] Credential type: {credential.get('type', 'N/A')}")
 
     # Retrieve challenge from database
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("""
         SELECT challenge, user_id, expires_at FROM webauthn_sessions
@@ -2611,7 +3022,7 @@ def webauthn_register_verify():
         })
 
         # Update credential nickname
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
         c.execute("""
             UPDATE passkey_credentials
@@ -2631,20 +3042,19 @@ def webauthn_register_verify():
     except Exception as e:
         conn.close()
         print(f"[WebAuthn Register Verify] ERROR: {type(e).__name__}: {str(e)}")
-        import traceback
         traceback.print_exc()
         return jsonify({"success": False, "error": str(e)}), 400
 
 @app.route('/api/auth/webauthn/authenticate/options', methods=['POST'])
 def webauthn_authenticate_options():
     """Generate options for passkey authentication (supports username-less login)"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     username = data.get('username')
 
     print(f"[WebAuthn Auth] Username: {username if username else '(discoverable credential mode)'}")
     print(f"[WebAuthn Auth] User-Agent: {request.headers.get('User-Agent', 'Unknown')}")
 
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
 
     user_id = None
@@ -2719,7 +3129,7 @@ def webauthn_authenticate_options():
 @app.route('/api/auth/webauthn/authenticate/verify', methods=['POST'])
 def webauthn_authenticate_verify():
     """Verify passkey authentication response"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     session_id = data.get('sessionId')
     credential = data.get('credential')
 
@@ -2727,7 +3137,7 @@ def webauthn_authenticate_verify():
     print(f"[WebAuthn Auth Verify] Credential ID: {credential.get('id', 'N/A')[:20]}...")
 
     # Retrieve challenge
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("""
         SELECT challenge, user_id, expires_at FROM webauthn_sessions
@@ -2831,14 +3241,13 @@ def webauthn_authenticate_verify():
     except Exception as e:
         conn.close()
         print(f"[WebAuthn Auth Verify] ERROR: {type(e).__name__}: {str(e)}")
-        import traceback
         traceback.print_exc()
         return jsonify({"success": False, "error": str(e)}), 400
 
 @app.route('/api/auth/passkeys/available')
 def api_passkeys_available():
     """Check if any passkeys are registered in the system (public endpoint for login page)"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("SELECT COUNT(*) FROM passkey_credentials")
     count = c.fetchone()[0]
@@ -2850,7 +3259,7 @@ def api_passkeys_available():
 @login_required
 def api_list_passkeys():
     """List user's registered passkeys"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("""
         SELECT id, credential_id, nickname, created_at, last_used_at, transports, backup_state
@@ -2878,7 +3287,7 @@ def api_list_passkeys():
 @login_required
 def api_delete_passkey(passkey_id):
     """Delete a passkey credential"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
 
     # Verify ownership
@@ -2904,13 +3313,13 @@ def api_delete_passkey(passkey_id):
 @login_required
 def api_update_passkey(passkey_id):
     """Update passkey nickname"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     nickname = data.get('nickname', '').strip()
 
     if not nickname:
         return jsonify({"success": False, "error": "Nickname required"}), 400
 
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
 
     # Verify ownership
@@ -2937,7 +3346,7 @@ def api_update_passkey(passkey_id):
 @login_required
 def index():
     # Check if onboarding is complete
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("SELECT is_completed FROM onboarding_config LIMIT 1")
     row = c.fetchone()
@@ -2971,7 +3380,7 @@ def serve_sw():
 @login_required
 def api_onboarding_status():
     """Check if onboarding is complete"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("SELECT is_completed FROM onboarding_config LIMIT 1")
     row = c.fetchone()
@@ -2989,7 +3398,7 @@ def api_onboarding_status():
 @login_required
 def api_save_crew_token():
     """Save and validate Crew bearer token"""
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     bearer_token = data.get('bearerToken', '').strip()
 
     if not bearer_token:
@@ -3003,11 +3412,10 @@ def api_save_crew_token():
             "authorization": bearer_token,
             "user-agent": "Crew/1 CFNetwork/3860.300.31 Darwin/25.2.0"
         }
-        query_string = """ query CurrentUser { currentUser { id accounts { id } } } """
-        response = requests.post(
+        response = http_session.post(
             "https://api.trycrew.com/willow/graphql",
             headers=headers,
-            json={"operationName": "CurrentUser", "query": query_string},
+            json=CREW_TOKEN_CHECK_BODY,
             timeout=10
         )
 
@@ -3023,21 +3431,17 @@ def api_save_crew_token():
         return jsonify({"success": False, "error": f"Token validation failed: {str(e)}"}), 500
 
     # Save to database
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
 
-    c.execute("SELECT id FROM crew_config LIMIT 1")
-    existing = c.fetchone()
-
-    if existing:
-        c.execute("UPDATE crew_config SET bearer_token = ?, is_valid = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-                  (bearer_token, existing[0]))
-    else:
-        c.execute("INSERT INTO crew_config (bearer_token, is_valid) VALUES (?, 1)", (bearer_token,))
+    c.execute("""INSERT INTO crew_config (id, bearer_token, is_valid) VALUES (1, ?, 1)
+                 ON CONFLICT(id) DO UPDATE SET bearer_token = excluded.bearer_token, is_valid = 1,
+                 updated_at = CURRENT_TIMESTAMP""", (bearer_token,))
 
     conn.commit()
     conn.close()
 
+    cache.invalidate("primary_account_id", "checking_subaccount_id")  # Looked up with the previous token
     return jsonify({"success": True})
 
 @app.route('/api/onboarding/complete', methods=['POST'])
@@ -3048,17 +3452,11 @@ def api_complete_onboarding():
     if not get_crew_bearer_token():
         return jsonify({"success": False, "error": "No Crew token configured"}), 400
 
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
 
-    c.execute("SELECT id FROM onboarding_config LIMIT 1")
-    existing = c.fetchone()
-
-    if existing:
-        c.execute("UPDATE onboarding_config SET is_completed = 1, completed_at = CURRENT_TIMESTAMP WHERE id = ?",
-                  (existing[0],))
-    else:
-        c.execute("INSERT INTO onboarding_config (is_completed, completed_at) VALUES (1, CURRENT_TIMESTAMP)")
+    c.execute("""INSERT INTO onboarding_config (id, is_completed, completed_at) VALUES (1, 1, CURRENT_TIMESTAMP)
+                 ON CONFLICT(id) DO UPDATE SET is_completed = 1, completed_at = CURRENT_TIMESTAMP""")
 
     conn.commit()
     conn.close()
@@ -3071,7 +3469,7 @@ def api_complete_onboarding():
 def api_get_credentials_status():
     """Get status of all configured credentials (without exposing actual values)"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
 
         # Check Crew token
@@ -3114,7 +3512,6 @@ def api_get_credentials_status():
         })
     except Exception as e:
         print(f"Error getting credentials status: {e}", flush=True)
-        import traceback
         traceback.print_exc()
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -3122,7 +3519,7 @@ def api_get_credentials_status():
 @login_required
 def api_account_update_crew_token():
     """Update Crew bearer token from account settings"""
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     bearer_token = data.get('token', '').strip()
 
     if not bearer_token:
@@ -3136,11 +3533,10 @@ def api_account_update_crew_token():
             "authorization": bearer_token,
             "user-agent": "Crew/1 CFNetwork/3860.300.31 Darwin/25.2.0"
         }
-        query_string = """ query CurrentUser { currentUser { id accounts { id } } } """
-        response = requests.post(
+        response = http_session.post(
             "https://api.trycrew.com/willow/graphql",
             headers=headers,
-            json={"operationName": "CurrentUser", "query": query_string},
+            json=CREW_TOKEN_CHECK_BODY,
             timeout=10
         )
 
@@ -3156,17 +3552,12 @@ def api_account_update_crew_token():
         return jsonify({"success": False, "error": f"Token validation failed: {str(e)}"}), 500
 
     # Save to database
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
 
-    c.execute("SELECT id FROM crew_config LIMIT 1")
-    existing = c.fetchone()
-
-    if existing:
-        c.execute("UPDATE crew_config SET bearer_token = ?, is_valid = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-                  (bearer_token, existing[0]))
-    else:
-        c.execute("INSERT INTO crew_config (bearer_token, is_valid) VALUES (?, 1)", (bearer_token,))
+    c.execute("""INSERT INTO crew_config (id, bearer_token, is_valid) VALUES (1, ?, 1)
+                 ON CONFLICT(id) DO UPDATE SET bearer_token = excluded.bearer_token, is_valid = 1,
+                 updated_at = CURRENT_TIMESTAMP""", (bearer_token,))
 
     conn.commit()
     conn.close()
@@ -3191,7 +3582,7 @@ def api_account_test_crew():
             "user-agent": "Crew/1 CFNetwork/3860.300.31 Darwin/25.2.0"
         }
         query_string = """ query CurrentUser { currentUser { id firstName lastName } } """
-        response = requests.post(
+        response = http_session.post(
             "https://api.trycrew.com/willow/graphql",
             headers=headers,
             json={"operationName": "CurrentUser", "query": query_string},
@@ -3248,7 +3639,7 @@ def api_account_bank_details():
                 }
             }
         """
-        response = requests.post(
+        response = http_session.post(
             URL,
             headers=headers,
             json={"operationName": "CashAccountDetails", "query": query_string},
@@ -3281,21 +3672,21 @@ def api_account_bank_details():
 @login_required
 def api_account_update_simplefin_token():
     """Update SimpleFin access token from account settings"""
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     setup_token = data.get('token', '').strip()
 
     if not setup_token:
         return jsonify({"success": False, "error": "Setup token is required"}), 400
 
+    # Decode the base64 token to get the claim URL (rejects malformed input without a request)
+    decoded = decode_simplefin_setup_token(setup_token)
+    if not decoded:
+        return jsonify({"success": False, "error": "Invalid token format. Token must be Base64-encoded."}), 400
+
     # Validate and claim token
     try:
-        import base64
-
-        # Decode the base64 token to get the claim URL
-        decoded = base64.b64decode(setup_token).decode('utf-8')
-
         # Make a POST request to claim the token
-        response = requests.post(decoded, timeout=10)
+        response = http_session.post(decoded, timeout=10)
 
         if response.status_code != 200:
             return jsonify({"success": False, "error": "Invalid setup token"}), 400
@@ -3310,17 +3701,10 @@ def api_account_update_simplefin_token():
         return jsonify({"success": False, "error": f"Token validation failed: {str(e)}"}), 500
 
     # Save access URL to database
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
 
-    c.execute("SELECT id FROM simplefin_config LIMIT 1")
-    existing = c.fetchone()
-
-    if existing:
-        c.execute("UPDATE simplefin_config SET access_url = ?, is_valid = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-                  (access_url, existing[0]))
-    else:
-        c.execute("INSERT INTO simplefin_config (access_url, is_valid) VALUES (?, 1)", (access_url,))
+    c.execute(UPSERT_SIMPLEFIN_ACCESS_URL_SQL, (access_url,))
 
     conn.commit()
     conn.close()
@@ -3333,19 +3717,12 @@ def api_account_update_simplefin_token():
 def api_account_test_simplefin():
     """Test SimpleFin connection"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("SELECT access_url FROM simplefin_config LIMIT 1")
-        row = c.fetchone()
-        conn.close()
-
-        if not row or not row[0]:
+        access_url = get_simplefin_access_url()
+        if not access_url:
             return jsonify({"success": False, "error": "No SimpleFin access URL configured"}), 400
 
-        access_url = row[0]
-
         # Test the connection by fetching accounts with balances-only flag
-        response = requests.get(f"{access_url}/accounts?balances-only=1", timeout=10)
+        response = http_session.get(f"{access_url}/accounts?balances-only=1", timeout=10)
 
         if response.status_code != 200:
             return jsonify({"success": False, "error": f"Connection failed with status {response.status_code}"}), 400
@@ -3365,38 +3742,27 @@ def api_account_test_simplefin():
 @login_required
 def api_account_update_lunchflow_key():
     """Update LunchFlow API key from account settings"""
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     api_key = data.get('apiKey', '').strip()
 
     if not api_key:
         return jsonify({"success": False, "error": "API key is required"}), 400
 
-    # Validate key by attempting to fetch accounts
+    # Validate key against the accounts endpoint
     try:
-        response = requests.get(
-            "https://www.lunchflow.app/api/v1/accounts",
-            headers={"x-api-key": api_key},
-            timeout=10
-        )
-
-        if response.status_code != 200:
+        if not validate_lunchflow_key(api_key):
             return jsonify({"success": False, "error": "Invalid API key"}), 400
 
     except Exception as e:
         return jsonify({"success": False, "error": f"Validation failed: {str(e)}"}), 500
 
     # Save to database
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
 
-    c.execute("SELECT id FROM lunchflow_config LIMIT 1")
-    existing = c.fetchone()
-
-    if existing:
-        c.execute("UPDATE lunchflow_config SET api_key = ?, is_valid = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-                  (api_key, existing[0]))
-    else:
-        c.execute("INSERT INTO lunchflow_config (api_key, is_valid) VALUES (?, 1)", (api_key,))
+    c.execute("""INSERT INTO lunchflow_config (id, api_key, is_valid) VALUES (1, ?, 1)
+                 ON CONFLICT(id) DO UPDATE SET api_key = excluded.api_key, is_valid = 1,
+                 updated_at = CURRENT_TIMESTAMP""", (api_key,))
 
     conn.commit()
     conn.close()
@@ -3414,7 +3780,7 @@ def api_account_test_lunchflow():
         return jsonify({"success": False, "error": "No LunchFlow API key configured"}), 400
 
     try:
-        response = requests.get(
+        response = http_session.get(
             "https://www.lunchflow.app/api/v1/accounts",
             headers={"x-api-key": api_key},
             timeout=10
@@ -3438,32 +3804,28 @@ def api_account_test_lunchflow():
 @login_required
 def api_account_update_splitwise_key():
     """Update Splitwise API key from account settings"""
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     api_key = data.get('apiKey', '').strip()
 
     if not api_key:
         return jsonify({"success": False, "error": "API key is required"}), 400
 
     # Validate by getting current user
-    headers = {"Authorization": f"Bearer {api_key}"}
     try:
-        response = requests.get(
-            "https://secure.splitwise.com/api/v3.0/get_current_user",
-            headers=headers,
-            timeout=30
-        )
+        response = splitwise_get("/get_current_user", api_key)
     except Exception as e:
         return jsonify({"success": False, "error": f"Network error: {str(e)}"}), 500
 
     if response.status_code == 200:
-        user_data = response.json().get("user", {})
+        user_data = decode_json_response(response).get("user", {})
         user_id = user_data.get("id")
 
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
         c.execute("DELETE FROM splitwise_config")  # Clear old
         c.execute("INSERT INTO splitwise_config (api_key, user_id, is_valid) VALUES (?, ?, 1)",
                   (api_key, user_id))
+        c.execute("DELETE FROM splitwise_friends_cache")  # Stored friends belong to the previous key
         conn.commit()
         conn.close()
 
@@ -3482,17 +3844,12 @@ def api_account_test_splitwise():
         return jsonify({"success": False, "error": "No Splitwise API key configured"}), 400
 
     try:
-        headers = {"Authorization": f"Bearer {api_key}"}
-        response = requests.get(
-            "https://secure.splitwise.com/api/v3.0/get_current_user",
-            headers=headers,
-            timeout=30
-        )
+        response = splitwise_get("/get_current_user", api_key)
 
         if response.status_code != 200:
             return jsonify({"success": False, "error": f"Connection failed with status {response.status_code}"}), 400
 
-        user_data = response.json().get("user", {})
+        user_data = decode_json_response(response).get("user", {})
         first_name = user_data.get("first_name", "")
         last_name = user_data.get("last_name", "")
         name = f"{first_name} {last_name}".strip() or "User"
@@ -3509,7 +3866,7 @@ def api_account_test_splitwise():
 @login_required
 def api_account_get_webauthn_config():
     """Get WebAuthn configuration (RP_ID and ORIGIN)"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     c.execute("SELECT rp_id, origin, is_valid FROM webauthn_config WHERE is_valid = 1 ORDER BY id DESC LIMIT 1")
     row = c.fetchone()
@@ -3533,7 +3890,7 @@ def api_account_get_webauthn_config():
 @login_required
 def api_account_update_webauthn_config():
     """Update WebAuthn configuration (RP_ID and ORIGIN)"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     rp_id = data.get('rp_id', '').strip()
     origin = data.get('origin', '').strip()
 
@@ -3544,7 +3901,7 @@ def api_account_update_webauthn_config():
         return jsonify({"success": False, "error": "Origin is required"}), 400
 
     # Validate origin format (should start with http:// or https://)
-    if not origin.startswith('http://') and not origin.startswith('https://'):
+    if not parse_webauthn_origin(origin):
         return jsonify({"success": False, "error": "Origin must start with http:// or https://"}), 400
 
     # Validate that origin doesn't have trailing slash
@@ -3552,7 +3909,7 @@ def api_account_update_webauthn_config():
         origin = origin[:-1]
 
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
 
         # Mark all existing configs as invalid
@@ -3579,7 +3936,7 @@ def api_account_update_webauthn_config():
 @login_required
 def api_account_test_webauthn():
     """Test WebAuthn configuration (validates format)"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     rp_id = data.get('rp_id', '').strip()
     origin = data.get('origin', '').strip()
 
@@ -3590,19 +3947,20 @@ def api_account_test_webauthn():
         return jsonify({"success": False, "error": "Origin is required"}), 400
 
     # Validate origin format
-    if not origin.startswith('http://') and not origin.startswith('https://'):
+    parsed_origin = parse_webauthn_origin(origin)
+    if not parsed_origin:
         return jsonify({"success": False, "error": "Origin must start with http:// or https://"}), 400
 
     # Validate production HTTPS requirement
     if 'localhost' not in rp_id and '127.0.0.1' not in rp_id:
-        if not origin.startswith('https://'):
+        if parsed_origin.scheme != 'https':
             return jsonify({
                 "success": False,
                 "error": "Production deployments require HTTPS. Origin must start with https://"
             }), 400
 
     # Validate RP_ID matches origin domain
-    origin_domain = origin.replace('https://', '').replace('http://', '').split(':')[0]
+    origin_domain = parsed_origin.hostname
     if rp_id != origin_domain and not origin_domain.endswith('.' + rp_id):
         return jsonify({
             "success": False,
@@ -3616,12 +3974,60 @@ def api_account_test_webauthn():
 
 # --- WEB PUSH TOKEN MANAGEMENT ---
 
+# Subscription registrations are written behind the request: the handler only enqueues,
+# and a single writer thread flushes everything queued within FCM_FLUSH_INTERVAL in one commit
+FCM_FLUSH_INTERVAL = 0.1  # seconds
+FCM_FLUSH_BATCH = 100
+_fcm_token_queue = queue.Queue()
+_fcm_writer_started = False
+_fcm_writer_lock = threading.Lock()
+
+def flush_fcm_tokens(batch):
+    """Upsert a batch of (user_id, token, device_name, user_agent) rows in a single transaction"""
+    conn = db_connect()
+    try:
+        c = conn.cursor()
+        c.executemany("""INSERT INTO fcm_tokens (user_id, token, device_name, user_agent, last_used_at)
+                         VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                         ON CONFLICT(token) DO UPDATE SET
+                         last_used_at = CURRENT_TIMESTAMP, is_active = 1""", batch)
+        conn.commit()
+    finally:
+        conn.close()
+
+def fcm_token_writer():
+    """Background thread that drains the subscription queue in batches"""
+    while True:
+        batch = [_fcm_token_queue.get()]  # Block until there is something to write
+        deadline = time.time() + FCM_FLUSH_INTERVAL
+        while len(batch) < FCM_FLUSH_BATCH:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_fcm_token_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        try:
+            flush_fcm_tokens(batch)
+        except Exception as e:
+            print(f"❌ Failed to save {len(batch)} push subscription(s): {e}")
+
+def start_fcm_writer_once():
+    """Start the subscription writer thread exactly once (thread-safe)"""
+    global _fcm_writer_started
+    with _fcm_writer_lock:
+        if not _fcm_writer_started:
+            threading.Thread(target=fcm_token_writer, daemon=True).start()
+            _fcm_writer_started = True
+
 @app.route('/api/fcm/register-token', methods=['POST'])
 @login_required
 def api_fcm_register_token():
     """Register Web Push subscription for push notifications"""
     try:
-        data = request.json
+        data = request.get_json(silent=True) or {}
         token = data.get('token')
         device_name = data.get('device_name', 'Unknown Device')
         user_agent = request.headers.get('User-Agent', '')
@@ -3629,17 +4035,9 @@ def api_fcm_register_token():
         if not token:
             return jsonify({"error": "Token required"}), 400
 
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-
-        # Insert or update token
-        c.execute("""INSERT INTO fcm_tokens (user_id, token, device_name, user_agent, last_used_at)
-                     VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                     ON CONFLICT(token) DO UPDATE SET
-                     last_used_at = CURRENT_TIMESTAMP, is_active = 1""",
-                  (current_user.id, token, device_name, user_agent))
-        conn.commit()
-        conn.close()
+        # Insert or update token (persisted by the writer thread)
+        start_fcm_writer_once()
+        _fcm_token_queue.put((current_user.id, token, device_name, user_agent))
 
         return jsonify({"success": True, "message": "Token registered"})
     except Exception as e:
@@ -3666,7 +4064,7 @@ def api_get_fcm_config():
 def api_update_fcm_config():
     """Update VAPID configuration for Web Push"""
     try:
-        data = request.json
+        data = request.get_json(silent=True) or {}
         vapid_public = data.get('vapid_public_key', '').strip()
         vapid_private = data.get('vapid_private_key', '').strip()
 
@@ -3677,7 +4075,7 @@ def api_update_fcm_config():
         if len(vapid_public) < 20 or len(vapid_private) < 20:
             return jsonify({"error": "Invalid VAPID key format"}), 400
 
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
 
         # Delete old config and insert new (keeping old columns empty for backward compatibility)
@@ -3820,10 +4218,10 @@ def api_autopilot_rules():
         }
         """
 
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "GetAllRuleValues",
             "query": query
-        })
+        }, timeout=CREW_TIMEOUT)
         data = response.json()
 
         if data.get("errors"):
@@ -3914,11 +4312,11 @@ def api_autopilot_rule_details(rule_id):
         }
         """
 
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "GetRoundUpRuleWithCards",
             "variables": {"id": rule_id},
             "query": query
-        })
+        }, timeout=CREW_TIMEOUT)
         data = response.json()
 
         if data.get("errors"):
@@ -3957,7 +4355,7 @@ def api_autopilot_rule_update():
         if not headers:
             return jsonify({"error": "Credentials not found"}), 401
 
-        data = request.json
+        data = request.get_json(silent=True) or {}
         rule_id = data.get("ruleId")
         rule_name = data.get("name", "Round Up")
         account_id = data.get("accountId")
@@ -4033,11 +4431,11 @@ def api_autopilot_rule_update():
 
         variables = {"input": rule_input}
 
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "EditRoundUpRule",
             "variables": variables,
             "query": mutation
-        })
+        }, timeout=CREW_TIMEOUT)
         result = response.json()
 
         if result.get("errors"):
@@ -4059,7 +4457,7 @@ def api_autopilot_rule_delete():
         if not headers:
             return jsonify({"error": "Credentials not found"}), 401
 
-        data = request.json
+        data = request.get_json(silent=True) or {}
         rule_id = data.get("ruleId")
         if not rule_id:
             return jsonify({"error": "Missing rule ID"}), 400
@@ -4072,11 +4470,11 @@ def api_autopilot_rule_delete():
         }
         """
 
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "DeleteRule",
             "variables": {"input": {"ruleId": rule_id}},
             "query": mutation
-        })
+        }, timeout=CREW_TIMEOUT)
         result = response.json()
 
         if result.get("errors"):
@@ -4097,7 +4495,7 @@ def api_autopilot_rule_create():
         if not headers:
             return jsonify({"error": "Credentials not found"}), 401
 
-        data = request.json
+        data = request.get_json(silent=True) or {}
         rule_name = data.get("name", "Round Up")
         account_id = data.get("accountId")
         subaccount_id = data.get("subaccountId")
@@ -4169,11 +4567,11 @@ def api_autopilot_rule_create():
 
         variables = {"input": rule_input}
 
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "CreateRoundUpRule",
             "variables": variables,
             "query": mutation
-        })
+        }, timeout=CREW_TIMEOUT)
         result = response.json()
 
         if result.get("errors"):
@@ -4189,13 +4587,15 @@ def api_autopilot_rule_create():
 # --- API ROUTES ---
 @app.route('/api/family')
 @login_required
-def api_family(): return jsonify(get_family_data())
+@etag_cached("family")
+def api_family(): return get_family_data()
 @app.route('/api/cards')
 @login_required
+@etag_cached("cards")
 def api_cards():
     # Allow forcing a refresh if ?refresh=true is passed
     refresh = request.args.get('refresh') == 'true'
-    return jsonify(get_cards_data(force_refresh=refresh))
+    return get_cards_data(force_refresh=refresh)
 
 @app.route('/api/cards/<card_id>/details')
 @login_required
@@ -4240,11 +4640,11 @@ def api_card_details(card_id):
         }
         """
 
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "CardDetails",
             "variables": {"id": card_id},
             "query": query
-        })
+        }, timeout=CREW_TIMEOUT)
         data = response.json()
 
         # Log for debugging
@@ -4301,11 +4701,11 @@ def api_card_sensitive(card_id):
         }
         """
 
-        token_response = requests.post(URL, headers=headers, json={
+        token_response = http_session.post(URL, headers=headers, json={
             "operationName": "GenerateViewSadToken",
             "variables": {"input": {"debitCardId": card_id}},
             "query": mutation
-        })
+        }, timeout=CREW_TIMEOUT)
         token_data = token_response.json()
 
         sad_token = token_data.get("data", {}).get("generateViewSadToken", {}).get("result")
@@ -4315,9 +4715,10 @@ def api_card_sensitive(card_id):
             return jsonify({"error": error_msg}), 400
 
         # Step 2: Use SAD token to fetch card data from CDE
-        cde_response = requests.get(
+        cde_response = http_session.get(
             "https://cde.trycrew.com/wally/debit_card",
-            headers={"Authorization": f"Bearer {sad_token}"}
+            headers={"Authorization": f"Bearer {sad_token}"},
+            timeout=CREW_TIMEOUT
         )
 
         if cde_response.status_code != 200:
@@ -4336,7 +4737,7 @@ def api_card_sensitive(card_id):
 @app.route('/api/groups/move-pocket', methods=['POST'])
 @login_required
 def api_move_pocket():
-    data = request.json
+    data = request.get_json(silent=True) or {}
     
     # We expect: 
     # 1. targetGroupId (where it's going)
@@ -4345,23 +4746,22 @@ def api_move_pocket():
     target_group_id = data.get('targetGroupId') # Can be None (Ungrouped)
     ordered_ids = data.get('orderedPocketIds', [])
     
-    conn = sqlite3.connect(DB_FILE)
+    # Manual transaction control: the whole reorder lands atomically or not at all
+    conn = db_connect(isolation_level=None)
     c = conn.cursor()
     try:
-        # Loop through the list provided by frontend and update both Group and Order
-        for index, pocket_id in enumerate(ordered_ids):
-            if target_group_id is None:
-                # If ungrouped, we delete the link (or set group_id NULL if you prefer)
-                # But to keep sorting in "Ungrouped" area, let's keep the row with NULL group_id
-                # Check if exists
-                c.execute("INSERT OR REPLACE INTO pocket_links (pocket_id, group_id, sort_order) VALUES (?, NULL, ?)", (pocket_id, index))
-            else:
-                c.execute("INSERT OR REPLACE INTO pocket_links (pocket_id, group_id, sort_order) VALUES (?, ?, ?)", (pocket_id, target_group_id, index))
-        
-        conn.commit()
+        c.execute("BEGIN IMMEDIATE")
+        # Update both Group and Order for every pocket in the list provided by frontend.
+        # If ungrouped, keep the row with NULL group_id so sorting in the "Ungrouped" area is preserved.
+        c.executemany("""INSERT INTO pocket_links (pocket_id, group_id, sort_order) VALUES (?, ?, ?)
+                         ON CONFLICT(pocket_id) DO UPDATE SET group_id = excluded.group_id, sort_order = excluded.sort_order""",
+                      [(pocket_id, target_group_id, index) for index, pocket_id in enumerate(ordered_ids)])
+        c.execute("COMMIT")
         cache.clear()
         return jsonify({"success": True})
     except Exception as e:
+        if conn.in_transaction:
+            c.execute("ROLLBACK")
         return jsonify({"error": str(e)})
     finally:
         conn.close()
@@ -4370,14 +4770,15 @@ def api_move_pocket():
 @login_required
 def api_manage_group():
     # Handles Create and Update
-    data = request.json
+    data = request.get_json(silent=True) or {}
     group_id = data.get('id') # None if creating
     name = data.get('name')
     pocket_ids = data.get('pockets', []) # List of pocket IDs to assign
     
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect(isolation_level=None)
     c = conn.cursor()
     try:
+        c.execute("BEGIN IMMEDIATE")
         if not group_id:
             # CREATE
             c.execute("INSERT INTO groups (name) VALUES (?)", (name,))
@@ -4396,10 +4797,12 @@ def api_manage_group():
             c.execute("DELETE FROM pocket_links WHERE pocket_id = ?", (pid,))
             c.execute("INSERT INTO pocket_links (pocket_id, group_id) VALUES (?, ?)", (pid, group_id))
             
-        conn.commit()
+        c.execute("COMMIT")
         cache.clear()
         return jsonify({"success": True})
     except Exception as e:
+        if conn.in_transaction:
+            c.execute("ROLLBACK")
         return jsonify({"error": str(e)})
     finally:
         conn.close()
@@ -4407,20 +4810,23 @@ def api_manage_group():
 @app.route('/api/groups/delete', methods=['POST'])
 @login_required
 def api_delete_group():
-    data = request.json
+    data = request.get_json(silent=True) or {}
     group_id = data.get('id')
     
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect(isolation_level=None)
     c = conn.cursor()
     try:
+        c.execute("BEGIN IMMEDIATE")
         # Delete Group
         c.execute("DELETE FROM groups WHERE id = ?", (group_id,))
         # Unlink pockets (they become ungrouped)
         c.execute("DELETE FROM pocket_links WHERE group_id = ?", (group_id,))
-        conn.commit()
+        c.execute("COMMIT")
         cache.clear()
         return jsonify({"success": True})
     except Exception as e:
+        if conn.in_transaction:
+            c.execute("ROLLBACK")
         return jsonify({"error": str(e)})
     finally:
         conn.close()
@@ -4429,11 +4835,11 @@ def api_delete_group():
 @app.route('/api/assign-group', methods=['POST'])
 @login_required
 def api_assign_group():
-    data = request.json
+    data = request.get_json(silent=True) or {}
     pocket_id = data.get('pocketId')
     group_name = data.get('groupName') # If empty string, we treat as ungroup
     
-    conn = sqlite3.connect(DB_FILE)
+    conn = db_connect()
     c = conn.cursor()
     try:
         if not group_name or group_name.strip() == "":
@@ -4453,7 +4859,7 @@ def api_assign_group():
 @app.route('/api/set-card-spend', methods=['POST'])
 @login_required
 def api_set_card_spend():
-    data = request.json
+    data = request.get_json(silent=True) or {}
     return jsonify(set_spend_pocket_action(
         data.get('userId'),
         data.get('pocketId'),
@@ -4462,14 +4868,16 @@ def api_set_card_spend():
 
 @app.route('/api/savings')
 @login_required
+@etag_cached("savings")
 def api_savings():
     # Check if the frontend is asking for a forced refresh
     refresh = request.args.get('refresh') == 'true'
-    return jsonify(get_financial_data(force_refresh=refresh))
+    return get_financial_data(force_refresh=refresh)
 
 @app.route('/api/history')
 @login_required
-def api_history(): return jsonify(get_history())
+@etag_cached("history")
+def api_history(): return get_history()
 @app.route('/api/transactions')
 @login_required
 def api_transactions():
@@ -4482,73 +4890,74 @@ def api_transactions():
     # Get regular transactions
     cached_result = get_transactions_data(q, min_date, max_date, min_amt, max_amt)
 
-    # Create a new result dict to avoid mutating cached data
+    # Create a new result dict to avoid mutating cached data (the cached list itself is never modified)
+    cached_txs = cached_result.get("transactions", [])
     result = {
-        "transactions": list(cached_result.get("transactions", [])),  # Create a copy of the list
+        "transactions": cached_txs,
         "balance": cached_result.get("balance"),
         "allTransactions": cached_result.get("allTransactions", [])
     }
 
     # Get credit card transactions
     try:
-        conn = sqlite3.connect(DB_FILE)
+        # Date and amount filters run in SQL (the date range can use idx_cctx_sort)
+        where = []
+        params = []
+        if min_date:
+            where.append("ct.date >= ?")
+            params.append(min_date)
+        if max_date:
+            where.append("ct.date <= ?")
+            params.append(max_date)
+        if min_amt:
+            where.append("ABS(ct.amount) >= ?")
+            params.append(float(min_amt))
+        if max_amt:
+            where.append("ABS(ct.amount) <= ?")
+            params.append(float(max_amt))
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+        conn = db_connect()
         c = conn.cursor()
-        c.execute("""SELECT ct.transaction_id, ct.amount, ct.date, ct.merchant, ct.description, ct.is_pending, ct.created_at, ccc.account_name
-                     FROM credit_card_transactions ct
-                     LEFT JOIN credit_card_config ccc ON ct.account_id = ccc.account_id
-                     ORDER BY ct.date DESC, ct.created_at DESC""")
+        c.execute(f"""SELECT ct.transaction_id, ct.amount, ct.date, ct.merchant, ct.description, ct.is_pending, ct.created_at, ccc.account_name
+                      FROM credit_card_transactions ct
+                      LEFT JOIN credit_card_config ccc ON ct.account_id = ccc.account_id
+                      {where_sql}
+                      ORDER BY ct.date DESC, ct.created_at DESC""", params)
         rows = c.fetchall()
         conn.close()
 
-        credit_card_txs = []
-        for row in rows:
-            tx_date = row[2]  # date field
-            amount = row[1]  # amount (already in dollars)
-
-            # Apply filters if provided
-            if min_date and tx_date < min_date:
-                continue
-            if max_date and tx_date > max_date:
-                continue
-            if min_amt and abs(amount) < float(min_amt):
-                continue
-            if max_amt and abs(amount) > float(max_amt):
-                continue
-            # Search in merchant, description, and account name
-            if q:
-                search_term = q.lower()
-                merchant = (row[3] or "").lower()
-                description = (row[4] or "").lower()
-                account_name = (row[7] or "").lower()
-                if search_term not in merchant and search_term not in description and search_term not in account_name:
-                    continue
-
-            # Format as Crew transaction format
-            credit_card_txs.append({
-                "id": f"cc_{row[0]}",  # Prefix to avoid conflicts
-                "title": row[3] or row[4] or "Credit Card Transaction",
-                "description": row[4] or "",
-                "amount": -abs(amount),  # Negative for expenses
-                "date": tx_date,
-                "type": "DEBIT",
-                "subaccountId": None,
-                "isCreditCard": True,
-                "merchant": row[3],
-                "isPending": bool(row[5]),
-                "accountName": row[7] or "Credit Card"  # Add account name
-            })
-
-        # Merge and sort by pending status first, then by date
-        if result["transactions"]:
-            all_txs = result["transactions"] + credit_card_txs
-            # Sort by: pending first (True > False), then by date (newest first)
-            # Handle None dates by treating them as empty strings for sorting
-            all_txs.sort(key=lambda x: (not x.get("isPending", False), x.get("date") or ""), reverse=True)
-            result["transactions"] = all_txs
-        elif credit_card_txs:
-            # Sort credit card transactions only
-            credit_card_txs.sort(key=lambda x: (not x.get("isPending", False), x.get("date") or ""), reverse=True)
-            result["transactions"] = credit_card_txs
+        # Search in merchant, description, and account name (kept in Python for Unicode-aware lower())
+        if q:
+            search_term = q.lower()
+            rows = [row for row in rows
+                    if search_term in (row[3] or "").lower()
+                    or search_term in (row[4] or "").lower()
+                    or search_term in (row[7] or "").lower()]
+
+        # Format as Crew transaction format
+        credit_card_txs = [{
+            "id": f"cc_{transaction_id}",  # Prefix to avoid conflicts
+            "title": merchant or description or "Credit Card Transaction",
+            "description": description or "",
+            "amount": -abs(amount),  # Negative for expenses
+            "date": tx_date,
+            "type": "DEBIT",
+            "subaccountId": None,
+            "isCreditCard": True,
+            "merchant": merchant,
+            "isPending": bool(is_pending),
+            "accountName": account_name or "Credit Card"  # Add account name
+        } for transaction_id, amount, tx_date, merchant, description, is_pending, _, account_name in rows]
+
+        # Merge by pending status first, then by date. The cached Crew list is already sorted,
+        # so only the credit card rows need sorting before a linear merge into a fresh list.
+        if credit_card_txs:
+            credit_card_txs.sort(key=transaction_sort_key, reverse=True)
+            if cached_txs:
+                result["transactions"] = list(heapq.merge(cached_txs, credit_card_txs, key=transaction_sort_key, reverse=True))
+            else:
+                result["transactions"] = credit_card_txs
 
     except Exception as e:
         print(f"Error loading credit card transactions: {e}")
@@ -4618,11 +5027,11 @@ def api_pocket_transactions(pocket_id):
             }
         }
 
-        response = requests.post(URL, headers=headers, json={
+        response = http_session.post(URL, headers=headers, json={
             "operationName": "RecentActivity",
             "variables": variables,
             "query": query_string
-        })
+        }, timeout=CREW_TIMEOUT)
 
         if response.status_code != 200:
             return jsonify({"error": f"API Error: {response.text}"})
@@ -4632,8 +5041,9 @@ def api_pocket_transactions(pocket_id):
         if 'errors' in data:
             return jsonify({"error": data['errors'][0].get('message', 'Unknown error')})
 
-        edges = data.get('data', {}).get('account', {}).get('cashTransactions', {}).get('edges', [])
-        page_info = data.get('data', {}).get('account', {}).get('cashTransactions', {}).get('pageInfo', {})
+        cash_transactions = dig(data, CASH_TRANSACTIONS_PATH, {})
+        edges = cash_transactions.get('edges') or []
+        page_info = cash_transactions.get('pageInfo') or {}
 
         transactions = []
         for edge in edges:
@@ -4672,15 +5082,17 @@ def api_transaction_detail(tx_id): return jsonify(get_transaction_detail(tx_id))
 
 @app.route('/api/expenses')
 @login_required
+@etag_cached("expenses")
 def api_expenses():
     refresh = request.args.get('refresh') == 'true'
-    return jsonify(get_expenses_data(force_refresh=refresh))
+    return get_expenses_data(force_refresh=refresh)
 
 @app.route('/api/goals')
 @login_required
+@etag_cached("goals")
 def api_goals():
     refresh = request.args.get('refresh') == 'true'
-    return jsonify(get_goals_data(force_refresh=refresh))
+    return get_goals_data(force_refresh=refresh)
 
 @app.route('/api/trends')
 @login_required
@@ -4700,20 +5112,20 @@ def api_family_subaccounts():
 @app.route('/api/move-money', methods=['POST'])
 @login_required
 def api_move_money():
-    data = request.json
+    data = request.get_json(silent=True) or {}
     return jsonify(move_money(data.get('fromId'), data.get('toId'), data.get('amount'), data.get('memo')))
 
 @app.route('/api/delete-pocket', methods=['POST'])
 @login_required
 def api_delete_pocket():
-    data = request.json
+    data = request.get_json(silent=True) or {}
     return jsonify(delete_subaccount_action(data.get('id')))
 
 
 @app.route('/api/create-pocket', methods=['POST'])
 @login_required
 def api_create_pocket():
-    data = request.json
+    data = request.get_json(silent=True) or {}
     result = create_pocket(
         data.get('name'), 
         data.get('amount'), 
@@ -4727,10 +5139,11 @@ def api_create_pocket():
         group_id = data.get('groupId')
         
         # Assign to group in database
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
         try:
-            c.execute("INSERT OR REPLACE INTO pocket_links (pocket_id, group_id, sort_order) VALUES (?, ?, ?)", 
+            c.execute("""INSERT INTO pocket_links (pocket_id, group_id, sort_order) VALUES (?, ?, ?)
+                         ON CONFLICT(pocket_id) DO UPDATE SET group_id = excluded.group_id, sort_order = excluded.sort_order""",
                      (pocket_id, group_id, 0))
             conn.commit()
         except Exception as e:
@@ -4743,14 +5156,14 @@ def api_create_pocket():
 @app.route('/api/delete-bill', methods=['POST'])
 @login_required
 def api_delete_bill():
-    data = request.json
+    data = request.get_json(silent=True) or {}
     return jsonify(delete_bill_action(data.get('id')))
 
 
 @app.route('/api/create-bill', methods=['POST'])
 @login_required
 def api_create_bill():
-    data = request.json
+    data = request.get_json(silent=True) or {}
     return jsonify(create_bill_action(
         data.get('name'),
         data.get('amount'),
@@ -4783,48 +5196,79 @@ def api_get_lunchflow_config():
         "isConfigured": api_key is not None
     })
 
+LUNCHFLOW_API_KEY_MAX_LEN = 256
+LUNCHFLOW_ACCOUNTS_URL = "https://www.lunchflow.app/api/v1/accounts"
+# API hosts in the order they are tried; the second is only used when the first can't be reached
+LUNCHFLOW_API_BASES = ("https://www.lunchflow.app/api/v1", "https://lunchflow.com/api/v1")
+
+def lunchflow_get(path, api_key, timeout=30):
+    """GET a LunchFlow API path over the shared session, falling back to the next host on connection errors"""
+    headers = {"x-api-key": api_key, "accept": "application/json"}
+    for base in LUNCHFLOW_API_BASES[:-1]:
+        try:
+            return http_session.get(f"{base}{path}", headers=headers, timeout=timeout)
+        except requests.RequestException as e:
+            print(f"⚠️ LunchFlow request to {base} failed ({e}), trying next host")
+    return http_session.get(f"{LUNCHFLOW_API_BASES[-1]}{path}", headers=headers, timeout=timeout)
+
+# Hashes of keys LunchFlow accepted recently, so re-saving the same key skips the round trip
+validated_lunchflow_keys = SimpleCache(ttl_seconds=300)
+
+def validate_lunchflow_key(api_key):
+    """True if LunchFlow accepts the API key"""
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+    if validated_lunchflow_keys.get(key_hash):
+        return True
+
+    # HEAD checks auth without transferring the account list; fall back to GET if HEAD isn't supported
+    headers = {"x-api-key": api_key}
+    response = http_session.head(LUNCHFLOW_ACCOUNTS_URL, headers=headers, timeout=10)
+    if response.status_code not in (200, 401, 403):
+        response = http_session.get(LUNCHFLOW_ACCOUNTS_URL, headers=headers, timeout=10)
+
+    if response.status_code != 200:
+        return False
+    validated_lunchflow_keys.set(key_hash, True)
+    return True
+
 @app.route('/api/lunchflow/save-key', methods=['POST'])
 @login_required
 def api_save_lunchflow_key():
     """Save LunchFlow API key (called from Credit Cards section)"""
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     api_key = data.get('apiKey', '').strip()
 
     if not api_key:
         return jsonify({"success": False, "error": "API key is required"}), 400
 
-    # Validate key by attempting to fetch accounts
-    try:
-        response = requests.get(
-            "https://www.lunchflow.app/api/v1/accounts",
-            headers={"x-api-key": api_key},
-            timeout=10
-        )
+    # Reject obviously malformed keys before spending a round trip on them
+    if len(api_key) > LUNCHFLOW_API_KEY_MAX_LEN or not api_key.isascii() or not api_key.isprintable() or ' ' in api_key:
+        return jsonify({"success": False, "error": "Invalid API key"}), 400
 
-        if response.status_code != 200:
+    # Validate key against the accounts endpoint
+    try:
+        if not validate_lunchflow_key(api_key):
             return jsonify({"success": False, "error": "Invalid API key"}), 400
 
     except Exception as e:
         return jsonify({"success": False, "error": f"Validation failed: {str(e)}"}), 500
 
     # Save to database
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-
-    c.execute("SELECT id FROM lunchflow_config LIMIT 1")
-    existing = c.fetchone()
-
-    if existing:
-        c.execute("UPDATE lunchflow_config SET api_key = ?, is_valid = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-                  (api_key, existing[0]))
-    else:
-        c.execute("INSERT INTO lunchflow_config (api_key, is_valid) VALUES (?, 1)", (api_key,))
-
-    conn.commit()
-    conn.close()
+    with db_pool.acquire() as conn:
+        c = conn.cursor()
+        c.execute("""INSERT INTO lunchflow_config (id, api_key, is_valid) VALUES (1, ?, 1)
+                     ON CONFLICT(id) DO UPDATE SET api_key = excluded.api_key, is_valid = 1,
+                     updated_at = CURRENT_TIMESTAMP""", (api_key,))
+        conn.commit()
 
+    cache.clear()
     return jsonify({"success": True})
 
+def stream_upstream_json(response):
+    """Relay a streamed upstream JSON body to the client without decoding and re-encoding it"""
+    return Response(response.iter_content(chunk_size=8192), status=200,
+                    content_type=response.headers.get('Content-Type', 'application/json'))
+
 @app.route('/api/lunchflow/accounts')
 @login_required
 def api_lunchflow_accounts():
@@ -4839,14 +5283,13 @@ def api_lunchflow_accounts():
             "accept": "application/json"
         }
         # Use www.lunchflow.app as per documentation
-        response = requests.get("https://www.lunchflow.app/api/v1/accounts", headers=headers, timeout=30)
+        response = http_session.get(LUNCHFLOW_ACCOUNTS_URL, headers=headers, timeout=30, stream=True)
         
         if response.status_code != 200:
             return jsonify({"error": f"LunchFlow API error: {response.status_code} - {response.text}"}), response.status_code
         
-        data = response.json()
-        # Return the data in the expected format with accounts array
-        return jsonify(data)
+        # LunchFlow already returns the accounts array in the expected format; pass the body through untouched
+        return stream_upstream_json(response)
     except requests.exceptions.ConnectionError as e:
         return jsonify({"error": f"Connection error: Unable to connect to LunchFlow API. Please check your internet connection and try again. ({str(e)})"}), 500
     except requests.exceptions.Timeout as e:
@@ -4860,7 +5303,7 @@ def api_lunchflow_accounts():
 @login_required
 def api_set_credit_card():
     """Store the selected credit card account ID (without creating pocket yet)"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     account_id = data.get('accountId')
     account_name = data.get('accountName', '')
 
@@ -4868,16 +5311,18 @@ def api_set_credit_card():
         return jsonify({"error": "accountId is required"}), 400
 
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
+        with db_pool.acquire() as conn:
+            c = conn.cursor()
 
-        # Store the account info with provider='lunchflow'
-        c.execute("""INSERT OR REPLACE INTO credit_card_config
-                     (account_id, account_name, provider, created_at)
-                     VALUES (?, ?, 'lunchflow', CURRENT_TIMESTAMP)""",
-                  (account_id, account_name))
-        conn.commit()
-        conn.close()
+            # Store the account info with provider='lunchflow' (re-selecting an account starts it over without a pocket)
+            c.execute("""INSERT INTO credit_card_config
+                         (account_id, account_name, provider, created_at)
+                         VALUES (?, ?, 'lunchflow', CURRENT_TIMESTAMP)
+                         ON CONFLICT(account_id) DO UPDATE SET
+                         account_name = excluded.account_name, provider = 'lunchflow', created_at = CURRENT_TIMESTAMP,
+                         pocket_id = NULL, current_balance = 0, batch_mode = 1""",
+                      (account_id, account_name))
+            conn.commit()
 
         cache.clear()
         return jsonify({"success": True, "message": "Credit card account saved", "needsBalanceSync": True})
@@ -4897,13 +5342,12 @@ def api_get_balance(account_id):
             "x-api-key": api_key,
             "accept": "application/json"
         }
-        response = requests.get(f"https://www.lunchflow.app/api/v1/accounts/{account_id}/balance", headers=headers, timeout=30)
+        response = http_session.get(f"https://www.lunchflow.app/api/v1/accounts/{account_id}/balance", headers=headers, timeout=30, stream=True)
         
         if response.status_code != 200:
             return jsonify({"error": f"LunchFlow API error: {response.status_code} - {response.text}"}), response.status_code
         
-        data = response.json()
-        return jsonify(data)
+        return stream_upstream_json(response)
     except requests.exceptions.ConnectionError as e:
         return jsonify({"error": f"Connection error: {str(e)}"}), 500
     except requests.exceptions.Timeout as e:
@@ -4915,7 +5359,7 @@ def api_get_balance(account_id):
 @login_required
 def api_create_pocket_with_balance():
     """Create the credit card pocket and optionally sync balance"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     account_id = data.get('accountId')
     sync_balance = data.get('syncBalance', False)
     
@@ -4923,14 +5367,12 @@ def api_create_pocket_with_balance():
         return jsonify({"error": "accountId is required"}), 400
     
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        
         # Get account name
-        c.execute("SELECT account_name FROM credit_card_config WHERE account_id = ?", (account_id,))
-        row = c.fetchone()
+        with db_pool.acquire() as conn:
+            c = conn.cursor()
+            c.execute("SELECT account_name FROM credit_card_config WHERE account_id = ?", (account_id,))
+            row = c.fetchone()
         if not row:
-            conn.close()
             return jsonify({"error": "Account not found. Please select an account first."}), 400
         
         account_name = row[0]
@@ -4942,7 +5384,7 @@ def api_create_pocket_with_balance():
         if api_key:
             try:
                 headers = {"x-api-key": api_key, "accept": "application/json"}
-                response = requests.get(f"https://www.lunchflow.app/api/v1/accounts/{account_id}/balance", headers=headers, timeout=30)
+                response = http_session.get(f"https://www.lunchflow.app/api/v1/accounts/{account_id}/balance", headers=headers, timeout=30)
                 if response.status_code == 200:
                     balance_data = response.json()
                     # Balance is already in dollars
@@ -4959,52 +5401,55 @@ def api_create_pocket_with_balance():
         pocket_result = create_pocket(pocket_name, "0", initial_amount, f"Credit card tracking pocket for {account_name}")
         
         if "error" in pocket_result:
-            conn.close()
             return jsonify({"error": f"Failed to create pocket: {pocket_result['error']}"}), 500
         
         pocket_id = pocket_result.get("result", {}).get("id")
         if not pocket_id:
-            conn.close()
             return jsonify({"error": "Pocket was created but no ID was returned"}), 500
         
         # Update the config with pocket_id and current_balance
-        c.execute("UPDATE credit_card_config SET pocket_id = ?, current_balance = ? WHERE account_id = ?",
-                 (pocket_id, current_balance_value, account_id))
-        conn.commit()
-        conn.close()
+        with db_pool.acquire() as conn:
+            c = conn.cursor()
+            c.execute("UPDATE credit_card_config SET pocket_id = ?, current_balance = ? WHERE account_id = ?",
+                     (pocket_id, current_balance_value, account_id))
+            conn.commit()
         
         cache.clear()
         return jsonify({"success": True, "message": "Credit card pocket created", "pocketId": pocket_id, "syncedBalance": sync_balance})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+CC_STATUS_CACHE_TTL = 30  # seconds
+
 @app.route('/api/lunchflow/credit-card-status')
 @login_required
 def api_credit_card_status():
     """Get the current credit card account configuration (unified for both providers)"""
+    # The frontend polls this; mutations clear the cache, the short TTL covers background sync updates
+    cache_key = f"cc_status:{current_user.id}"
+    cached_status = cache.get(cache_key, max_age=CC_STATUS_CACHE_TTL)
+    if cached_status:
+        return jsonify(cached_status)
+
     api_key = get_lunchflow_api_key()
 
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
+        with db_read_pool.acquire() as conn:
+            c = conn.cursor()
 
-        # Get first account for backward compatibility
-        c.execute("SELECT account_id, account_name, pocket_id, created_at, provider FROM credit_card_config LIMIT 1")
-        row = c.fetchone()
+            # One pass over the configs: the first row backs the single-account fields (backward compatibility),
+            # every non-temp row goes into the multi-account list (SimpleFin, manual, etc.)
+            c.execute("SELECT account_id, account_name, pocket_id, created_at, provider FROM credit_card_config ORDER BY id")
+            config_rows = c.fetchall()
 
-        # Get ALL configured accounts for multi-account support (SimpleFin, manual, etc.)
-        c.execute("SELECT account_id, account_name, pocket_id, created_at, provider FROM credit_card_config WHERE account_id != 'temp_simplefin'")
-        simplefin_rows = c.fetchall()
+            # Check if SimpleFin access URL exists and is valid, and get last sync time
+            c.execute("SELECT access_url, is_valid, last_sync FROM simplefin_config LIMIT 1")
+            simplefin_url = c.fetchone()
 
-        # Check if SimpleFin access URL exists and is valid, and get last sync time
-        c.execute("SELECT access_url, is_valid, last_sync FROM simplefin_config LIMIT 1")
-        simplefin_url = c.fetchone()
         has_simplefin_access_url = bool(simplefin_url and simplefin_url[0])
         simplefin_token_invalid = bool(simplefin_url and simplefin_url[0] and simplefin_url[1] == 0)
         last_sync = simplefin_url[2] if simplefin_url and len(simplefin_url) > 2 else None
 
-        conn.close()
-
         result = {
             "hasApiKey": bool(api_key),
             "configured": False,
@@ -5021,6 +5466,7 @@ def api_credit_card_status():
         }
 
         # Backward compatibility: populate single account fields
+        row = config_rows[0] if config_rows else None
         if row:
             account_id = row[0]
             # Check if this is a real account or just a temp record from token claim
@@ -5036,7 +5482,7 @@ def api_credit_card_status():
                 result["provider"] = row[4] if len(row) > 4 else "lunchflow"
 
         # Populate accounts array for SimpleFin
-        for sf_row in simplefin_rows:
+        for sf_row in config_rows:
             account_id = sf_row[0]
             # Skip temp records
             if account_id == 'temp_simplefin':
@@ -5051,6 +5497,7 @@ def api_credit_card_status():
                 "pocketCreated": bool(sf_row[2])
             })
 
+        cache.set(cache_key, result)
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -5059,8 +5506,7 @@ def api_credit_card_status():
 @login_required
 def api_manual_cc_create():
     """Create a manual credit card account with a Crew pocket (no sync provider)"""
-    import uuid
-    data = request.json
+    data = request.get_json(silent=True) or {}
     account_name = (data.get('accountName') or '').strip()
     initial_balance = float(data.get('initialBalance') or 0)
 
@@ -5083,7 +5529,7 @@ def api_manual_cc_create():
         if not pocket_id:
             return jsonify({"error": "Pocket created but no ID returned"}), 500
 
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
         c.execute("""
             INSERT INTO credit_card_config
@@ -5103,7 +5549,7 @@ def api_manual_cc_create():
 @login_required
 def api_manual_cc_top_up():
     """Move the difference from Checking into a manual CC pocket"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     account_id = data.get('accountId')
     new_balance = data.get('newBalance')
 
@@ -5113,7 +5559,7 @@ def api_manual_cc_top_up():
     new_balance = float(new_balance)
 
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
         c.execute("SELECT pocket_id, account_name FROM credit_card_config WHERE account_id = ? AND provider = 'manual'", (account_id,))
         row = c.fetchone()
@@ -5131,22 +5577,22 @@ def api_manual_cc_top_up():
         pocket_sub = next((s for s in all_subs.get("subaccounts", []) if s["id"] == pocket_id), None)
         current_pocket_balance = pocket_sub["balance"] if pocket_sub else 0
 
-        checking_sub = next((s for s in all_subs.get("subaccounts", []) if s["name"] == "Checking"), None)
-        if not checking_sub:
+        checking_id = get_checking_subaccount_id()
+        if not checking_id:
             return jsonify({"error": "Could not find Checking account"}), 500
 
         difference = new_balance - current_pocket_balance
         amount_moved = 0
 
         if difference > 0.01:
-            result = move_money(checking_sub["id"], pocket_id, str(difference), f"Top up: {account_name}")
+            result = move_money(checking_id, pocket_id, str(difference), f"Top up: {account_name}")
             if "error" in result:
                 return jsonify({"error": f"Transfer failed: {result['error']}"}), 500
             amount_moved = difference
 
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
-        c.execute("UPDATE credit_card_config SET current_balance = ? WHERE account_id = ?", (new_balance, account_id))
+        c.execute(UPDATE_CC_BALANCE_SQL, (new_balance, account_id))
         conn.commit()
         conn.close()
 
@@ -5166,13 +5612,13 @@ def api_manual_cc_top_up():
 @login_required
 def api_manual_cc_remove():
     """Remove a manual CC account: return funds to Checking and delete pocket"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     account_id = data.get('accountId')
     if not account_id:
         return jsonify({"error": "accountId is required"}), 400
 
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
         c.execute("SELECT pocket_id FROM credit_card_config WHERE account_id = ? AND provider = 'manual'", (account_id,))
         row = c.fetchone()
@@ -5188,15 +5634,15 @@ def api_manual_cc_remove():
                 pocket_sub = next((s for s in all_subs.get("subaccounts", []) if s["id"] == pocket_id), None)
                 current_balance = pocket_sub["balance"] if pocket_sub else 0
 
-                checking_sub = next((s for s in all_subs.get("subaccounts", []) if s["name"] == "Checking"), None)
-                if checking_sub and current_balance > 0.01:
-                    move_money(pocket_id, checking_sub["id"], str(current_balance), "Returning manual CC pocket funds to Safe-to-Spend")
+                checking_id = get_checking_subaccount_id()
+                if checking_id and current_balance > 0.01:
+                    move_money(pocket_id, checking_id, str(current_balance), "Returning manual CC pocket funds to Safe-to-Spend")
 
                 delete_subaccount_action(pocket_id)
             except Exception as e:
                 print(f"Warning: Error deleting pocket: {e}")
 
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
         c.execute("DELETE FROM credit_card_config WHERE account_id = ?", (account_id,))
         conn.commit()
@@ -5212,7 +5658,7 @@ def api_manual_cc_remove():
 @login_required
 def api_sync_balance():
     """Sync the pocket balance to match the credit card balance"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     account_id = data.get('accountId')
     
     if not account_id:
@@ -5220,11 +5666,10 @@ def api_sync_balance():
     
     try:
         # Get pocket_id from database
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("SELECT pocket_id FROM credit_card_config WHERE account_id = ?", (account_id,))
-        row = c.fetchone()
-        conn.close()
+        with db_pool.acquire() as conn:
+            c = conn.cursor()
+            c.execute("SELECT pocket_id FROM credit_card_config WHERE account_id = ?", (account_id,))
+            row = c.fetchone()
         
         if not row or not row[0]:
             return jsonify({"error": "No pocket found for this account"}), 400
@@ -5237,7 +5682,7 @@ def api_sync_balance():
             return jsonify({"error": "LunchFlow API key not configured"}), 400
         
         headers = {"x-api-key": api_key, "accept": "application/json"}
-        response = requests.get(f"https://www.lunchflow.app/api/v1/accounts/{account_id}/balance", headers=headers, timeout=30)
+        response = http_session.get(f"https://www.lunchflow.app/api/v1/accounts/{account_id}/balance", headers=headers, timeout=30)
         
         if response.status_code != 200:
             return jsonify({"error": f"Failed to get balance: {response.status_code}"}), response.status_code
@@ -5248,45 +5693,28 @@ def api_sync_balance():
         target_balance = abs(balance_amount)
 
         # Save current balance to database
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("UPDATE credit_card_config SET current_balance = ? WHERE account_id = ?", (target_balance, account_id))
-        conn.commit()
-        conn.close()
+        with db_pool.acquire() as conn:
+            c = conn.cursor()
+            c.execute(UPDATE_CC_BALANCE_SQL, (target_balance, account_id))
+            conn.commit()
 
         # Get current pocket balance
         headers_crew = get_crew_headers()
         if not headers_crew:
             return jsonify({"error": "Crew credentials not found"}), 400
+
+        # Look up the Checking subaccount while the pocket balance request is in flight
+        checking_future = crew_io_executor.submit(get_checking_subaccount_id)
         
-        query_string = """query GetSubaccount($id: ID!) { node(id: $id) { ... on Subaccount { id overallBalance } } }"""
-        response_crew = requests.post(URL, headers=headers_crew, json={
-            "operationName": "GetSubaccount",
-            "variables": {"id": pocket_id},
-            "query": query_string
-        })
-        
-        crew_data = response_crew.json()
-        current_balance = 0
-        try:
-            current_balance = crew_data.get("data", {}).get("node", {}).get("overallBalance", 0) / 100.0
-        except:
-            pass
+        current_balance = read_pocket_balance(pocket_id, headers_crew)
+        if current_balance is None:
+            return jsonify({"error": "Could not read the pocket balance from Crew"}), 502
         
         # Calculate difference
         difference = target_balance - current_balance
         
         # Get Checking subaccount ID (not Account ID)
-        all_subs = get_subaccounts_list()
-        if "error" in all_subs:
-            return jsonify({"error": "Could not get subaccounts list"}), 400
-        
-        checking_subaccount_id = None
-        for sub in all_subs.get("subaccounts", []):
-            if sub["name"] == "Checking":
-                checking_subaccount_id = sub["id"]
-                break
-        
+        checking_subaccount_id = checking_future.result()
         if not checking_subaccount_id:
             return jsonify({"error": "Could not find Checking subaccount"}), 400
         
@@ -5307,74 +5735,65 @@ def api_sync_balance():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def teardown_credit_card_pocket(account_id, pocket_id):
+    """Return a tracked card's pocket balance to Checking, delete the pocket, and drop its config and history.
+    Returns False, changing nothing, if the pocket balance can't be read."""
+    # Get current pocket balance and return it to Checking
+    headers_crew = get_crew_headers()
+    if headers_crew and pocket_id:
+        try:
+            # Look up the Checking subaccount while the pocket balance request is in flight
+            checking_future = crew_io_executor.submit(get_checking_subaccount_id)
+
+            current_balance = read_pocket_balance(pocket_id, headers_crew)
+            if current_balance is None:
+                print(f"Warning: Could not read balance of pocket {pocket_id}; keeping it")
+                return False
+
+            # Return money to Checking if there's a balance
+            checking_subaccount_id = checking_future.result()
+            if checking_subaccount_id and current_balance > 0.01:
+                move_money(pocket_id, checking_subaccount_id, str(current_balance), "Returning credit card pocket funds to Safe-to-Spend")
+
+            # Delete the pocket
+            delete_subaccount_action(pocket_id)
+        except Exception as e:
+            print(f"Warning: Error deleting pocket: {e}")
+
+    # Delete ALL config rows for this account and transaction history, regardless of pocket_id status
+    with db_pool.acquire() as conn:
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")  # Take the write lock up front; both deletes commit together
+        c.execute("DELETE FROM credit_card_config WHERE account_id = ?", (account_id,))
+        c.execute("DELETE FROM credit_card_transactions WHERE account_id = ?", (account_id,))
+        conn.commit()
+
+    cache.clear()
+    return True
+
 @app.route('/api/lunchflow/change-account', methods=['POST'])
 @login_required
 def api_change_account():
     """Delete the credit card pocket, return money to safe-to-spend, and clear config"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        
-        # Get current config - find any configured account with a pocket
-        c.execute("SELECT account_id, pocket_id FROM credit_card_config WHERE pocket_id IS NOT NULL LIMIT 1")
-        row = c.fetchone()
-        
-        if not row:
-            # Check if there's any config at all (even without pocket)
-            c.execute("SELECT account_id, pocket_id FROM credit_card_config LIMIT 1")
+        with db_pool.acquire() as conn:
+            c = conn.cursor()
+
+            # Get current config - find any configured account with a pocket
+            c.execute("SELECT account_id, pocket_id FROM credit_card_config WHERE pocket_id IS NOT NULL LIMIT 1")
             row = c.fetchone()
+
             if not row:
-                conn.close()
-                return jsonify({"error": "No credit card account configured"}), 400
-            # Get account_id even if pocket_id is NULL
-            account_id = row[0]
-            pocket_id = row[1] if len(row) > 1 else None
-        else:
-            account_id, pocket_id = row[0], row[1]
-        
-        # Get current pocket balance and return it to Checking
-        headers_crew = get_crew_headers()
-        if headers_crew and pocket_id:
-            try:
-                query_string = """query GetSubaccount($id: ID!) { node(id: $id) { ... on Subaccount { id overallBalance } } }"""
-                response_crew = requests.post(URL, headers=headers_crew, json={
-                    "operationName": "GetSubaccount",
-                    "variables": {"id": pocket_id},
-                    "query": query_string
-                })
-                
-                crew_data = response_crew.json()
-                current_balance = 0
-                try:
-                    current_balance = crew_data.get("data", {}).get("node", {}).get("overallBalance", 0) / 100.0
-                except:
-                    pass
-                
-                # Return money to Checking if there's a balance
-                all_subs = get_subaccounts_list()
-                if "error" not in all_subs:
-                    checking_subaccount_id = None
-                    for sub in all_subs.get("subaccounts", []):
-                        if sub["name"] == "Checking":
-                            checking_subaccount_id = sub["id"]
-                            break
-                    
-                    if checking_subaccount_id and current_balance > 0.01:
-                        move_money(pocket_id, checking_subaccount_id, str(current_balance), "Returning credit card pocket funds to Safe-to-Spend")
-                
-                # Delete the pocket
-                delete_subaccount_action(pocket_id)
-            except Exception as e:
-                print(f"Warning: Error deleting pocket: {e}")
-        
-        # Delete ALL config rows for this account and transaction history (user will select a new account)
-        # Delete all rows regardless of pocket_id status to ensure clean state
-        c.execute("DELETE FROM credit_card_config WHERE account_id = ?", (account_id,))
-        c.execute("DELETE FROM credit_card_transactions WHERE account_id = ?", (account_id,))
-        conn.commit()
-        conn.close()
-        
-        cache.clear()
+                # Check if there's any config at all (even without pocket)
+                c.execute("SELECT account_id, pocket_id FROM credit_card_config LIMIT 1")
+                row = c.fetchone()
+
+        if not row:
+            return jsonify({"error": "No credit card account configured"}), 400
+
+        # account_id is set even if pocket_id is NULL; the user will select a new account
+        if not teardown_credit_card_pocket(row[0], row[1]):
+            return jsonify({"error": "Could not read the pocket balance; nothing was changed, try again"}), 502
         return jsonify({"success": True, "message": "Account changed. Pocket deleted and funds returned to Safe-to-Spend."})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -5384,61 +5803,17 @@ def api_change_account():
 def api_stop_tracking():
     """Delete the credit card pocket, return money to safe-to-spend, and delete all config"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        
         # Get current config
-        c.execute("SELECT account_id, pocket_id FROM credit_card_config WHERE pocket_id IS NOT NULL LIMIT 1")
-        row = c.fetchone()
+        with db_pool.acquire() as conn:
+            c = conn.cursor()
+            c.execute("SELECT account_id, pocket_id FROM credit_card_config WHERE pocket_id IS NOT NULL LIMIT 1")
+            row = c.fetchone()
         
         if not row:
-            conn.close()
             return jsonify({"error": "No credit card account configured"}), 400
-        
-        account_id, pocket_id = row[0], row[1]
-        
-        # Get current pocket balance and return it to Checking
-        headers_crew = get_crew_headers()
-        if headers_crew and pocket_id:
-            try:
-                query_string = """query GetSubaccount($id: ID!) { node(id: $id) { ... on Subaccount { id overallBalance } } }"""
-                response_crew = requests.post(URL, headers=headers_crew, json={
-                    "operationName": "GetSubaccount",
-                    "variables": {"id": pocket_id},
-                    "query": query_string
-                })
-                
-                crew_data = response_crew.json()
-                current_balance = 0
-                try:
-                    current_balance = crew_data.get("data", {}).get("node", {}).get("overallBalance", 0) / 100.0
-                except:
-                    pass
-                
-                # Return money to Checking if there's a balance
-                all_subs = get_subaccounts_list()
-                if "error" not in all_subs:
-                    checking_subaccount_id = None
-                    for sub in all_subs.get("subaccounts", []):
-                        if sub["name"] == "Checking":
-                            checking_subaccount_id = sub["id"]
-                            break
-                    
-                    if checking_subaccount_id and current_balance > 0.01:
-                        move_money(pocket_id, checking_subaccount_id, str(current_balance), "Returning credit card pocket funds to Safe-to-Spend")
-                
-                # Delete the pocket
-                delete_subaccount_action(pocket_id)
-            except Exception as e:
-                print(f"Warning: Error deleting pocket: {e}")
-        
-        # Delete all credit card config and transactions
-        c.execute("DELETE FROM credit_card_config WHERE account_id = ?", (account_id,))
-        c.execute("DELETE FROM credit_card_transactions WHERE account_id = ?", (account_id,))
-        conn.commit()
-        conn.close()
-        
-        cache.clear()
+
+        if not teardown_credit_card_pocket(row[0], row[1]):
+            return jsonify({"error": "Could not read the pocket balance; nothing was changed, try again"}), 502
         return jsonify({"success": True, "message": "Tracking stopped. Pocket deleted and funds returned to Safe-to-Spend."})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -5447,8 +5822,9 @@ def api_stop_tracking():
 # --- CREDIT CARD TRANSACTION SYNCING ---
 def check_credit_card_transactions():
     """Check for new credit card transactions and update balance (supports both LunchFlow and SimpleFin)"""
+    # Dedicated connection per run (not from the request pool), always closed in finally
+    conn = db_connect()
     try:
-        conn = sqlite3.connect(DB_FILE)
         c = conn.cursor()
 
         # Get ALL credit card account configs with provider info (no LIMIT 1)
@@ -5460,8 +5836,7 @@ def check_credit_card_transactions():
             c.execute("SELECT account_id, provider FROM credit_card_config")
             all_configs = c.fetchall()
             if all_configs:
-                print(f"⚠️ Found credit card configs but none have pocket_id set: {all_configs}")
-            conn.close()
+                sync_logger.warning("⚠️ Found credit card configs but none have pocket_id set: %s", all_configs)
             return
 
         # Get SimpleFin access URL and last sync time
@@ -5471,10 +5846,10 @@ def check_credit_card_transactions():
         db_last_sync = url_row[1] if url_row and len(url_row) > 1 else None
 
         # Initialize in-memory rate limiter from database if not already set
-        global _last_simplefin_sync
-        if db_last_sync and not _last_simplefin_sync:
+        global _last_simplefin_sync, _last_simplefin_sync_loaded, _simplefin_batch_digest, _simplefin_batch_etag
+        if db_last_sync and not _last_simplefin_sync_loaded and not _last_simplefin_sync:
+            _last_simplefin_sync_loaded = True
             # Parse ISO timestamp and convert to Unix timestamp
-            from datetime import datetime
             try:
                 last_sync_dt = datetime.fromisoformat(db_last_sync.replace('Z', '+00:00'))
                 last_sync_timestamp = last_sync_dt.timestamp()
@@ -5482,9 +5857,9 @@ def check_credit_card_transactions():
                 for row in rows:
                     if row[2] == 'simplefin':  # provider
                         _last_simplefin_sync[row[0]] = last_sync_timestamp
-                print(f"📊 Initialized SimpleFin rate limiter from database: last sync was {db_last_sync}", flush=True)
+                sync_logger.info("📊 Initialized SimpleFin rate limiter from database: last sync was %s", db_last_sync)
             except Exception as e:
-                print(f"⚠️ Failed to parse last_sync from database: {e}", flush=True)
+                sync_logger.warning("⚠️ Failed to parse last_sync from database: %s", e)
 
         # Determine which SimpleFin accounts are due for sync
         simplefin_to_sync = []
@@ -5495,22 +5870,19 @@ def check_credit_card_transactions():
                     if should_sync:
                         simplefin_to_sync.append((row[0], row[1], reason))
                     else:
-                        print(f"⏰ SimpleFin sync skipped for account {row[0]} ({reason})", flush=True)
+                        sync_logger.debug("⏰ SimpleFin sync skipped for account %s (%s)", row[0], reason)
         else:
             for row in rows:
                 if row[2] == 'simplefin':
-                    print(f"⚠️ SimpleFin access URL not found in simplefin_config", flush=True)
+                    sync_logger.warning("⚠️ SimpleFin access URL not found in simplefin_config")
                     break
 
         # Batch fetch SimpleFin data for all due accounts in a single request
         simplefin_data = None
+        simplefin_unchanged = False
+        batch_digest = batch_etag = None
         if simplefin_to_sync:
-            from datetime import datetime, timedelta
-            tz = get_configured_timezone()
-            now_local = datetime.now(tz) if tz else datetime.now()
-            start_date = now_local - timedelta(days=30)
-            start_timestamp = int(start_date.timestamp())
-            end_timestamp = int(now_local.timestamp())
+            start_timestamp, end_timestamp = simplefin_sync_window()
             params = [
                 ('start-date', start_timestamp),
                 ('end-date', end_timestamp),
@@ -5518,76 +5890,116 @@ def check_credit_card_transactions():
             ]
             for acc_id, _, _ in simplefin_to_sync:
                 params.append(('account', acc_id))
-            print(f"📡 Batch fetching SimpleFin data for {len(simplefin_to_sync)} account(s) in one request", flush=True)
-            response = requests.get(f"{simplefin_access_url}/accounts", params=params, timeout=60)
-            if response.status_code == 200:
-                simplefin_data = response.json()
-                print(f"✅ SimpleFin batch fetch returned {len(simplefin_data.get('accounts', []))} accounts", flush=True)
+            sync_logger.info("📡 Batch fetching SimpleFin data for %d account(s) in one request", len(simplefin_to_sync))
+            request_headers = {"If-None-Match": _simplefin_batch_etag} if _simplefin_batch_etag else None
+            response = http_session.get(f"{simplefin_access_url}/accounts", params=params, headers=request_headers, timeout=60)
+            if response.status_code == 304:
+                simplefin_unchanged = True
+            elif response.status_code == 200:
+                # The server may ignore If-None-Match, so also compare the body with the last processed one
+                batch_digest = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+                batch_etag = response.headers.get("ETag")
+                if batch_digest == _simplefin_batch_digest:
+                    simplefin_unchanged = True
+                else:
+                    simplefin_data = decode_json_response(response)
+                    sync_logger.info("✅ SimpleFin batch fetch returned %d accounts", len(simplefin_data.get('accounts', [])))
             else:
-                print(f"❌ SimpleFin API error: {response.status_code} - {response.text}", flush=True)
+                sync_logger.error("❌ SimpleFin API error: %s - %s", response.status_code, response.text)
                 if response.status_code == 403:
-                    print("🚫 SimpleFin token has been revoked or is invalid", flush=True)
-                    c.execute("UPDATE simplefin_config SET is_valid = 0")
+                    sync_logger.error("🚫 SimpleFin token has been revoked or is invalid")
+                    c.execute(INVALIDATE_SIMPLEFIN_SQL)
                     conn.commit()
-
-        # Process each account
-        for row in rows:
-            account_id, pocket_id, provider = row
-            print(f"🔍 Checking transactions for {provider} account {account_id}, pocket {pocket_id}", flush=True)
-
-            # Handle based on provider
-            if provider == 'lunchflow':
-                api_key = get_lunchflow_api_key()
-                if not api_key:
-                    print("⚠️ LUNCHFLOW_API_KEY not set")
-                    continue
-                check_lunchflow_transactions(conn, c, account_id, pocket_id, api_key)
-
-            elif provider == 'simplefin':
-                sf_entry = next((a for a in simplefin_to_sync if a[0] == account_id), None)
-                if not sf_entry or simplefin_data is None:
-                    continue  # Not due for sync, or batch fetch failed
-
-                _, _, reason = sf_entry
-                print(f"✅ Processing SimpleFin account {account_id} from batch data ({reason})", flush=True)
-                check_simplefin_transactions(conn, c, account_id, pocket_id, simplefin_access_url, prefetched_data=simplefin_data)
-
-                # Update per-account last sync time
-                _last_simplefin_sync[account_id] = time.time()
-
-            elif provider == 'manual':
-                pass  # Manual accounts are not auto-synced
+            if simplefin_unchanged:
+                sync_logger.info("💤 SimpleFin data unchanged since the last sync, skipping processing")
+                now = time.time()
+                for acc_id, _, _ in simplefin_to_sync:
+                    _last_simplefin_sync[acc_id] = now
+
+        # LunchFlow has no batch endpoint, so check those accounts concurrently (one connection per worker)
+        lunchflow_rows = [row for row in rows if row[2] == 'lunchflow']
+        if lunchflow_rows:
+            api_key = get_lunchflow_api_key()
+            if not api_key:
+                sync_logger.warning("⚠️ LUNCHFLOW_API_KEY not set")
+            else:
+                with ThreadPoolExecutor(max_workers=min(LUNCHFLOW_SYNC_WORKERS, len(lunchflow_rows))) as executor:
+                    futures = {}
+                    for account_id, pocket_id, provider in lunchflow_rows:
+                        sync_logger.debug("🔍 Checking transactions for %s account %s, pocket %s", provider, account_id, pocket_id)
+                        futures[executor.submit(check_lunchflow_account, account_id, pocket_id, api_key)] = account_id
+                    for future in as_completed(futures):
+                        try:
+                            future.result()
+                        except Exception as e:
+                            sync_logger.error("Error checking LunchFlow account %s: %s", futures[future], e)
+
+        # Index the batch once so each account below is a dict lookup
+        simplefin_to_sync_by_id = {entry[0]: entry for entry in simplefin_to_sync}
+        simplefin_accounts_by_id = index_simplefin_accounts(simplefin_data) if simplefin_data is not None else None
+        simplefin_balances_saved = set()
+        if simplefin_accounts_by_id is not None:
+            simplefin_balances_saved = save_simplefin_balances(conn, simplefin_accounts_by_id, simplefin_to_sync_by_id)
+
+        # SimpleFin accounts due for sync share the batch response; each is processed on its own worker and
+        # connection so the Crew round trips of different accounts overlap. Manual accounts are not auto-synced.
+        simplefin_rows = []
+        simplefin_skipped = False
+        if simplefin_data is not None:
+            simplefin_rows = [row for row in rows if row[2] == 'simplefin' and row[0] in simplefin_to_sync_by_id]
+            # Cards whose initial sync hasn't succeeded yet must not get a regular (money-moving) pass
+            with _simplefin_initial_syncs_lock:
+                pending_initial = set(_simplefin_initial_syncs)
+            simplefin_skipped = any(row[0] in pending_initial for row in simplefin_rows)
+            simplefin_rows = [row for row in simplefin_rows if row[0] not in pending_initial]
+        if simplefin_rows:
+            with ThreadPoolExecutor(max_workers=min(SIMPLEFIN_SYNC_WORKERS, len(simplefin_rows))) as executor:
+                futures = {}
+                for account_id, pocket_id, provider in simplefin_rows:
+                    _, _, reason = simplefin_to_sync_by_id[account_id]
+                    sync_logger.info("✅ Processing SimpleFin account %s from batch data (%s)", account_id, reason)
+                    futures[executor.submit(check_simplefin_account, account_id, pocket_id, simplefin_access_url,
+                                            simplefin_data, simplefin_accounts_by_id,
+                                            account_id in simplefin_balances_saved)] = account_id
+                simplefin_failed = False
+                for future in as_completed(futures):
+                    account_id = futures[future]
+                    try:
+                        if future.result():
+                            # Update per-account last sync time
+                            _last_simplefin_sync[account_id] = time.time()
+                        else:
+                            simplefin_failed = True
+                            sync_logger.error("SimpleFin account %s did not sync cleanly; will retry", account_id)
+                    except Exception as e:
+                        simplefin_failed = True
+                        sync_logger.error("Error checking SimpleFin account %s: %s", account_id, e)
+            # Remember this response only once every account in it was processed
+            if not simplefin_failed and not simplefin_skipped:
+                _simplefin_batch_digest, _simplefin_batch_etag = batch_digest, batch_etag
 
         # Update global last sync timestamp if any SimpleFin accounts were synced
-        if simplefin_to_sync and simplefin_data is not None:
-            from datetime import datetime
+        if simplefin_to_sync and (simplefin_data is not None or simplefin_unchanged):
             last_sync_iso = datetime.utcnow().isoformat() + 'Z'
             c.execute("UPDATE simplefin_config SET last_sync = ?", (last_sync_iso,))
             conn.commit()
 
         # Send notification if new transactions were found
         # Count total new transactions (those created in the last minute)
-        from datetime import datetime, timedelta
         one_minute_ago = (datetime.now() - timedelta(minutes=1)).isoformat()
+        # One pass: count new rows per account and pick up each account's name through the join
         c.execute("""
-            SELECT COUNT(*), GROUP_CONCAT(DISTINCT account_id)
-            FROM credit_card_transactions
-            WHERE created_at >= ?
+            SELECT cfg.account_name, COUNT(*)
+            FROM credit_card_transactions t
+            LEFT JOIN credit_card_config cfg ON cfg.account_id = t.account_id
+            WHERE t.created_at >= ?
+            GROUP BY t.account_id
         """, (one_minute_ago,))
-        count_row = c.fetchone()
+        new_by_account = c.fetchall()
+        transaction_count = sum(count for _, count in new_by_account)
 
-        if count_row and count_row[0] and count_row[0] > 0:
-            transaction_count = count_row[0]
-            account_ids_str = count_row[1]
-
-            # Get account names for the notification
-            account_ids = account_ids_str.split(',') if account_ids_str else []
-            account_names = []
-            for acc_id in account_ids:
-                c.execute("SELECT account_name FROM credit_card_config WHERE account_id = ?", (acc_id,))
-                name_row = c.fetchone()
-                if name_row and name_row[0]:
-                    account_names.append(name_row[0])
+        if transaction_count > 0:
+            account_names = [name for name, _ in new_by_account if name]
 
             # Get user ID (single-tenant app)
             c.execute("SELECT id FROM users LIMIT 1")
@@ -5598,12 +6010,79 @@ def check_credit_card_transactions():
                     transaction_count,
                     account_names
                 )
+    except Exception:
+        sync_logger.exception("❌ Error checking credit card transactions")
+    finally:
+        conn.close()
+        sync_log_buffer.flush()  # Write this run's buffered lines in one go
+
+LUNCHFLOW_SYNC_WORKERS = 8
+SIMPLEFIN_SYNC_WORKERS = 8
+
+# Statements shared by the sync paths so each one is written (and prepared) the same way everywhere
+UPDATE_CC_BALANCE_SQL = "UPDATE credit_card_config SET current_balance = ? WHERE account_id = ?"
+UPDATE_SIMPLEFIN_CC_BALANCE_SQL = "UPDATE credit_card_config SET current_balance = ? WHERE account_id = ? AND provider = 'simplefin'"
+INVALIDATE_SIMPLEFIN_SQL = "UPDATE simplefin_config SET is_valid = 0"
+# simplefin_config is a single id=1 row, so one UPSERT replaces the old SELECT-then-UPDATE/INSERT
+UPSERT_SIMPLEFIN_ACCESS_URL_SQL = """INSERT INTO simplefin_config (id, access_url, is_valid) VALUES (1, ?, 1)
+                                     ON CONFLICT(id) DO UPDATE SET access_url = excluded.access_url, is_valid = 1,
+                                     updated_at = CURRENT_TIMESTAMP"""
+
+def check_lunchflow_account(account_id, pocket_id, api_key):
+    """Check one LunchFlow account on its own connection (SQLite connections can't be shared across workers)"""
+    conn = db_connect()
+    try:
+        check_lunchflow_transactions(conn, conn.cursor(), account_id, pocket_id, api_key)
+    finally:
+        conn.close()
 
+def check_simplefin_account(account_id, pocket_id, access_url, prefetched_data, accounts_by_id, balance_saved):
+    """Process one SimpleFin account from a batch response on its own connection; True if it fully succeeded"""
+    conn = db_connect()
+    try:
+        return check_simplefin_transactions(conn, conn.cursor(), account_id, pocket_id, access_url, prefetched_data=prefetched_data,
+                                     accounts_by_id=accounts_by_id, balance_saved=balance_saved)
+    finally:
         conn.close()
+
+def run_simplefin_initial_sync(account_id, pocket_id, access_url, prefetched_data, attempt=1):
+    """Process a newly added SimpleFin card's transactions on its own connection (runs on simplefin_initial_sync_executor).
+    A failed pass is retried as an initial sync (re-fetching the account) with backoff; until one succeeds the account
+    stays in _simplefin_initial_syncs, which keeps the regular syncs from moving money for its history."""
+    succeeded = False
+    try:
+        conn = db_connect()
+        try:
+            if attempt > 1 and not conn.execute("SELECT 1 FROM credit_card_config WHERE account_id = ? AND pocket_id = ? AND provider = 'simplefin'",
+                                                (account_id, pocket_id)).fetchone():
+                print(f"⏭️ SimpleFin account {account_id} is no longer tracked, dropping its initial sync", flush=True)
+                with _simplefin_initial_syncs_lock:
+                    _simplefin_initial_syncs.discard(account_id)
+                return
+            succeeded = check_simplefin_transactions(conn, conn.cursor(), account_id, pocket_id, access_url, is_initial_sync=True,
+                                                     prefetched_data=prefetched_data)
+        finally:
+            conn.close()
     except Exception as e:
-        print(f"❌ Error checking credit card transactions: {e}", flush=True)
-        import traceback
+        print(f"⚠️ Error processing initial transactions: {e}", flush=True)
         traceback.print_exc()
+    finally:
+        sync_log_buffer.flush()  # check_simplefin_transactions logs through the buffered sync logger
+
+    if succeeded:
+        _last_simplefin_sync[account_id] = time.time()
+        with _simplefin_initial_syncs_lock:
+            _simplefin_initial_syncs.discard(account_id)
+        cache.invalidate(*POCKET_CACHE_KEYS)
+        print(f"✅ Initial transaction sync complete for account {account_id}, hourly timer reset", flush=True)
+        return
+
+    delay = min(SIMPLEFIN_INITIAL_SYNC_RETRY_DELAY * 2 ** (attempt - 1), SIMPLEFIN_INITIAL_SYNC_MAX_RETRY_DELAY)
+    print(f"⚠️ Initial transaction sync failed for account {account_id} (attempt {attempt}), retrying in {delay}s", flush=True)
+    retry = threading.Timer(delay, simplefin_initial_sync_executor.submit,
+                            args=(run_simplefin_initial_sync, account_id, pocket_id, access_url, None, attempt + 1))
+    retry.daemon = True
+    retry.start()
 
 def check_lunchflow_transactions(conn, c, account_id, pocket_id, api_key):
     """Check LunchFlow for new transactions"""
@@ -5614,11 +6093,7 @@ def check_lunchflow_transactions(conn, c, account_id, pocket_id, api_key):
         added_date = config_row[0] if config_row else None
 
         # Fetch transactions from LunchFlow
-        headers = {"x-api-key": api_key, "accept": "application/json"}
-        try:
-            response = requests.get(f"https://www.lunchflow.app/api/v1/accounts/{account_id}/transactions", headers=headers, timeout=30)
-        except:
-            response = requests.get(f"https://lunchflow.com/api/v1/accounts/{account_id}/transactions", headers=headers, timeout=30)
+        response = lunchflow_get(f"/accounts/{account_id}/transactions", api_key)
 
         if response.status_code != 200:
             return
@@ -5626,72 +6101,53 @@ def check_lunchflow_transactions(conn, c, account_id, pocket_id, api_key):
         data = response.json()
         transactions = data.get("transactions", [])
 
-        # Get list of already seen transaction IDs
-        c.execute("SELECT transaction_id FROM credit_card_transactions WHERE account_id = ?", (account_id,))
-        seen_ids = {row[0] for row in c.fetchall()}
-
-        new_transactions = []
-        for tx in transactions:
-            tx_id = tx.get("id")
-            if not tx_id or tx_id in seen_ids:
-                continue
-
-            amount = tx.get("amount", 0)
-            c.execute("""INSERT OR IGNORE INTO credit_card_transactions
-                         (transaction_id, account_id, amount, date, merchant, description, is_pending)
-                         VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                     (tx_id, account_id, amount, tx.get("date"), tx.get("merchant"),
-                      tx.get("description"), 1 if tx.get("isPending") else 0))
-
-            if c.rowcount > 0:
-                new_transactions.append(tx)
-
-        conn.commit()
+        # Split new from already stored transactions in Python; transaction_id is the table's primary key,
+        # so only the ids in this response need checking
+        tx_by_id = {tx["id"]: tx for tx in transactions if tx.get("id")}
+        seen_ids = set()
+        tx_ids = list(tx_by_id)
+        for start in range(0, len(tx_ids), 500):  # Stay under SQLite's bound-parameter limit
+            chunk = tx_ids[start:start + 500]
+            c.execute(f"SELECT transaction_id FROM credit_card_transactions WHERE transaction_id IN ({','.join('?' * len(chunk))})",
+                      chunk)
+            seen_ids.update(row[0] for row in c)
+
+        new_transactions = [tx for tx_id, tx in tx_by_id.items() if tx_id not in seen_ids]
+        if new_transactions:
+            c.executemany("""INSERT OR IGNORE INTO credit_card_transactions
+                             (transaction_id, account_id, amount, date, merchant, description, is_pending)
+                             VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                          [(tx["id"], account_id, tx.get("amount", 0), tx.get("date"), tx.get("merchant"),
+                            tx.get("description"), 1 if tx.get("isPending") else 0) for tx in new_transactions])
+            conn.commit()
 
         # Update pocket balance
         if pocket_id:
-            balance_headers = {"x-api-key": api_key, "accept": "application/json"}
-            balance_response = requests.get(f"https://www.lunchflow.app/api/v1/accounts/{account_id}/balance", headers=balance_headers, timeout=30)
+            balance_response = lunchflow_get(f"/accounts/{account_id}/balance", api_key)
             if balance_response.status_code == 200:
                 balance_data = balance_response.json()
                 balance_amount = balance_data.get("balance", {}).get("amount", 0)
                 target_balance = abs(balance_amount)
 
                 # Save current balance to database
-                c.execute("UPDATE credit_card_config SET current_balance = ? WHERE account_id = ?", (target_balance, account_id))
+                c.execute(UPDATE_CC_BALANCE_SQL, (target_balance, account_id))
                 conn.commit()
 
                 headers_crew = get_crew_headers()
                 if headers_crew:
-                    query_string = """query GetSubaccount($id: ID!) { node(id: $id) { ... on Subaccount { id overallBalance } } }"""
-                    response_crew = requests.post(URL, headers=headers_crew, json={
-                        "operationName": "GetSubaccount",
-                        "variables": {"id": pocket_id},
-                        "query": query_string
-                    })
-
-                    crew_data = response_crew.json()
-                    current_balance = 0
-                    try:
-                        current_balance = crew_data.get("data", {}).get("node", {}).get("overallBalance", 0) / 100.0
-                    except:
-                        pass
-
-                    difference = target_balance - current_balance
-                    all_subs = get_subaccounts_list()
-                    if "error" not in all_subs:
-                        checking_subaccount_id = None
-                        for sub in all_subs.get("subaccounts", []):
-                            if sub["name"] == "Checking":
-                                checking_subaccount_id = sub["id"]
-                                break
-
-                        if checking_subaccount_id and abs(difference) > 0.01:
-                            if difference > 0:
-                                move_money(checking_subaccount_id, pocket_id, str(difference), f"LunchFlow credit card sync")
-                            else:
-                                move_money(pocket_id, checking_subaccount_id, str(abs(difference)), f"LunchFlow credit card sync")
-                        cache.clear()
+                    current_balance = read_pocket_balance(pocket_id, headers_crew)
+                    if current_balance is None:
+                        print(f"⚠️ Could not read LunchFlow pocket balance, skipping pocket sync")
+                        difference = 0
+                    else:
+                        difference = target_balance - current_balance
+                    checking_subaccount_id = get_checking_subaccount_id()
+                    if checking_subaccount_id and abs(difference) > 0.01:
+                        if difference > 0:
+                            move_money(checking_subaccount_id, pocket_id, str(difference), f"LunchFlow credit card sync")
+                        else:
+                            move_money(pocket_id, checking_subaccount_id, str(abs(difference)), f"LunchFlow credit card sync")
+                    cache.clear()
 
         if new_transactions:
             print(f"✅ Found {len(new_transactions)} new LunchFlow credit card transactions")
@@ -5701,27 +6157,75 @@ def check_lunchflow_transactions(conn, c, account_id, pocket_id, api_key):
     except Exception as e:
         print(f"Error checking LunchFlow transactions: {e}")
 
-def check_simplefin_transactions(conn, c, account_id, pocket_id, access_url, is_initial_sync=False, prefetched_data=None):
-    """Check SimpleFin for new transactions
+def index_simplefin_accounts(data):
+    """Map account id -> account for a SimpleFin /accounts response"""
+    return {account.get("id"): account for account in data.get("accounts", [])}
+
+def simplefin_timestamp_to_iso(ts):
+    """ISO date string for a SimpleFin Unix timestamp (int or digit string); other values pass through as text"""
+    if not ts:
+        return None
+    if isinstance(ts, (int, float)) or (isinstance(ts, str) and ts.isdigit()):
+        try:
+            return datetime.fromtimestamp(int(ts)).isoformat()
+        except (OverflowError, OSError, ValueError):
+            pass  # Out of range for the platform's time functions
+    return str(ts)
+
+SIMPLEFIN_SYNC_WINDOW = 30 * 86400  # seconds of history requested from SimpleFin
+
+def simplefin_sync_window():
+    """(start, end) Unix timestamps for the last 30 days; SimpleFin dates are absolute, so no timezone lookup is needed"""
+    end_timestamp = int(time.time())
+    return end_timestamp - SIMPLEFIN_SYNC_WINDOW, end_timestamp
+
+def parse_simplefin_amount(value, default=0.0):
+    """float() of a SimpleFin amount/balance (usually a string like "-123.45"), or default if it isn't numeric"""
+    if type(value) is str:
+        digits = value[1:] if value[:1] == "-" else value
+        if digits.replace(".", "", 1).isdecimal():
+            return float(value)  # Common shape: no exception handler needed
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+def save_simplefin_balances(conn, accounts_by_id, account_ids):
+    """Persist balances for a batch of SimpleFin accounts in one transaction; returns the ids saved"""
+    rows = []
+    for account_id in account_ids:
+        account = accounts_by_id.get(account_id)
+        if account is None:
+            continue
+        balance = parse_simplefin_amount(account.get("balance", "0"), None)
+        if balance is None:
+            continue  # Left to check_simplefin_transactions, which logs and saves 0
+        rows.append((abs(balance), account_id))
+    if rows:
+        with conn:
+            conn.executemany(UPDATE_SIMPLEFIN_CC_BALANCE_SQL, rows)
+    return {account_id for _, account_id in rows}
+
+def check_simplefin_transactions(conn, c, account_id, pocket_id, access_url, is_initial_sync=False, prefetched_data=None,
+                                 accounts_by_id=None, balance_saved=False):
+    """Check SimpleFin for new transactions. Returns True only when the account was fully processed
+    (errors are caught and logged here, so callers must use the return value to detect a failed pass).
 
     Args:
         is_initial_sync: If True, don't move money for transactions (just store them)
         prefetched_data: Pre-fetched API response to avoid duplicate calls when syncing multiple accounts
+        accounts_by_id: index_simplefin_accounts(prefetched_data), built once by callers looping over accounts
+        balance_saved: True when the caller already stored this account's balance via save_simplefin_balances
     """
     try:
         if prefetched_data is not None:
             data = prefetched_data
-            print(f"🔍 check_simplefin_transactions: Using prefetched data for account {account_id} (initial={is_initial_sync})", flush=True)
+            sync_logger.debug("🔍 check_simplefin_transactions: Using prefetched data for account %s (initial=%s)", account_id, is_initial_sync)
         else:
-            print(f"🔍 check_simplefin_transactions: Fetching from {access_url[:30]}... for account {account_id} (initial={is_initial_sync})", flush=True)
+            sync_logger.debug("🔍 check_simplefin_transactions: Fetching from %s... for account %s (initial=%s)", access_url[:30], account_id, is_initial_sync)
 
-            # Calculate date range: last 30 days (using configured timezone)
-            from datetime import datetime, timedelta
-            tz = get_configured_timezone()
-            now_local = datetime.now(tz) if tz else datetime.now()
-            start_date = now_local - timedelta(days=30)
-            start_timestamp = int(start_date.timestamp())
-            end_timestamp = int(now_local.timestamp())
+            # Calculate date range: last 30 days
+            start_timestamp, end_timestamp = simplefin_sync_window()
 
             # Fetch account data from SimpleFin, filtered to just this account
             params = {
@@ -5730,65 +6234,68 @@ def check_simplefin_transactions(conn, c, account_id, pocket_id, access_url, is_
                 'pending': 1,  # Include pending transactions
                 'account': account_id  # Filter to just this account
             }
-            print(f"📅 Fetching transactions from {start_timestamp} to {end_timestamp}", flush=True)
-            response = requests.get(f"{access_url}/accounts", params=params, timeout=60)
+            sync_logger.debug("📅 Fetching transactions from %s to %s", start_timestamp, end_timestamp)
+            response = http_session.get(f"{access_url}/accounts", params=params, timeout=60)
             if response.status_code != 200:
-                print(f"❌ SimpleFin API error: {response.status_code} - {response.text}", flush=True)
+                sync_logger.error("❌ SimpleFin API error: %s - %s", response.status_code, response.text)
 
                 # If 403, mark token as invalid in database
                 if response.status_code == 403:
-                    print("🚫 SimpleFin token has been revoked or is invalid", flush=True)
-                    c.execute("UPDATE simplefin_config SET is_valid = 0")
+                    sync_logger.error("🚫 SimpleFin token has been revoked or is invalid")
+                    c.execute(INVALIDATE_SIMPLEFIN_SQL)
                     conn.commit()
 
-                return
+                return False
 
-            data = response.json()
+            data = decode_json_response(response)
 
-        print(f"✅ SimpleFin API response received, found {len(data.get('accounts', []))} accounts")
+        sync_logger.debug("✅ SimpleFin API response received, found %d accounts", len(data.get('accounts', [])))
 
         # Find the matching account and get transactions
-        target_account = None
-        transactions = []
-        for account in data.get("accounts", []):
-            acc_id = account.get("id")
-            print(f"  - Account: {acc_id} ({account.get('name', 'Unknown')})")
-            if acc_id == account_id:
-                target_account = account
-                transactions = account.get("transactions", [])
-                print(f"  ✅ MATCH! This is our tracked account")
-                break
+        if accounts_by_id is None:
+            accounts_by_id = index_simplefin_accounts(data)
+        target_account = accounts_by_id.get(account_id)
 
         if not target_account:
-            print(f"❌ SimpleFin account {account_id} not found in response")
-            all_account_ids = [acc.get("id") for acc in data.get("accounts", [])]
-            print(f"   Available account IDs: {all_account_ids}")
-            return
+            sync_logger.error("❌ SimpleFin account %s not found in response (available: %s)", account_id, list(accounts_by_id))
+            return False
 
-        print(f"✅ SimpleFin: Found {len(transactions)} total transactions for account {account_id}")
+        transactions = target_account.get("transactions", [])
+
+        sync_logger.info("✅ SimpleFin: Found %d total transactions for account %s", len(transactions), account_id)
 
         # Get list of already seen transaction IDs with their pending status and amount
         c.execute("SELECT transaction_id, is_pending, amount FROM credit_card_transactions WHERE account_id = ?", (account_id,))
-        existing_txs = {row[0]: {'is_pending': row[1], 'amount': row[2]} for row in c.fetchall()}
-        print(f"  Already have {len(existing_txs)} transactions in database")
+        existing_txs = {row[0]: {'is_pending': row[1], 'amount': row[2]} for row in c}
+        sync_logger.debug("  Already have %d transactions in database", len(existing_txs))
+
+        # Transfer mode for this account, read once for every transfer below
+        c.execute("SELECT batch_mode FROM credit_card_config WHERE account_id = ? AND provider = 'simplefin'", (account_id,))
+        batch_row = c.fetchone()
+        batch_mode = batch_row[0] if batch_row and batch_row[0] is not None else 1  # Default to batch mode
 
+        # (amount, description) pairs, parsed once in the loop and reused for the transfers
         new_transactions = []
         payment_transactions = []  # Track payments to move money back from pocket
         amount_adjustments = []  # Track amount changes that need pocket adjustment
+        # Rows are collected here and written with executemany after the loop
+        tx_inserts = []
+        posted_updates = []
+        amount_updates = []
         for tx in transactions:
             tx_id = tx.get("id")
             if not tx_id:
-                print(f"  ⚠️ Skipping transaction with no ID: {tx}")
+                sync_logger.warning("  ⚠️ Skipping transaction with no ID: %s", tx)
                 continue
 
             # SimpleFin amounts may be strings, convert to float
             amount_str = tx.get("amount", "0")
-            try:
-                amount_float = float(amount_str)
+            amount_float = parse_simplefin_amount(amount_str, None)
+            if amount_float is not None:
                 is_payment = amount_float > 0  # Positive = payment/credit, negative = purchase/debit
                 amount = abs(amount_float)  # Store absolute value
-            except (ValueError, TypeError):
-                print(f"  ⚠️ Could not parse transaction amount '{amount_str}', using 0")
+            else:
+                sync_logger.warning("  ⚠️ Could not parse transaction amount '%s', using 0", amount_str)
                 amount = 0
                 is_payment = False
 
@@ -5797,24 +6304,17 @@ def check_simplefin_transactions(conn, c, account_id, pocket_id, access_url, is_
             transacted = tx.get("transacted")  # Unix timestamp when transaction occurred
             pending = not posted  # If no posted date, it's pending
 
+            # Fast path: already stored, not newly posted and same amount - nothing to do for this row
+            existing_data = existing_txs.get(tx_id)
+            if (existing_data is not None and not (existing_data['is_pending'] and not pending)
+                    and abs(amount - existing_data['amount']) <= 0.01):
+                continue
+
             # Convert Unix timestamp to ISO date string if available
-            date_str = None
-            if posted:
-                try:
-                    from datetime import datetime
-                    date_str = datetime.fromtimestamp(int(posted)).isoformat()
-                except:
-                    date_str = str(posted)
-            elif transacted:
-                try:
-                    from datetime import datetime
-                    date_str = datetime.fromtimestamp(int(transacted)).isoformat()
-                except:
-                    date_str = str(transacted)
+            date_str = simplefin_timestamp_to_iso(posted or transacted)
 
             # Check if this transaction already exists
-            if tx_id in existing_txs:
-                existing_data = existing_txs[tx_id]
+            if existing_data is not None:
                 was_pending = existing_data['is_pending']
                 old_amount = existing_data['amount']
 
@@ -5824,228 +6324,170 @@ def check_simplefin_transactions(conn, c, account_id, pocket_id, access_url, is_
                 if was_pending and not pending:
                     # Transaction has posted! Update it with final date and clear pending flag
                     if amount_changed:
-                        print(f"  📌 Transaction posted with amount change: ${old_amount:.2f} → ${amount:.2f} - {description} (ID: {tx_id})")
+                        sync_logger.debug("  📌 Transaction posted with amount change: $%.2f → $%.2f - %s (ID: %s)", old_amount, amount, description, tx_id)
                         amount_diff = amount - old_amount
                         amount_adjustments.append({'amount': amount_diff, 'description': description})
                     else:
-                        print(f"  📌 Transaction posted: ${amount} - {description} (ID: {tx_id})")
-
-                    c.execute("""UPDATE credit_card_transactions
-                                SET is_pending = 0, date = ?, amount = ?
-                                WHERE transaction_id = ? AND account_id = ?""",
-                            (date_str, amount, tx_id, account_id))
-                    if c.rowcount > 0:
-                        print(f"  ✅ Updated transaction {tx_id} to posted status")
+                        sync_logger.debug("  📌 Transaction posted: $%s - %s (ID: %s)", amount, description, tx_id)
+
+                    posted_updates.append((date_str, amount, tx_id, account_id))
                 elif amount_changed:
                     # Amount changed but still pending (less common, but possible)
-                    print(f"  💰 Pending transaction amount changed: ${old_amount:.2f} → ${amount:.2f} - {description} (ID: {tx_id})")
+                    sync_logger.debug("  💰 Pending transaction amount changed: $%.2f → $%.2f - %s (ID: %s)", old_amount, amount, description, tx_id)
                     amount_diff = amount - old_amount
                     amount_adjustments.append({'amount': amount_diff, 'description': description})
 
-                    c.execute("""UPDATE credit_card_transactions
-                                SET amount = ?
-                                WHERE transaction_id = ? AND account_id = ?""",
-                            (amount, tx_id, account_id))
-                    if c.rowcount > 0:
-                        print(f"  ✅ Updated transaction {tx_id} amount")
+                    amount_updates.append((amount, tx_id, account_id))
 
                 # Skip this transaction - it's already been processed
                 continue
 
             # New transaction - insert it
             if is_payment:
-                print(f"  💳 Payment received: ${amount} - {description} (ID: {tx_id}, pending={pending})")
-                payment_transactions.append(tx)
+                sync_logger.debug("  💳 Payment received: $%s - %s (ID: %s, pending=%s)", amount, description, tx_id, pending)
+                payment_transactions.append((amount, description))
             else:
-                print(f"  💳 New transaction: ${amount} - {description} (ID: {tx_id}, pending={pending})")
-                new_transactions.append(tx)
-
-            c.execute("""INSERT INTO credit_card_transactions
-                         (transaction_id, account_id, amount, date, merchant, description, is_pending)
-                         VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                     (tx_id, account_id, amount, date_str, "", description, 1 if pending else 0))
-
-            if c.rowcount > 0:
-                print(f"  ✅ Inserted transaction {tx_id}")
-            else:
-                print(f"  ⚠️ Transaction {tx_id} was not inserted (error)")
-
-        conn.commit()
-        print(f"✅ Committed {len(new_transactions)} new transactions to database")
-
-        # Move money from Checking to Credit Card pocket for each new transaction
-        # Skip automatic money movement on initial sync to avoid huge transfers for historical transactions
-        if new_transactions and pocket_id and not is_initial_sync:
-            headers_crew = get_crew_headers()
-            if headers_crew:
-                # Get Checking subaccount ID
-                all_subs = get_subaccounts_list()
-                checking_subaccount_id = None
-                if "error" not in all_subs:
-                    for sub in all_subs.get("subaccounts", []):
-                        if sub["name"] == "Checking":
-                            checking_subaccount_id = sub["id"]
-                            break
-
-                if checking_subaccount_id:
-                    # Check batch_mode setting for this account
-                    c.execute("SELECT batch_mode FROM credit_card_config WHERE account_id = ? AND provider = 'simplefin'", (account_id,))
-                    batch_row = c.fetchone()
-                    batch_mode = batch_row[0] if batch_row and batch_row[0] is not None else 1  # Default to batch mode
-
-                    if batch_mode == 0:
-                        # Individual transfers mode: one transfer per transaction with merchant name as memo
-                        print(f"💸 Creating {len(new_transactions)} individual transfer(s) from Checking to Credit Card pocket", flush=True)
-                        for tx in new_transactions:
-                            tx_amount = abs(float(tx.get("amount", 0)))
-                            if tx_amount > 0.01:
-                                # Use description as merchant name (SimpleFin stores merchant info in description)
-                                merchant_name = tx.get("description", "").strip() or "Credit Card Transaction"
-                                print(f"  💳 Moving ${tx_amount:.2f} - {merchant_name}", flush=True)
-                                move_money(checking_subaccount_id, pocket_id, str(tx_amount), merchant_name)
-                        cache.clear()
-                    else:
-                        # Batch mode: sum all transactions into one transfer
-                        total_new_spending = sum(abs(float(tx.get("amount", 0))) for tx in new_transactions)
-                        if total_new_spending > 0.01:
-                            print(f"💸 Moving ${total_new_spending:.2f} from Checking to Credit Card pocket for {len(new_transactions)} new transaction(s)", flush=True)
-                            move_money(checking_subaccount_id, pocket_id, str(total_new_spending), f"SimpleFin: {len(new_transactions)} new transaction(s)")
-                            cache.clear()
-        elif new_transactions and is_initial_sync:
-            print(f"⏭️ Skipping automatic money movement for initial sync ({len(new_transactions)} historical transactions stored)", flush=True)
-
-        # Move money from Credit Card pocket back to Checking for payment transactions
+                sync_logger.debug("  💳 New transaction: $%s - %s (ID: %s, pending=%s)", amount, description, tx_id, pending)
+                new_transactions.append((amount, description))
+
+            tx_inserts.append((tx_id, account_id, amount, date_str, "", description, 1 if pending else 0))
+
+        # Write the whole batch in one transaction
+        with conn:
+            if tx_inserts:
+                c.executemany("""INSERT INTO credit_card_transactions
+                                 (transaction_id, account_id, amount, date, merchant, description, is_pending)
+                                 VALUES (?, ?, ?, ?, ?, ?, ?)""", tx_inserts)
+            if posted_updates:
+                c.executemany("""UPDATE credit_card_transactions
+                                 SET is_pending = 0, date = ?, amount = ?
+                                 WHERE transaction_id = ? AND account_id = ?""", posted_updates)
+            if amount_updates:
+                c.executemany("""UPDATE credit_card_transactions
+                                 SET amount = ?
+                                 WHERE transaction_id = ? AND account_id = ?""", amount_updates)
+        sync_logger.info("✅ SimpleFin %s: new=%d (payments=%d) posted=%d amount_changed=%d", account_id, len(tx_inserts), len(payment_transactions), len(posted_updates), len(amount_updates))
+
+        # Every transfer below goes to or from Checking, so look it up once for this account
+        checking_subaccount_id = get_checking_subaccount_id() if pocket_id and not is_initial_sync else None
+        transfers_made = False
+        pocket_reconciled = True
+
+        # Move money between Checking and the Credit Card pocket for new spending, payments and amount changes
         # Skip automatic money movement on initial sync to avoid huge transfers for historical transactions
-        if payment_transactions and pocket_id and not is_initial_sync:
+        if (new_transactions or payment_transactions or amount_adjustments) and pocket_id and not is_initial_sync:
             headers_crew = get_crew_headers()
-            if headers_crew:
-                # Get Checking subaccount ID
-                all_subs = get_subaccounts_list()
-                checking_subaccount_id = None
-                if "error" not in all_subs:
-                    for sub in all_subs.get("subaccounts", []):
-                        if sub["name"] == "Checking":
-                            checking_subaccount_id = sub["id"]
-                            break
-
-                if checking_subaccount_id:
-                    # Check batch_mode setting for this account
-                    c.execute("SELECT batch_mode FROM credit_card_config WHERE account_id = ? AND provider = 'simplefin'", (account_id,))
-                    batch_row = c.fetchone()
-                    batch_mode = batch_row[0] if batch_row and batch_row[0] is not None else 1  # Default to batch mode
-
-                    if batch_mode == 0:
-                        # Individual transfers mode: one transfer per payment with description as memo
-                        print(f"💸 Creating {len(payment_transactions)} individual payment transfer(s) from Credit Card pocket to Checking", flush=True)
-                        for tx in payment_transactions:
-                            tx_amount = abs(float(tx.get("amount", 0)))
-                            if tx_amount > 0.01:
-                                # Use description as payment reference (SimpleFin stores payment info in description)
-                                payment_ref = tx.get("description", "").strip() or "Credit Card Payment"
-                                print(f"  💳 Moving ${tx_amount:.2f} - {payment_ref}", flush=True)
-                                move_money(pocket_id, checking_subaccount_id, str(tx_amount), payment_ref)
-                        cache.clear()
-                    else:
-                        # Batch mode: sum all payments into one transfer
-                        total_payments = sum(abs(float(tx.get("amount", 0))) for tx in payment_transactions)
-                        if total_payments > 0.01:
-                            print(f"💸 Moving ${total_payments:.2f} from Credit Card pocket to Checking for {len(payment_transactions)} payment(s)", flush=True)
-                            move_money(pocket_id, checking_subaccount_id, str(total_payments), f"SimpleFin: {len(payment_transactions)} payment(s)")
-                            cache.clear()
-        elif payment_transactions and is_initial_sync:
-            print(f"⏭️ Skipping automatic payment transfers for initial sync ({len(payment_transactions)} historical payments stored)", flush=True)
-
-        # Handle amount adjustments (e.g., tips added at restaurants)
-        # Move additional money when transaction amounts increase
-        if amount_adjustments and pocket_id and not is_initial_sync:
-            headers_crew = get_crew_headers()
-            if headers_crew:
-                # Get Checking subaccount ID
-                all_subs = get_subaccounts_list()
-                checking_subaccount_id = None
-                if "error" not in all_subs:
-                    for sub in all_subs.get("subaccounts", []):
-                        if sub["name"] == "Checking":
-                            checking_subaccount_id = sub["id"]
-                            break
-
-                if checking_subaccount_id:
-                    # Sum all amount adjustments (positive = need more money, negative = return money)
-                    total_adjustment = sum(adj['amount'] for adj in amount_adjustments)
-
+            if headers_crew and checking_subaccount_id:
+                # Sum all amount adjustments (positive = need more money, negative = return money)
+                total_adjustment = sum(adj['amount'] for adj in amount_adjustments)
+
+                if batch_mode == 0:
+                    # Individual transfers mode: one transfer per transaction/payment with its description as memo
+                    transfers = []
+                    for tx_amount, description in new_transactions:
+                        if tx_amount > 0.01:
+                            # Use description as merchant name (SimpleFin stores merchant info in description)
+                            merchant_name = (description or "").strip() or "Credit Card Transaction"
+                            sync_logger.debug("  💳 Moving $%.2f - %s", tx_amount, merchant_name)
+                            transfers.append((checking_subaccount_id, pocket_id, str(tx_amount), merchant_name))
+                    for tx_amount, description in payment_transactions:
+                        if tx_amount > 0.01:
+                            # Use description as payment reference (SimpleFin stores payment info in description)
+                            payment_ref = (description or "").strip() or "Credit Card Payment"
+                            sync_logger.debug("  💳 Moving $%.2f - %s back to Checking", tx_amount, payment_ref)
+                            transfers.append((pocket_id, checking_subaccount_id, str(tx_amount), payment_ref))
                     if abs(total_adjustment) > 0.01:
+                        memo = f"Amount adjustment: {len(amount_adjustments)} transaction(s)"
                         if total_adjustment > 0:
-                            # Amount increased (e.g., tip added) - move more money to pocket
-                            print(f"💰 Amount adjustment: Moving additional ${total_adjustment:.2f} from Checking to Credit Card pocket ({len(amount_adjustments)} transaction(s))", flush=True)
-                            move_money(checking_subaccount_id, pocket_id, str(total_adjustment), f"Amount adjustment: {len(amount_adjustments)} transaction(s)")
-                            cache.clear()
+                            transfers.append((checking_subaccount_id, pocket_id, str(total_adjustment), memo))
                         else:
-                            # Amount decreased (rare, but possible) - return money to checking
-                            print(f"💰 Amount adjustment: Returning ${abs(total_adjustment):.2f} from Credit Card pocket to Checking ({len(amount_adjustments)} transaction(s))", flush=True)
-                            move_money(pocket_id, checking_subaccount_id, str(abs(total_adjustment)), f"Amount adjustment: {len(amount_adjustments)} transaction(s)")
-                            cache.clear()
+                            transfers.append((pocket_id, checking_subaccount_id, str(abs(total_adjustment)), memo))
+
+                    if transfers:
+                        # One at a time, in transaction order: the Crew ledger should list them the way they happened,
+                        # and a payment out of the pocket must not land before the spending that funded it
+                        sync_logger.info("💸 Creating %d individual transfer(s) between Checking and Credit Card pocket", len(transfers))
+                        for transfer in transfers:
+                            move_money(*transfer)
+                        transfers_made = True
+                        cache.clear()
+                else:
+                    # Batch mode: net spending, payments and adjustments into a single transfer
+                    total_new_spending = sum(tx_amount for tx_amount, _ in new_transactions)
+                    total_payments = sum(tx_amount for tx_amount, _ in payment_transactions)
+                    net = total_new_spending + total_adjustment - total_payments
+                    if abs(net) > 0.01:
+                        memo = (f"SimpleFin: {len(new_transactions)} new transaction(s), {len(payment_transactions)} payment(s), "
+                                f"{len(amount_adjustments)} adjustment(s)")
+                        if net > 0:
+                            sync_logger.info("💸 Moving $%.2f from Checking to Credit Card pocket (%s)", net, memo)
+                            move_money(checking_subaccount_id, pocket_id, str(net), memo)
+                        else:
+                            sync_logger.info("💸 Moving $%.2f from Credit Card pocket to Checking (%s)", abs(net), memo)
+                            move_money(pocket_id, checking_subaccount_id, str(abs(net)), memo)
+                        transfers_made = True
+                        cache.clear()
+        elif (new_transactions or payment_transactions) and is_initial_sync:
+            sync_logger.info("⏭️ Skipping automatic money movement for initial sync (%d historical transactions, "
+                             "%d historical payments stored)", len(new_transactions), len(payment_transactions))
 
         # Update pocket balance to match SimpleFin balance
         # Always save the balance to database, even during initial sync
         if pocket_id:
             # SimpleFin returns balance as a string, convert to float
             balance_str = target_account.get("balance", "0")
-            try:
-                target_balance = abs(float(balance_str))
-            except (ValueError, TypeError):
-                print(f"Warning: Could not parse balance '{balance_str}', using 0")
+            target_balance = parse_simplefin_amount(balance_str, None)
+            if target_balance is not None:
+                target_balance = abs(target_balance)
+            else:
+                sync_logger.warning("⚠️ Could not parse balance '%s', using 0", balance_str)
                 target_balance = 0
 
             # Save current balance to database (always, even for initial sync)
-            c.execute("UPDATE credit_card_config SET current_balance = ? WHERE account_id = ? AND provider = 'simplefin'", (target_balance, account_id))
-            conn.commit()
+            if not balance_saved:
+                c.execute(UPDATE_SIMPLEFIN_CC_BALANCE_SQL, (target_balance, account_id))
+                conn.commit()
 
             # Skip automatic pocket syncing on initial sync to avoid huge transfers
             if is_initial_sync:
-                print(f"📊 Saved balance ${target_balance} to database (skipping pocket sync for initial sync)", flush=True)
+                sync_logger.info("📊 Saved balance $%s to database (skipping pocket sync for initial sync)", target_balance)
             else:
-                # Only sync pocket balance during regular syncs (not initial sync)
-                headers_crew = get_crew_headers()
-                if headers_crew:
-                    query_string = """query GetSubaccount($id: ID!) { node(id: $id) { ... on Subaccount { id overallBalance } } }"""
-                    response_crew = requests.post(URL, headers=headers_crew, json={
-                        "operationName": "GetSubaccount",
-                        "variables": {"id": pocket_id},
-                        "query": query_string
-                    })
-
-                    crew_data = response_crew.json()
-                    current_balance = 0
-                    try:
-                        current_balance = crew_data.get("data", {}).get("node", {}).get("overallBalance", 0) / 100.0
-                    except:
-                        pass
-
-                    difference = target_balance - current_balance
-                    all_subs = get_subaccounts_list()
-                    if "error" not in all_subs:
-                        checking_subaccount_id = None
-                        for sub in all_subs.get("subaccounts", []):
-                            if sub["name"] == "Checking":
-                                checking_subaccount_id = sub["id"]
-                                break
-
-                        if checking_subaccount_id and abs(difference) > 0.01:
-                            if difference > 0:
-                                move_money(checking_subaccount_id, pocket_id, str(difference), f"SimpleFin credit card sync")
-                            else:
-                                move_money(pocket_id, checking_subaccount_id, str(abs(difference)), f"SimpleFin credit card sync")
-                        cache.clear()
+                # Only sync pocket balance during regular syncs (not initial sync). If nothing moved this run and
+                # the card balance matches what the pocket was last reconciled to, skip the Crew round trip.
+                last_balance, last_checked = _reconciled_pocket_balance.get((account_id, pocket_id), (None, 0))
+                if (not transfers_made and last_balance is not None and abs(target_balance - last_balance) <= 0.01
+                        and time.monotonic() - last_checked < POCKET_RECHECK_INTERVAL):
+                    sync_logger.debug("📊 Pocket already reconciled to $%.2f, skipping balance check", target_balance)
+                else:
+                    headers_crew = get_crew_headers()
+                    if headers_crew:
+                        current_balance = read_pocket_balance(pocket_id, headers_crew)
+
+                        if current_balance is None:
+                            # Move nothing, and don't remember this pocket as reconciled
+                            sync_logger.warning("⚠️ Could not read pocket balance, skipping pocket sync")
+                            pocket_reconciled = False
+                        else:
+                            difference = target_balance - current_balance
+                            result = {}
+                            if checking_subaccount_id and abs(difference) > 0.01:
+                                if difference > 0:
+                                    result = move_money(checking_subaccount_id, pocket_id, str(difference), f"SimpleFin credit card sync")
+                                else:
+                                    result = move_money(pocket_id, checking_subaccount_id, str(abs(difference)), f"SimpleFin credit card sync")
+                            if (checking_subaccount_id or abs(difference) <= 0.01) and "error" not in result:
+                                _reconciled_pocket_balance[(account_id, pocket_id)] = (target_balance, time.monotonic())
+                            cache.clear()
 
         if new_transactions:
-            print(f"✅ Found {len(new_transactions)} new SimpleFin credit card transactions")
+            sync_logger.info("✅ Found %d new SimpleFin credit card transactions", len(new_transactions))
         else:
-            print(f"🔄 SimpleFin credit card balance checked (no new transactions)")
+            sync_logger.info("🔄 SimpleFin credit card balance checked (no new transactions)")
+        return pocket_reconciled
 
     except Exception as e:
-        print(f"❌ Error checking SimpleFin transactions: {e}")
-        import traceback
-        traceback.print_exc()
+        sync_logger.exception("❌ Error checking SimpleFin transactions: %s", e)
+        return False
 
 @app.route('/api/lunchflow/last-check-time')
 @login_required
@@ -6054,18 +6496,121 @@ def api_last_check_time():
     try:
         # Store last check time in a simple way - we'll use a file or just return current time minus some offset
         # For now, return a timestamp that represents "30 seconds ago" so countdown starts at 30
-        import time as time_module
         return jsonify({
-            "lastCheckTime": time_module.time(),
+            "lastCheckTime": time.time(),
             "checkInterval": 30  # seconds
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def splitwise_friend_balance(friend):
+    """A friend's Splitwise balance in their first currency (negative = user owes them)"""
+    balance_list = friend.get("balance", [])
+    if isinstance(balance_list, list) and len(balance_list) > 0:
+        return float(balance_list[0].get("amount", "0"))
+    return float(balance_list) if balance_list else 0.0
+
+def save_splitwise_friend_balances(friends, api_key):
+    """Remember the latest Splitwise friends list and balances so friend-balances and get-creditors can answer from SQLite.
+    Skipped if api_key is no longer the saved key (a refresh that raced a key change must not restore old friends)."""
+    rows = [(splitwise_friend_balance(friend), friend.get("id")) for friend in friends]
+    if not rows:
+        return
+    with db_pool.acquire() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        # Checked under the write lock, so save-key's DELETE can't land between this check and the rewrite
+        current = conn.execute("SELECT api_key FROM splitwise_config WHERE is_valid = 1 LIMIT 1").fetchone()
+        if not current or current[0] != api_key:
+            conn.rollback()
+            return
+        conn.executemany("UPDATE splitwise_pocket_config SET last_known_balance = ? WHERE friend_id = ?", rows)
+        conn.execute("DELETE FROM splitwise_friends_cache")
+        conn.executemany("INSERT OR REPLACE INTO splitwise_friends_cache (friend_id, first_name, last_name, balance) VALUES (?, ?, ?, ?)",
+                         [(friend.get("id"), friend.get("first_name"), friend.get("last_name"), splitwise_friend_balance(friend))
+                          for friend in friends])
+        conn.commit()
+
+_splitwise_balance_refresh_lock = threading.Lock()
+
+def refresh_splitwise_friend_balances(api_key):
+    """Re-read /get_friends (through the short cache) and store the balances; runs off the request thread"""
+    if not _splitwise_balance_refresh_lock.acquire(blocking=False):
+        return  # A refresh is already in flight
+    try:
+        friends = fetch_splitwise_friends(api_key)
+        if friends is not None:
+            save_splitwise_friend_balances(friends, api_key)
+    except Exception as e:
+        print(f"⚠️ Splitwise balance refresh failed: {e}", flush=True)
+    finally:
+        _splitwise_balance_refresh_lock.release()
+
+def schedule_splitwise_friend_refresh(api_key):
+    """Queue a background refresh on crew_io_executor unless one is already running (polls call this constantly)"""
+    if not _splitwise_balance_refresh_lock.locked():
+        crew_io_executor.submit(refresh_splitwise_friend_balances, api_key)
+
+def plan_splitwise_transfers(friends, tracked_friends, crew_headers):
+    """(friend_name, pocket_id, amount_owed, current_pocket_balance) for each tracked friend.
+    Pocket balances come from one aliased GetSubaccounts request, with concurrent single reads for any it couldn't
+    answer; current_pocket_balance is None if the pocket still couldn't be read."""
+    owed = []
+    remaining = set(tracked_friends)
+    for friend in friends:
+        if not remaining:
+            break  # Every tracked friend has been seen; skip the rest of the friends list
+        friend_id = friend.get("id")
+        if friend_id not in remaining:
+            continue
+        remaining.discard(friend_id)
+        tracked = tracked_friends[friend_id]
+
+        # Negative balance = user owes money (we need to save for this); positive = friend owes user
+        splitwise_balance = splitwise_friend_balance(friend)
+        owed.append((tracked["name"], tracked["pocket_id"], max(0.0, -splitwise_balance)))
+
+    pocket_ids = [pocket_id for _, pocket_id, _ in owed]
+    try:
+        balances = fetch_pocket_balances(pocket_ids, crew_headers)
+    except Exception as e:
+        print(f"⚠️ Batched Splitwise pocket balance lookup failed, falling back to one request per pocket: {e}", flush=True)
+        balances = dict.fromkeys(pocket_ids)
+
+    unknown = [pocket_id for pocket_id in pocket_ids if balances[pocket_id] is None]
+    if unknown:
+        def read_or_none(pocket_id):
+            try:
+                return read_pocket_balance(pocket_id, crew_headers)
+            except Exception as e:
+                print(f"⚠️ Could not read Splitwise pocket {pocket_id} balance: {e}", flush=True)
+                return None
+        balances.update(zip(unknown, crew_io_executor.map(read_or_none, unknown)))
+    return [(name, pocket_id, amount_owed, balances[pocket_id]) for name, pocket_id, amount_owed in owed]
+
+def apply_splitwise_transfers(plans, checking_id):
+    """Move money so each pocket matches what's owed, concurrently.
+    Returns (friend_name, difference, amount_owed, move_money result) for every pocket that needed a transfer."""
+    futures = []
+    for friend_name, pocket_id, amount_owed, current_balance in plans:
+        if current_balance is None:
+            print(f"⚠️ Splitwise: skipping {friend_name}, pocket balance unknown", flush=True)
+            continue
+        difference = amount_owed - current_balance
+        if abs(difference) < 0.01:
+            continue
+        if difference > 0:
+            # Need to add money to pocket (user owes more than pocket has)
+            future = crew_io_executor.submit(move_money, checking_id, pocket_id, difference, f"Splitwise sync: {friend_name}")
+        else:
+            # Need to remove money from pocket (user owes less than pocket has)
+            future = crew_io_executor.submit(move_money, pocket_id, checking_id, abs(difference), f"Splitwise sync: {friend_name}")
+        futures.append((friend_name, difference, amount_owed, future))
+    return [(friend_name, difference, amount_owed, future.result()) for friend_name, difference, amount_owed, future in futures]
+
 def check_splitwise_balances():
     """Check if it's time to sync Splitwise and send notifications if balances changed"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
 
         # Get Splitwise config
@@ -6099,21 +6644,16 @@ def check_splitwise_balances():
             print("⏭️ Splitwise: no API key configured", flush=True)
             return
 
-        # Fetch friends list
-        headers = {"Authorization": f"Bearer {api_key}"}
-        response = requests.get(
-            "https://secure.splitwise.com/api/v3.0/get_friends",
-            headers=headers,
-            timeout=30
-        )
-
-        if response.status_code != 200:
+        # Fetch friends list (fresh, since pocket transfers are based on it)
+        friends = fetch_splitwise_friends(api_key, max_age=0)
+        if friends is None:
             conn.close()
             return
+        save_splitwise_friend_balances(friends, api_key)
 
         # Get tracked friends
         c.execute("SELECT friend_id, friend_name, pocket_id FROM splitwise_pocket_config")
-        tracked_friends = {row[0]: {"name": row[1], "pocket_id": row[2]} for row in c.fetchall()}
+        tracked_friends = {row[0]: {"name": row[1], "pocket_id": row[2]} for row in c}
 
         if not tracked_friends:
             conn.close()
@@ -6129,53 +6669,15 @@ def check_splitwise_balances():
             conn.close()
             return
 
-        friends_data = response.json()
-
-        for friend in friends_data.get("friends", []):
-            friend_id = friend.get("id")
-
-            if friend_id not in tracked_friends:
+        plans = plan_splitwise_transfers(friends, tracked_friends, crew_headers)
+        for friend_name, difference, _, result in apply_splitwise_transfers(plans, checking_id):
+            if result.get("error"):
                 continue
-
-            tracked = tracked_friends[friend_id]
-            pocket_id = tracked["pocket_id"]
-            friend_name = tracked["name"]
-
-            # Get Splitwise balance
-            balance_list = friend.get("balance", [])
-            if isinstance(balance_list, list) and len(balance_list) > 0:
-                splitwise_balance = float(balance_list[0].get("amount", "0"))
+            friends_changed.append(friend_name)
+            if difference > 0:
+                print(f"➕ Splitwise: Added ${difference:.2f} to {friend_name}'s pocket", flush=True)
             else:
-                splitwise_balance = float(balance_list) if balance_list else 0.0
-
-            amount_owed = abs(splitwise_balance) if splitwise_balance < 0 else 0
-
-            # Get current pocket balance
-            query_string = """query GetSubaccount($id: ID!) { node(id: $id) { ... on Subaccount { id overallBalance } } }"""
-            pocket_response = requests.post(URL, headers=crew_headers, json={
-                "operationName": "GetSubaccount",
-                "variables": {"id": pocket_id},
-                "query": query_string
-            })
-            pocket_data = pocket_response.json()
-            current_balance_cents = pocket_data.get("data", {}).get("node", {}).get("overallBalance", 0)
-            current_balance = current_balance_cents / 100.0
-
-            # Calculate difference
-            difference = amount_owed - current_balance
-
-            if abs(difference) >= 0.01:  # Balance changed
-                if difference > 0:
-                    result = move_money(checking_id, pocket_id, difference, f"Splitwise sync: {friend_name}")
-                    if not result.get("error"):
-                        friends_changed.append(friend_name)
-                        print(f"➕ Splitwise: Added ${difference:.2f} to {friend_name}'s pocket", flush=True)
-                else:
-                    amount_to_remove = abs(difference)
-                    result = move_money(pocket_id, checking_id, amount_to_remove, f"Splitwise sync: {friend_name}")
-                    if not result.get("error"):
-                        friends_changed.append(friend_name)
-                        print(f"➖ Splitwise: Removed ${amount_to_remove:.2f} from {friend_name}'s pocket", flush=True)
+                print(f"➖ Splitwise: Removed ${abs(difference):.2f} from {friend_name}'s pocket", flush=True)
 
         # Update sync timestamp
         c.execute("UPDATE splitwise_config SET last_sync = ? WHERE id = (SELECT MIN(id) FROM splitwise_config)",
@@ -6196,15 +6698,22 @@ def check_splitwise_balances():
         print(f"❌ Error checking Splitwise balances: {e}", flush=True)
         traceback.print_exc()
 
+BACKGROUND_CHECK_INTERVAL = 30  # seconds
+background_stop = threading.Event()  # Set at interpreter exit so the checker stops between runs
+atexit.register(background_stop.set)
+
 def background_transaction_checker():
     """Background thread that checks for new transactions and Splitwise balances"""
-    while True:
+    while not background_stop.is_set():
+        started = time.monotonic()
         try:
             check_credit_card_transactions()
             check_splitwise_balances()
         except Exception as e:
             print(f"Error in background transaction checker: {e}")
-        time.sleep(30)  # Check every 30 seconds
+        # Keep a fixed cadence measured from the start of each run. Runs never overlap, and a run that
+        # overshoots the interval is followed by a single catch-up run rather than a backlog.
+        background_stop.wait(max(0, BACKGROUND_CHECK_INTERVAL - (time.monotonic() - started)))
 
 def start_background_thread_once():
     """Start the background thread exactly once (thread-safe)"""
@@ -6228,25 +6737,25 @@ def api_get_credit_card_transactions():
     try:
         account_id = request.args.get('accountId')  # Optional filter
 
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
+        # Reader connection: this is polled while the background sync writes, which WAL allows
+        with db_read_pool.acquire() as conn:
+            c = conn.cursor()
 
-        if account_id:
-            # Filter by specific account
-            c.execute("""SELECT transaction_id, amount, date, merchant, description, is_pending, created_at
-                         FROM credit_card_transactions
-                         WHERE account_id = ?
-                         ORDER BY date DESC, created_at DESC
-                         LIMIT 100""", (account_id,))
-        else:
-            # Return all accounts
-            c.execute("""SELECT transaction_id, amount, date, merchant, description, is_pending, created_at
-                         FROM credit_card_transactions
-                         ORDER BY date DESC, created_at DESC
-                         LIMIT 100""")
+            if account_id:
+                # Filter by specific account
+                c.execute("""SELECT transaction_id, amount, date, merchant, description, is_pending, created_at
+                             FROM credit_card_transactions
+                             WHERE account_id = ?
+                             ORDER BY date DESC, created_at DESC
+                             LIMIT 100""", (account_id,))
+            else:
+                # Return all accounts
+                c.execute("""SELECT transaction_id, amount, date, merchant, description, is_pending, created_at
+                             FROM credit_card_transactions
+                             ORDER BY date DESC, created_at DESC
+                             LIMIT 100""")
 
-        rows = c.fetchall()
-        conn.close()
+            rows = c.fetchall()
 
         transactions = []
         for row in rows:
@@ -6266,51 +6775,51 @@ def api_get_credit_card_transactions():
         return jsonify({"error": str(e)}), 500
 
 # --- SIMPLEFIN API ENDPOINTS ---
-import base64
-from urllib.parse import urlparse
 
 def store_simplefin_access_url(access_url):
     """Store or update the SimpleFin access URL in the global config table"""
     try:
         print(f"🔍 store_simplefin_access_url called with access_url: {access_url[:50] if access_url else 'None'}...", flush=True)
 
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-
-        # Check if we already have an access URL
-        c.execute("SELECT id FROM simplefin_config LIMIT 1")
-        existing = c.fetchone()
-
-        if existing:
-            # Update existing access URL and mark as valid
-            print("Updating existing SimpleFin access URL", flush=True)
-            c.execute("UPDATE simplefin_config SET access_url = ?, is_valid = 1 WHERE id = ?", (access_url, existing[0]))
-        else:
-            # Insert new access URL (is_valid defaults to 1)
-            print("Storing new SimpleFin access URL", flush=True)
-            c.execute("INSERT INTO simplefin_config (access_url, is_valid) VALUES (?, 1)", (access_url,))
-
-        conn.commit()
-        rows_affected = c.rowcount
-        conn.close()
+        # Insert the access URL, or replace the existing one and mark it valid again
+        with db_pool.acquire() as conn:
+            rows_affected = conn.execute(UPSERT_SIMPLEFIN_ACCESS_URL_SQL, (access_url,)).rowcount
+            conn.commit()
 
         print(f"✅ SimpleFin access URL stored successfully ({rows_affected} rows affected)", flush=True)
-        cache.clear()
+        cache.invalidate("simplefin_access_url", *CC_CONFIG_CACHE_KEYS)
         return True
     except Exception as e:
         print(f"❌ ERROR storing SimpleFin access URL: {e}", flush=True)
-        import traceback
         traceback.print_exc()
         return False
 
+# Setup tokens are a base64-encoded claim URL; anything else is rejected before decoding
+SIMPLEFIN_SETUP_TOKEN_MAX_LEN = 8192
+SIMPLEFIN_SETUP_TOKEN_RE = re.compile(r"[A-Za-z0-9+/]+={0,2}")
+
+def decode_simplefin_setup_token(token):
+    """Decode a SimpleFin setup token to its claim URL; returns None if it is not a base64 http(s) URL"""
+    token = (token or '').strip()
+    if not token or len(token) > SIMPLEFIN_SETUP_TOKEN_MAX_LEN or not SIMPLEFIN_SETUP_TOKEN_RE.fullmatch(token):
+        return None
+    try:
+        claim_url = base64.b64decode(token, validate=True).decode('utf-8')
+        parsed = urlsplit(claim_url)
+    except ValueError:  # binascii.Error and UnicodeDecodeError are both ValueErrors
+        return None
+    return claim_url if parsed.scheme in ('http', 'https') and parsed.hostname else None
+
 def simplefin_claim_token(token):
     """Claim a SimpleFin token and return the access URL"""
     try:
         # Decode the Base64 token to get the claim URL
-        claim_url = base64.b64decode(token).decode('utf-8')
+        claim_url = decode_simplefin_setup_token(token)
+        if not claim_url:
+            return {"error": "Invalid token format. Token must be Base64-encoded."}
 
         # POST to the claim endpoint
-        response = requests.post(claim_url, timeout=30)
+        response = http_session.post(claim_url, timeout=30)
 
         if response.status_code == 403:
             return {"error": "Token has been compromised or already claimed"}
@@ -6322,8 +6831,6 @@ def simplefin_claim_token(token):
         access_url = response.text.strip()
 
         return {"success": True, "accessUrl": access_url}
-    except base64.binascii.Error:
-        return {"error": "Invalid token format. Token must be Base64-encoded."}
     except Exception as e:
         return {"error": f"Failed to claim token: {str(e)}"}
 
@@ -6336,35 +6843,40 @@ def simplefin_get_accounts(access_url, account_id=None):
         if account_id:
             params['account'] = account_id
 
-        response = requests.get(f"{access_url}/accounts", params=params, timeout=30)
-
-        if response.status_code != 200:
-            # If 403, mark token as invalid
-            if response.status_code == 403:
-                print("🚫 SimpleFin token has been revoked or is invalid (get_accounts)", flush=True)
-                conn = sqlite3.connect(DB_FILE)
-                c = conn.cursor()
-                c.execute("UPDATE simplefin_config SET is_valid = 0")
-                conn.commit()
-                conn.close()
+        with http_session.get(f"{access_url}/accounts", params=params, timeout=30, stream=bool(ijson)) as response:
+            if response.status_code != 200:
+                # If 403, mark token as invalid
+                if response.status_code == 403:
+                    print("🚫 SimpleFin token has been revoked or is invalid (get_accounts)", flush=True)
+                    conn = db_connect()
+                    c = conn.cursor()
+                    c.execute(INVALIDATE_SIMPLEFIN_SQL)
+                    conn.commit()
+                    conn.close()
 
-            return {"error": f"SimpleFin API error: {response.status_code} - {response.text}"}
+                return {"error": f"SimpleFin API error: {response.status_code} - {response.text}"}
 
-        data = response.json()
+            if ijson:
+                # Walk the accounts array one object at a time instead of materializing the whole payload
+                response.raw.decode_content = True  # Let urllib3 undo any gzip before ijson reads it
+                raw_accounts = list(ijson.items(response.raw, 'accounts.item', use_float=True))
+            else:
+                raw_accounts = decode_json_response(response).get("accounts", [])
 
         # Transform SimpleFin format to match our expected format
         accounts = []
-        for account in data.get("accounts", []):
+        for account in raw_accounts:
+            # The account filter is applied server-side; this only guards against extra entries so callers can take accounts[0]
+            if account_id and account.get("id") != account_id:
+                continue
+
             # SimpleFin returns balance as a string, convert to float
-            balance_str = account.get("balance", "0")
-            try:
-                balance_float = float(balance_str)
-            except (ValueError, TypeError):
-                balance_float = 0
+            raw_balance = account.get("balance", "0")
+            balance_float = parse_simplefin_amount(raw_balance)
 
-            # Credit accounts have negative balance (amount owed)
-            # Also check if balance_str starts with "-" to catch "-0" cases
-            is_credit_account = balance_float < 0 or (balance_str and str(balance_str).strip().startswith("-"))
+            # Credit accounts have negative balance (amount owed); copysign also catches "-0" (float -0.0).
+            # An unparseable balance falls back to 0.0, so the raw string's sign decides in that case.
+            is_credit_account = math.copysign(1.0, balance_float) < 0 or str(raw_balance).lstrip().startswith("-")
 
             accounts.append({
                 "id": account.get("id"),
@@ -6386,23 +6898,17 @@ def simplefin_get_accounts(access_url, account_id=None):
 def api_simplefin_get_access_url():
     """Get the stored SimpleFin access URL if it exists"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-
         # Get SimpleFin access URL from global config
-        c.execute("SELECT access_url FROM simplefin_config LIMIT 1")
-        row = c.fetchone()
-        conn.close()
+        access_url = get_simplefin_access_url()
 
-        if row and row[0]:
-            print(f"✅ SimpleFin access URL found (url length: {len(row[0])})", flush=True)
-            return jsonify({"success": True, "accessUrl": row[0]})
+        if access_url:
+            print(f"✅ SimpleFin access URL found (url length: {len(access_url)})", flush=True)
+            return jsonify({"success": True, "accessUrl": access_url})
         else:
             print(f"⚠️ No SimpleFin access URL found in database", flush=True)
             return jsonify({"success": False, "accessUrl": None})
     except Exception as e:
         print(f"❌ ERROR fetching SimpleFin access URL: {e}", flush=True)
-        import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
@@ -6410,7 +6916,7 @@ def api_simplefin_get_access_url():
 @login_required
 def api_simplefin_claim_token():
     """Claim a SimpleFin token and store the access URL immediately"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     token = data.get('token')
 
     print(f"🔍 api_simplefin_claim_token called with token: {token[:20] if token else 'None'}...", flush=True)
@@ -6441,7 +6947,7 @@ def api_simplefin_claim_token():
 @login_required
 def api_simplefin_accounts():
     """List all accounts from SimpleFin using the access URL"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     access_url = data.get('accessUrl')
 
     if not access_url:
@@ -6458,7 +6964,7 @@ def api_simplefin_accounts():
 @login_required
 def api_simplefin_set_credit_card():
     """Store the selected SimpleFin credit card account"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     account_id = data.get('accountId')
     account_name = data.get('accountName', '')
 
@@ -6466,19 +6972,15 @@ def api_simplefin_set_credit_card():
         return jsonify({"error": "accountId is required"}), 400
 
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-
         # Insert or ignore the account selection (allows multiple accounts, access_url is stored globally in simplefin_config)
-        c.execute("""INSERT OR IGNORE INTO credit_card_config
-                     (account_id, account_name, provider, created_at)
-                     VALUES (?, ?, 'simplefin', CURRENT_TIMESTAMP)""",
-                  (account_id, account_name))
-
-        conn.commit()
-        conn.close()
+        with db_pool.acquire() as conn:
+            conn.execute("""INSERT OR IGNORE INTO credit_card_config
+                            (account_id, account_name, provider, created_at)
+                            VALUES (?, ?, 'simplefin', CURRENT_TIMESTAMP)""",
+                         (account_id, account_name))
+            conn.commit()
 
-        cache.clear()
+        cache.invalidate(*CC_CONFIG_CACHE_KEYS)
         return jsonify({"success": True, "message": "SimpleFin credit card account saved", "needsBalanceSync": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -6487,7 +6989,7 @@ def api_simplefin_set_credit_card():
 @login_required
 def api_simplefin_get_balance():
     """Get the balance for a specific SimpleFin account"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     account_id = data.get('accountId')
     access_url = data.get('accessUrl')
 
@@ -6501,11 +7003,11 @@ def api_simplefin_get_balance():
         if "error" in result:
             return jsonify(result), 400
 
-        for account in result.get("accounts", []):
-            if account["id"] == account_id:
-                return jsonify({"balance": {"amount": account["balance"]}})
+        accounts = result.get("accounts")
+        if not accounts:
+            return jsonify({"error": "Account not found"}), 404
 
-        return jsonify({"error": "Account not found"}), 404
+        return jsonify({"balance": {"amount": accounts[0]["balance"]}})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -6513,7 +7015,7 @@ def api_simplefin_get_balance():
 @login_required
 def api_simplefin_create_pocket_with_balance():
     """Create the credit card pocket for SimpleFin and optionally sync balance"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     account_id = data.get('accountId')
     sync_balance = data.get('syncBalance', False)
 
@@ -6521,7 +7023,7 @@ def api_simplefin_create_pocket_with_balance():
         return jsonify({"error": "accountId is required"}), 400
 
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
 
         # Get account info
@@ -6533,10 +7035,8 @@ def api_simplefin_create_pocket_with_balance():
 
         account_name = row[0]
 
-        # Get SimpleFin access URL from global config
-        c.execute("SELECT access_url FROM simplefin_config LIMIT 1")
-        url_row = c.fetchone()
-        access_url = url_row[0] if url_row else None
+        # Get SimpleFin access URL from global config
+        access_url = get_simplefin_access_url()
 
         # Fetch balance and transactions from SimpleFin in a single request
         # This data is reused below for both pocket creation (balance) and initial transaction sync
@@ -6545,12 +7045,7 @@ def api_simplefin_create_pocket_with_balance():
         current_balance_value = 0
         if access_url:
             try:
-                from datetime import datetime, timedelta
-                tz = get_configured_timezone()
-                now_local = datetime.now(tz) if tz else datetime.now()
-                start_date = now_local - timedelta(days=30)
-                start_timestamp = int(start_date.timestamp())
-                end_timestamp = int(now_local.timestamp())
+                start_timestamp, end_timestamp = simplefin_sync_window()
 
                 params = {
                     'start-date': start_timestamp,
@@ -6558,16 +7053,12 @@ def api_simplefin_create_pocket_with_balance():
                     'pending': 1,
                     'account': account_id
                 }
-                response = requests.get(f"{access_url}/accounts", params=params, timeout=60)
+                response = http_session.get(f"{access_url}/accounts", params=params, timeout=60)
                 if response.status_code == 200:
-                    simplefin_data = response.json()
+                    simplefin_data = decode_json_response(response)
                     for account in simplefin_data.get("accounts", []):
                         if account.get("id") == account_id:
-                            balance_str = account.get("balance", "0")
-                            try:
-                                current_balance_value = abs(float(balance_str))
-                            except (ValueError, TypeError):
-                                current_balance_value = 0
+                            current_balance_value = abs(parse_simplefin_amount(account.get("balance", "0")))
                             if sync_balance:
                                 initial_amount = str(current_balance_value)
                             break
@@ -6593,25 +7084,24 @@ def api_simplefin_create_pocket_with_balance():
         c.execute("UPDATE credit_card_config SET pocket_id = ?, current_balance = ? WHERE account_id = ? AND provider = 'simplefin'",
                  (pocket_id, current_balance_value, account_id))
         conn.commit()
-
-        # Process initial transactions using the data already fetched above — no second API call
-        if simplefin_data:
-            print(f"🔄 Processing initial transactions for newly added SimpleFin account {account_id} (balance synced: {sync_balance})", flush=True)
-            global _last_simplefin_sync
-
-            try:
-                check_simplefin_transactions(conn, c, account_id, pocket_id, access_url, is_initial_sync=True, prefetched_data=simplefin_data)
-                _last_simplefin_sync[account_id] = time.time()
-                print(f"✅ Initial transaction sync complete for account {account_id}, hourly timer reset", flush=True)
-            except Exception as e:
-                print(f"⚠️ Error processing initial transactions: {e}", flush=True)
-                import traceback
-                traceback.print_exc()
-
         conn.close()
 
-        cache.clear()
-        return jsonify({"success": True, "message": "SimpleFin credit card pocket created", "pocketId": pocket_id, "syncedBalance": sync_balance})
+        # Process initial transactions in the background using the data already fetched above — no second API call.
+        # The pocket exists now, so the client doesn't wait on the transaction pass; duplicate clicks don't queue it twice.
+        initial_sync_queued = False
+        if simplefin_data:
+            with _simplefin_initial_syncs_lock:
+                if account_id not in _simplefin_initial_syncs:
+                    _simplefin_initial_syncs.add(account_id)
+                    initial_sync_queued = True
+            if initial_sync_queued:
+                print(f"🔄 Queued initial transactions for newly added SimpleFin account {account_id} (balance synced: {sync_balance})", flush=True)
+                _last_simplefin_sync[account_id] = time.time()  # Keep the background checker from syncing it at the same time
+                simplefin_initial_sync_executor.submit(run_simplefin_initial_sync, account_id, pocket_id, access_url, simplefin_data)
+
+        cache.invalidate(*POCKET_CACHE_KEYS)
+        return jsonify({"success": True, "message": "SimpleFin credit card pocket created", "pocketId": pocket_id,
+                        "syncedBalance": sync_balance, "initialSyncQueued": initial_sync_queued})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -6619,7 +7109,7 @@ def api_simplefin_create_pocket_with_balance():
 @login_required
 def api_simplefin_sync_balance():
     """Sync the pocket balance to match the SimpleFin credit card balance"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     account_id = data.get('accountId')
 
     if not account_id:
@@ -6627,78 +7117,48 @@ def api_simplefin_sync_balance():
 
     try:
         # Get pocket_id from database
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("SELECT pocket_id FROM credit_card_config WHERE account_id = ? AND provider = 'simplefin'", (account_id,))
-        row = c.fetchone()
+        with db_read_pool.acquire() as conn:
+            row = conn.execute("SELECT pocket_id FROM credit_card_config WHERE account_id = ? AND provider = 'simplefin'",
+                               (account_id,)).fetchone()
 
         if not row or not row[0]:
-            conn.close()
             return jsonify({"error": "No SimpleFin pocket found for this account"}), 400
 
         pocket_id = row[0]
 
-        # Get SimpleFin access URL from global config
-        c.execute("SELECT access_url FROM simplefin_config LIMIT 1")
-        url_row = c.fetchone()
-        conn.close()
-
-        if not url_row or not url_row[0]:
+        access_url = get_simplefin_access_url()
+        if not access_url:
             return jsonify({"error": "SimpleFin access URL not found"}), 400
 
-        access_url = url_row[0]
+        headers_crew = get_crew_headers()
+        if not headers_crew:
+            return jsonify({"error": "Crew credentials not found"}), 400
+
+        # The pocket balance doesn't depend on SimpleFin, so fetch it from Crew while SimpleFin responds
+        pocket_balance_future = crew_io_executor.submit(read_pocket_balance, pocket_id, headers_crew)
 
         # Get balance from SimpleFin (filtered to this account only)
         balance_result = simplefin_get_accounts(access_url, account_id=account_id)
         if "error" in balance_result:
             return jsonify(balance_result), 400
 
-        target_balance = 0
-        for account in balance_result.get("accounts", []):
-            if account["id"] == account_id:
-                target_balance = abs(account["balance"])
-                break
+        accounts = balance_result.get("accounts")
+        target_balance = abs(accounts[0]["balance"]) if accounts else 0
 
         # Save current balance to database
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("UPDATE credit_card_config SET current_balance = ? WHERE account_id = ? AND provider = 'simplefin'", (target_balance, account_id))
-        conn.commit()
-        conn.close()
-
-        # Get current pocket balance
-        headers_crew = get_crew_headers()
-        if not headers_crew:
-            return jsonify({"error": "Crew credentials not found"}), 400
-
-        query_string = """query GetSubaccount($id: ID!) { node(id: $id) { ... on Subaccount { id overallBalance } } }"""
-        response_crew = requests.post(URL, headers=headers_crew, json={
-            "operationName": "GetSubaccount",
-            "variables": {"id": pocket_id},
-            "query": query_string
-        })
+        with db_pool.acquire() as conn:
+            conn.execute(UPDATE_SIMPLEFIN_CC_BALANCE_SQL, (target_balance, account_id))
+            conn.commit()
 
-        crew_data = response_crew.json()
-        current_balance = 0
-        try:
-            current_balance = crew_data.get("data", {}).get("node", {}).get("overallBalance", 0) / 100.0
-        except:
-            pass
+        current_balance = pocket_balance_future.result()
+        if current_balance is None:
+            return jsonify({"error": "Could not read the pocket balance from Crew"}), 502
 
         # Calculate difference
         difference = target_balance - current_balance
 
         # Get Checking subaccount ID
-        all_subs = get_subaccounts_list()
-        if "error" in all_subs:
-            return jsonify({"error": "Could not get subaccounts list"}), 400
-
-        checking_subaccount_id = None
-        for sub in all_subs.get("subaccounts", []):
-            if sub["name"] == "Checking":
-                checking_subaccount_id = sub["id"]
-                break
-
+        checking_subaccount_id = get_checking_subaccount_id()
         if not checking_subaccount_id:
             return jsonify({"error": "Could not find Checking subaccount"}), 400
 
@@ -6712,7 +7172,7 @@ def api_simplefin_sync_balance():
             if "error" in result:
                 return jsonify({"error": f"Failed to sync balance: {result['error']}"}), 500
 
-        cache.clear()
+        cache.invalidate(*POCKET_CACHE_KEYS)
         return jsonify({"success": True, "message": "Balance synced", "targetBalance": target_balance, "previousBalance": current_balance})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -6722,18 +7182,15 @@ def api_simplefin_sync_balance():
 def api_simplefin_get_batch_mode():
     """Get the batch mode setting for a SimpleFin account"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         account_id = data.get("account_id")
 
         if not account_id:
             return jsonify({"error": "account_id is required"}), 400
 
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-
-        c.execute("SELECT batch_mode FROM credit_card_config WHERE account_id = ? AND provider = 'simplefin'", (account_id,))
-        row = c.fetchone()
-        conn.close()
+        with db_read_pool.acquire() as conn:
+            row = conn.execute("SELECT batch_mode FROM credit_card_config WHERE account_id = ? AND provider = 'simplefin'",
+                               (account_id,)).fetchone()
 
         if not row:
             return jsonify({"error": "Account not found"}), 404
@@ -6749,7 +7206,7 @@ def api_simplefin_get_batch_mode():
 def api_simplefin_set_batch_mode():
     """Set the batch mode setting for a SimpleFin account"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         account_id = data.get("account_id")
         batch_mode = data.get("batch_mode")
 
@@ -6764,18 +7221,14 @@ def api_simplefin_set_batch_mode():
         if batch_mode not in (0, 1):
             return jsonify({"error": "batch_mode must be 0 or 1"}), 400
 
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-
-        c.execute("UPDATE credit_card_config SET batch_mode = ? WHERE account_id = ? AND provider = 'simplefin'", (batch_mode, account_id))
-        conn.commit()
+        with db_pool.acquire() as conn:
+            c = conn.execute("UPDATE credit_card_config SET batch_mode = ? WHERE account_id = ? AND provider = 'simplefin'",
+                             (batch_mode, account_id))
+            conn.commit()
 
         if c.rowcount == 0:
-            conn.close()
             return jsonify({"error": "Account not found"}), 404
 
-        conn.close()
-
         mode_name = "Batch" if batch_mode == 1 else "Individual"
         print(f"🔧 Updated batch mode for account {account_id} to: {mode_name}", flush=True)
         return jsonify({"success": True, "batch_mode": batch_mode, "message": f"Transfer mode set to {mode_name}"})
@@ -6787,7 +7240,7 @@ def api_simplefin_set_batch_mode():
 def api_simplefin_change_account():
     """Delete the SimpleFin credit card pocket and clear config"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
 
         # Get current config
@@ -6810,31 +7263,15 @@ def api_simplefin_change_account():
         headers_crew = get_crew_headers()
         if headers_crew and pocket_id:
             try:
-                query_string = """query GetSubaccount($id: ID!) { node(id: $id) { ... on Subaccount { id overallBalance } } }"""
-                response_crew = requests.post(URL, headers=headers_crew, json={
-                    "operationName": "GetSubaccount",
-                    "variables": {"id": pocket_id},
-                    "query": query_string
-                })
-
-                crew_data = response_crew.json()
-                current_balance = 0
-                try:
-                    current_balance = crew_data.get("data", {}).get("node", {}).get("overallBalance", 0) / 100.0
-                except:
-                    pass
+                current_balance = read_pocket_balance(pocket_id, headers_crew)
+                if current_balance is None:
+                    conn.close()
+                    return jsonify({"error": "Could not read the pocket balance; nothing was changed, try again"}), 502
 
                 # Return money to Checking if there's a balance
-                all_subs = get_subaccounts_list()
-                if "error" not in all_subs:
-                    checking_subaccount_id = None
-                    for sub in all_subs.get("subaccounts", []):
-                        if sub["name"] == "Checking":
-                            checking_subaccount_id = sub["id"]
-                            break
-
-                    if checking_subaccount_id and current_balance > 0.01:
-                        move_money(pocket_id, checking_subaccount_id, str(current_balance), "Returning SimpleFin credit card pocket funds to Safe-to-Spend")
+                checking_subaccount_id = get_checking_subaccount_id()
+                if checking_subaccount_id and current_balance > 0.01:
+                    move_money(pocket_id, checking_subaccount_id, str(current_balance), "Returning SimpleFin credit card pocket funds to Safe-to-Spend")
 
                 # Delete the pocket
                 delete_subaccount_action(pocket_id)
@@ -6843,13 +7280,14 @@ def api_simplefin_change_account():
 
         # Delete config and transactions for this specific account
         # Note: We keep the access_url in simplefin_config as it works for all accounts
+        c.execute("BEGIN IMMEDIATE")  # Take the write lock up front; both deletes commit together
         c.execute("DELETE FROM credit_card_config WHERE account_id = ? AND provider = 'simplefin'", (account_id,))
         c.execute("DELETE FROM credit_card_transactions WHERE account_id = ?", (account_id,))
 
         conn.commit()
         conn.close()
 
-        cache.clear()
+        cache.invalidate(*POCKET_CACHE_KEYS)
         return jsonify({"success": True, "message": "SimpleFin account changed. Pocket deleted and funds returned to Safe-to-Spend."})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -6859,13 +7297,13 @@ def api_simplefin_change_account():
 def api_simplefin_stop_tracking():
     """Delete the SimpleFin credit card pocket and all config"""
     try:
-        data = request.json
+        data = request.get_json(silent=True) or {}
         account_id = data.get('accountId') if data else None
 
         if not account_id:
             return jsonify({"error": "accountId is required"}), 400
 
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
 
         # Get current config for the specific account
@@ -6882,31 +7320,15 @@ def api_simplefin_stop_tracking():
         headers_crew = get_crew_headers()
         if headers_crew and pocket_id:
             try:
-                query_string = """query GetSubaccount($id: ID!) { node(id: $id) { ... on Subaccount { id overallBalance } } }"""
-                response_crew = requests.post(URL, headers=headers_crew, json={
-                    "operationName": "GetSubaccount",
-                    "variables": {"id": pocket_id},
-                    "query": query_string
-                })
-
-                crew_data = response_crew.json()
-                current_balance = 0
-                try:
-                    current_balance = crew_data.get("data", {}).get("node", {}).get("overallBalance", 0) / 100.0
-                except:
-                    pass
+                current_balance = read_pocket_balance(pocket_id, headers_crew)
+                if current_balance is None:
+                    conn.close()
+                    return jsonify({"error": "Could not read the pocket balance; nothing was changed, try again"}), 502
 
                 # Return money to Checking
-                all_subs = get_subaccounts_list()
-                if "error" not in all_subs:
-                    checking_subaccount_id = None
-                    for sub in all_subs.get("subaccounts", []):
-                        if sub["name"] == "Checking":
-                            checking_subaccount_id = sub["id"]
-                            break
-
-                    if checking_subaccount_id and current_balance > 0.01:
-                        move_money(pocket_id, checking_subaccount_id, str(current_balance), "Returning SimpleFin credit card pocket funds to Safe-to-Spend")
+                checking_subaccount_id = get_checking_subaccount_id()
+                if checking_subaccount_id and current_balance > 0.01:
+                    move_money(pocket_id, checking_subaccount_id, str(current_balance), "Returning SimpleFin credit card pocket funds to Safe-to-Spend")
 
                 # Delete the pocket
                 delete_subaccount_action(pocket_id)
@@ -6914,78 +7336,94 @@ def api_simplefin_stop_tracking():
                 print(f"Warning: Error deleting pocket: {e}")
 
         # Delete all config and transactions
+        c.execute("BEGIN IMMEDIATE")  # Take the write lock up front; both deletes commit together
         c.execute("DELETE FROM credit_card_config WHERE account_id = ? AND provider = 'simplefin'", (account_id,))
         c.execute("DELETE FROM credit_card_transactions WHERE account_id = ?", (account_id,))
         conn.commit()
         conn.close()
 
-        cache.clear()
+        cache.invalidate(*POCKET_CACHE_KEYS)
         return jsonify({"success": True, "message": "SimpleFin tracking stopped. Pocket deleted and funds returned to Safe-to-Spend."})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def release_simplefin_pocket(pocket_id, current_balance, checking_subaccount_id, headers_crew):
+    """Return a disconnected SimpleFin pocket's funds to Checking and delete it (balance looked up if None).
+    Returns False, leaving the pocket in place, when its balance can't be read."""
+    if current_balance is None:
+        current_balance = read_pocket_balance(pocket_id, headers_crew)
+    if current_balance is None:
+        print(f"Warning: Could not read balance of pocket {pocket_id}; keeping it so its funds aren't lost")
+        return False
+
+    # Return money to Checking
+    if checking_subaccount_id and current_balance > 0.01:
+        move_money(pocket_id, checking_subaccount_id, str(current_balance), f"Disconnecting SimpleFin - returning funds")
+
+    # Delete the pocket
+    delete_subaccount_action(pocket_id)
+    return True
+
 @app.route('/api/simplefin/disconnect', methods=['POST'])
 @login_required
 def api_simplefin_disconnect():
     """Completely disconnect SimpleFin - removes access URL and all account tracking"""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = db_connect()
         c = conn.cursor()
 
-        # Get all SimpleFin accounts with pockets
-        c.execute("SELECT account_id, pocket_id FROM credit_card_config WHERE provider = 'simplefin' AND pocket_id IS NOT NULL")
-        accounts = c.fetchall()
+        # Get all SimpleFin accounts; the ones with pockets get their funds returned below
+        c.execute("SELECT account_id, pocket_id FROM credit_card_config WHERE provider = 'simplefin'")
+        all_accounts = c.fetchall()
+        account_ids = [account_id for account_id, _ in all_accounts]
+        accounts = [(account_id, pocket_id) for account_id, pocket_id in all_accounts if pocket_id is not None]
 
-        # Return funds and delete pockets for all accounts
+        # Return funds and delete pockets for all accounts; accounts whose pocket had to be kept stay configured
+        kept_accounts = set()
         headers_crew = get_crew_headers()
         if headers_crew:
             # Get checking account
-            all_subs = get_subaccounts_list()
-            checking_subaccount_id = None
-            if "error" not in all_subs:
-                for sub in all_subs.get("subaccounts", []):
-                    if sub["name"] == "Checking":
-                        checking_subaccount_id = sub["id"]
-                        break
-
-            # Process each account
-            for account_id, pocket_id in accounts:
-                try:
-                    # Get pocket balance
-                    query_string = """query GetSubaccount($id: ID!) { node(id: $id) { ... on Subaccount { id overallBalance } } }"""
-                    response_crew = requests.post(URL, headers=headers_crew, json={
-                        "operationName": "GetSubaccount",
-                        "variables": {"id": pocket_id},
-                        "query": query_string
-                    })
-
-                    crew_data = response_crew.json()
-                    current_balance = 0
-                    try:
-                        current_balance = crew_data.get("data", {}).get("node", {}).get("overallBalance", 0) / 100.0
-                    except:
-                        pass
+            checking_subaccount_id = get_checking_subaccount_id()
 
-                    # Return money to Checking
-                    if checking_subaccount_id and current_balance > 0.01:
-                        move_money(pocket_id, checking_subaccount_id, str(current_balance), f"Disconnecting SimpleFin - returning funds")
-
-                    # Delete the pocket
-                    delete_subaccount_action(pocket_id)
+            # Read every pocket's balance in one request
+            try:
+                pocket_balances = fetch_pocket_balances([pocket_id for _, pocket_id in accounts], headers_crew)
+            except Exception as e:
+                print(f"Warning: Batched pocket balance lookup failed, falling back to one request per pocket: {e}")
+                pocket_balances = {}
+
+            # Pockets are independent, so return funds and delete them concurrently; DB cleanup waits for all of them
+            futures = {
+                crew_io_executor.submit(release_simplefin_pocket, pocket_id, pocket_balances.get(pocket_id),
+                                        checking_subaccount_id, headers_crew): account_id
+                for account_id, pocket_id in accounts
+            }
+            for future in as_completed(futures):
+                try:
+                    if not future.result():
+                        kept_accounts.add(futures[future])
                 except Exception as e:
-                    print(f"Warning: Error deleting pocket for account {account_id}: {e}")
+                    print(f"Warning: Error deleting pocket for account {futures[future]}: {e}")
+                    kept_accounts.add(futures[future])  # Pocket state unknown; keep tracking it
 
-        # Delete all SimpleFin configs and transactions
-        c.execute("DELETE FROM credit_card_config WHERE provider = 'simplefin'")
-        c.execute("DELETE FROM credit_card_transactions WHERE account_id IN (SELECT account_id FROM credit_card_config WHERE provider = 'simplefin')")
+        # Delete SimpleFin configs and transactions for every account whose pocket is gone
+        removed_ids = [(account_id,) for account_id in account_ids if account_id not in kept_accounts]
+        c.execute("BEGIN IMMEDIATE")  # Take the write lock up front; all the deletes commit together
+        # Transactions first, by the ids read above (the old subquery ran after the configs were already gone)
+        c.executemany("DELETE FROM credit_card_transactions WHERE account_id = ?", removed_ids)
+        c.executemany("DELETE FROM credit_card_config WHERE account_id = ? AND provider = 'simplefin'", removed_ids)
 
-        # Delete the SimpleFin access URL (complete disconnect)
-        c.execute("DELETE FROM simplefin_config")
+        # Delete the SimpleFin access URL (complete disconnect) only once nothing still depends on it
+        if not kept_accounts:
+            c.execute("DELETE FROM simplefin_config")
 
         conn.commit()
         conn.close()
 
-        cache.clear()
+        cache.invalidate("simplefin_access_url", *POCKET_CACHE_KEYS)
+        if kept_accounts:
+            return jsonify({"error": f"{len(kept_accounts)} pocket(s) could not be read, so those accounts are still connected. "
+                                     "Try disconnecting again."}), 502
         return jsonify({"success": True, "message": "SimpleFin completely disconnected. All pockets deleted and funds returned."})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -6994,13 +7432,9 @@ def api_simplefin_disconnect():
 @login_required
 def api_get_simplefin_sync_schedule():
     """Get the current SimpleFin sync schedule setting"""
-    import json
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("SELECT sync_times, sync_timezone FROM simplefin_config LIMIT 1")
-        row = c.fetchone()
-        conn.close()
+        with db_read_pool.acquire() as conn:
+            row = conn.execute("SELECT sync_times, sync_timezone FROM simplefin_config LIMIT 1").fetchone()
 
         if row and row[0]:
             sync_times = json.loads(row[0])
@@ -7024,8 +7458,7 @@ def api_get_simplefin_sync_schedule():
 @login_required
 def api_set_simplefin_sync_schedule():
     """Update the SimpleFin sync schedule setting"""
-    import json
-    data = request.json
+    data = request.get_json(silent=True) or {}
     sync_times = data.get('syncTimes')  # Array of times in UTC like ["14:00", "02:00"]
     sync_timezone = data.get('syncTimezone', 'UTC')
 
@@ -7033,21 +7466,13 @@ def api_set_simplefin_sync_schedule():
         return jsonify({"error": "syncTimes array is required"}), 400
 
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-
-        c.execute("SELECT id FROM simplefin_config LIMIT 1")
-        existing = c.fetchone()
-
-        if existing:
-            c.execute("UPDATE simplefin_config SET sync_times = ?, sync_timezone = ? WHERE id = ?",
-                     (json.dumps(sync_times), sync_timezone, existing[0]))
-        else:
+        with db_pool.acquire() as conn:
+            updated = conn.execute("UPDATE simplefin_config SET sync_times = ?, sync_timezone = ? WHERE id = 1",
+                                   (encode_json(sync_times), sync_timezone)).rowcount
+            conn.commit()
+        if updated == 0:
             return jsonify({"error": "SimpleFin not configured"}), 400
 
-        conn.commit()
-        conn.close()
-
         cache.clear()
 
         return jsonify({
@@ -7063,11 +7488,8 @@ def api_set_simplefin_sync_schedule():
 def api_get_simplefin_timezone():
     """Get the configured timezone"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("SELECT sync_timezone FROM simplefin_config LIMIT 1")
-        row = c.fetchone()
-        conn.close()
+        with db_read_pool.acquire() as conn:
+            row = conn.execute("SELECT sync_timezone FROM simplefin_config LIMIT 1").fetchone()
 
         timezone = row[0] if row and row[0] else "America/Denver"
         return jsonify({"success": True, "timezone": timezone})
@@ -7079,7 +7501,7 @@ def api_get_simplefin_timezone():
 def api_set_simplefin_timezone():
     """Set the timezone for date calculations"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         timezone = data.get("timezone")
 
         if not timezone:
@@ -7087,25 +7509,16 @@ def api_set_simplefin_timezone():
 
         # Validate timezone
         try:
-            from zoneinfo import ZoneInfo
             ZoneInfo(timezone)
         except:
             return jsonify({"error": f"Invalid timezone: {timezone}"}), 400
 
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-
-        c.execute("SELECT id FROM simplefin_config LIMIT 1")
-        existing = c.fetchone()
-
-        if existing:
-            c.execute("UPDATE simplefin_config SET sync_timezone = ? WHERE id = ?", (timezone, existing[0]))
-        else:
-            c.execute("INSERT INTO simplefin_config (sync_timezone) VALUES (?)", (timezone,))
-
-        conn.commit()
-        conn.close()
+        with db_pool.acquire() as conn:
+            conn.execute("""INSERT INTO simplefin_config (id, sync_timezone) VALUES (1, ?)
+                            ON CONFLICT(id) DO UPDATE SET sync_timezone = excluded.sync_timezone""", (timezone,))
+            conn.commit()
 
+        cache.clear()
         print(f"🌍 Updated timezone to: {timezone}", flush=True)
         return jsonify({"success": True, "timezone": timezone})
     except Exception as e:
@@ -7116,36 +7529,21 @@ def api_set_simplefin_timezone():
 def api_simplefin_sync_now():
     """Manually trigger SimpleFin sync for all accounts"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-
         # Get SimpleFin access URL
-        c.execute("SELECT access_url FROM simplefin_config LIMIT 1")
-        url_row = c.fetchone()
-        access_url = url_row[0] if url_row and url_row[0] else None
+        access_url = get_simplefin_access_url()
 
         if not access_url:
-            conn.close()
             return jsonify({"error": "SimpleFin not configured"}), 400
 
         # Get all SimpleFin accounts
-        c.execute("SELECT account_id, pocket_id FROM credit_card_config WHERE provider = 'simplefin'")
-        accounts = c.fetchall()
+        with db_read_pool.acquire() as conn:
+            accounts = conn.execute("SELECT account_id, pocket_id FROM credit_card_config WHERE provider = 'simplefin'").fetchall()
 
         if not accounts:
-            conn.close()
             return jsonify({"error": "No SimpleFin accounts configured"}), 400
 
         # Batch fetch all accounts in one SimpleFin request
-        global _last_simplefin_sync
-        synced_count = 0
-
-        from datetime import datetime, timedelta
-        tz = get_configured_timezone()
-        now_local = datetime.now(tz) if tz else datetime.now()
-        start_date = now_local - timedelta(days=30)
-        start_timestamp = int(start_date.timestamp())
-        end_timestamp = int(now_local.timestamp())
+        start_timestamp, end_timestamp = simplefin_sync_window()
         params = [
             ('start-date', start_timestamp),
             ('end-date', end_timestamp),
@@ -7156,41 +7554,89 @@ def api_simplefin_sync_now():
 
         print(f"📡 Manual sync: batch fetching {len(accounts)} SimpleFin account(s) in one request", flush=True)
         print(f"📅 Date range: {start_timestamp} to {end_timestamp} (30 days)", flush=True)
-        response = requests.get(f"{access_url}/accounts", params=params, timeout=60)
+        response = http_session.get(f"{access_url}/accounts", params=params, timeout=60)
         if response.status_code != 200:
             print(f"❌ SimpleFin API error: {response.status_code} - {response.text}", flush=True)
             if response.status_code == 403:
-                c.execute("UPDATE simplefin_config SET is_valid = 0")
-                conn.commit()
-            conn.close()
+                with db_pool.acquire() as conn:
+                    conn.execute(INVALIDATE_SIMPLEFIN_SQL)
+                    conn.commit()
+                cache.invalidate("simplefin_access_url")
             return jsonify({"error": f"SimpleFin API error: {response.status_code}"}), 400
 
-        simplefin_data = response.json()
+        simplefin_data = decode_json_response(response)
         print(f"✅ SimpleFin batch fetch returned {len(simplefin_data.get('accounts', []))} accounts", flush=True)
         for acc in simplefin_data.get('accounts', []):
             print(f"  Account {acc.get('id')}: {len(acc.get('transactions', []))} transactions", flush=True)
 
-        for account_id, pocket_id in accounts:
-            try:
-                check_simplefin_transactions(conn, c, account_id, pocket_id, access_url, prefetched_data=simplefin_data)
-                _last_simplefin_sync[account_id] = time.time()
-                synced_count += 1
-            except Exception as e:
-                print(f"Error syncing account {account_id}: {e}")
+        simplefin_accounts_by_id = index_simplefin_accounts(simplefin_data)
+        # All pocket balances go in one transaction up front; each account's transactions then commit once,
+        # before its transfers, so a crash mid-sync can't replay money movement for rows already stored
+        with db_pool.acquire() as conn:
+            simplefin_balances_saved = save_simplefin_balances(conn, simplefin_accounts_by_id, [row[0] for row in accounts if row[1]])
+
+        def sync_events():
+            """Yield a start event, one event per account as it finishes, then the summary"""
+            synced_count = 0
+            failed_count = 0
+            yield {"total": len(accounts)}
+
+            # A card still waiting on its initial sync would otherwise move money for its whole transaction history
+            with _simplefin_initial_syncs_lock:
+                pending_initial = set(_simplefin_initial_syncs)
+            for account_id, _ in accounts:
+                if account_id in pending_initial:
+                    print(f"⏭️ Skipping SimpleFin account {account_id}: initial sync still pending", flush=True)
+                    yield {"account": account_id, "status": "skipped"}
+            to_sync = [(account_id, pocket_id) for account_id, pocket_id in accounts if account_id not in pending_initial]
+
+            # Accounts are independent, so process them on their own workers and connections (same as the background sync)
+            with ThreadPoolExecutor(max_workers=max(1, min(SIMPLEFIN_SYNC_WORKERS, len(to_sync)))) as executor:
+                futures = {
+                    executor.submit(check_simplefin_account, account_id, pocket_id, access_url, simplefin_data,
+                                    simplefin_accounts_by_id, account_id in simplefin_balances_saved): account_id
+                    for account_id, pocket_id in to_sync
+                }
+                for future in as_completed(futures):
+                    account_id = futures[future]
+                    try:
+                        succeeded = future.result()
+                    except Exception as e:
+                        print(f"Error syncing account {account_id}: {e}")
+                        failed_count += 1
+                        yield {"account": account_id, "status": "error", "error": str(e)}
+                        continue
+                    if succeeded:
+                        _last_simplefin_sync[account_id] = time.time()
+                        synced_count += 1
+                        yield {"account": account_id, "status": "ok"}
+                    else:
+                        failed_count += 1
+                        yield {"account": account_id, "status": "error", "error": "Sync failed, see server log"}
 
-        # Persist last sync timestamp so the frontend can display it
-        if synced_count > 0:
-            from datetime import datetime
-            c.execute("UPDATE simplefin_config SET last_sync = ?", (datetime.utcnow().isoformat() + 'Z',))
-            conn.commit()
+            sync_log_buffer.flush()  # check_simplefin_transactions logs through the buffered sync logger
 
-        conn.close()
+            # Persist last sync timestamp so the frontend can display it
+            if synced_count > 0:
+                with db_pool.acquire() as conn:
+                    conn.execute("UPDATE simplefin_config SET last_sync = ?", (datetime.utcnow().isoformat() + 'Z',))
+                    conn.commit()
 
-        return jsonify({
-            "success": True,
-            "message": f"Synced {synced_count} account(s)",
-            "accountsSynced": synced_count
-        })
+            message = f"Synced {synced_count} account(s)"
+            if failed_count:
+                message += f", {failed_count} failed"
+            yield {
+                "success": True,
+                "message": message,
+                "accountsSynced": synced_count,
+                "accountsFailed": failed_count
+            }
+
+        # Clients that accept NDJSON get progress lines as accounts finish; everyone else gets the summary object
+        if "application/x-ndjson" in request.headers.get("Accept", ""):
+            return Response((encode_json(event) + "\n" for event in sync_events()), mimetype="application/x-ndjson")
+        *_, summary = sync_events()
+        return jsonify(summary)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -7206,33 +7652,28 @@ def api_splitwise_get_config():
 @login_required
 def api_splitwise_save_key():
     """Validate and save Splitwise API key"""
-    api_key = request.json.get('apiKey')
+    api_key = (request.get_json(silent=True) or {}).get('apiKey')
     if not api_key:
         return jsonify({"error": "API key required"}), 400
 
     # Validate by getting current user
-    headers = {"Authorization": f"Bearer {api_key}"}
     try:
-        response = requests.get(
-            "https://secure.splitwise.com/api/v3.0/get_current_user",
-            headers=headers,
-            timeout=30
-        )
+        response = splitwise_get("/get_current_user", api_key)
     except Exception as e:
         return jsonify({"error": f"Network error: {str(e)}"}), 500
 
     if response.status_code == 200:
-        user_data = response.json().get("user", {})
+        user_data = decode_json_response(response).get("user", {})
         user_id = user_data.get("id")
 
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("DELETE FROM splitwise_config")  # Clear old
-        c.execute("INSERT INTO splitwise_config (api_key, user_id, is_valid) VALUES (?, ?, 1)",
-                  (api_key, user_id))
-        conn.commit()
-        conn.close()
+        with db_pool.acquire() as conn:
+            conn.execute("DELETE FROM splitwise_config")  # Clear old
+            conn.execute("INSERT INTO splitwise_config (api_key, user_id, is_valid) VALUES (?, ?, 1)",
+                         (api_key, user_id))
+            conn.execute("DELETE FROM splitwise_friends_cache")  # Stored friends belong to the previous key
+            conn.commit()
 
+        cache.invalidate("splitwise_friends", "splitwise_api_key")  # Cached list belongs to the previous key
         return jsonify({"success": True, "userId": user_id})
     else:
         return jsonify({"error": "Invalid API key"}), 400
@@ -7245,18 +7686,12 @@ def api_splitwise_get_friends():
     if not api_key:
         return jsonify({"error": "Splitwise not configured"}), 400
 
-    headers = {"Authorization": f"Bearer {api_key}"}
     try:
-        response = requests.get(
-            "https://secure.splitwise.com/api/v3.0/get_friends",
-            headers=headers,
-            timeout=30
-        )
+        friends = fetch_splitwise_friends(api_key)
     except Exception as e:
         return jsonify({"error": f"Network error: {str(e)}"}), 500
 
-    if response.status_code == 200:
-        friends = response.json().get("friends", [])
+    if friends is not None:
         return jsonify({"friends": friends})
     return jsonify({"error": "Failed to fetch friends"}), 500
 
@@ -7264,72 +7699,57 @@ def api_splitwise_get_friends():
 @login_required
 def api_splitwise_set_tracked_friends():
     """Set which friends to track (or NULL for all)"""
-    friend_ids = request.json.get('friendIds')
-    tracked_friends_json = json.dumps(friend_ids) if friend_ids else None
-
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
+    friend_ids = (request.get_json(silent=True) or {}).get('friendIds')
+    tracked_friends_json = encode_json(friend_ids) if friend_ids else None
 
     # Store in splitwise_config as temporary preference (will be copied to pocket_config on creation)
-    c.execute("UPDATE splitwise_config SET tracked_friends = ? WHERE id = (SELECT MIN(id) FROM splitwise_config)",
-              (tracked_friends_json,))
-
-    conn.commit()
-    conn.close()
+    with db_pool.acquire() as conn:
+        conn.execute("UPDATE splitwise_config SET tracked_friends = ? WHERE id = (SELECT MIN(id) FROM splitwise_config)",
+                     (tracked_friends_json,))
+        conn.commit()
     return jsonify({"success": True})
 
+# Display name for a splitwise_friends_cache row ("User <id>" when Splitwise has no name)
+SPLITWISE_FRIEND_NAME_SQL = "COALESCE(NULLIF(TRIM(COALESCE(first_name, '') || ' ' || COALESCE(last_name, '')), ''), 'User ' || friend_id)"
+
+# Every cached friend with what the user owes them (negative balance) and what they owe the user (positive balance),
+# those the user owes first (friend_id keeps ties in a stable order)
+SPLITWISE_CREDITORS_SQL = f"""
+    SELECT friend_id,
+           {SPLITWISE_FRIEND_NAME_SQL},
+           ROUND(MAX(-balance, 0), 2) AS amount_owed,
+           ROUND(MAX(balance, 0), 2)
+    FROM splitwise_friends_cache
+    ORDER BY amount_owed DESC, friend_id
+"""
+
 @app.route('/api/splitwise/get-creditors')
 @login_required
 def api_splitwise_get_creditors():
-    """Get list of friends user owes money to (from /get_friends endpoint)"""
+    """Get list of friends user owes money to (from the stored /get_friends list, refreshed in the background)"""
     try:
         api_key = get_splitwise_api_key()
 
         if not api_key:
             return jsonify({"error": "Splitwise not configured"}), 400
 
-        # Fetch friends list with balance information
-        headers = {"Authorization": f"Bearer {api_key}"}
-        response = requests.get(
-            "https://secure.splitwise.com/api/v3.0/get_friends",
-            headers=headers,
-            timeout=30
-        )
+        with db_read_pool.acquire() as conn:
+            rows = conn.execute(SPLITWISE_CREDITORS_SQL).fetchall()
 
-        if response.status_code != 200:
-            return jsonify({"error": "Failed to fetch Splitwise friends"}), 500
+        if rows:
+            schedule_splitwise_friend_refresh(api_key)
+        else:
+            # Nothing stored yet: fetch friends list with balance information now
+            friends = fetch_splitwise_friends(api_key)
+            if friends is None:
+                return jsonify({"error": "Failed to fetch Splitwise friends"}), 500
+            save_splitwise_friend_balances(friends, api_key)
+            with db_read_pool.acquire() as conn:
+                rows = conn.execute(SPLITWISE_CREDITORS_SQL).fetchall()
 
         # Get all friends (show all, regardless of balance)
-        friends_list = []
-        friends_data = response.json()
-
-        for friend in friends_data.get("friends", []):
-            # In Splitwise, balance is a list of balance objects for different currencies
-            # We'll take the first balance (usually USD)
-            balance_list = friend.get("balance", [])
-            if isinstance(balance_list, list) and len(balance_list) > 0:
-                balance = float(balance_list[0].get("amount", "0"))
-            else:
-                balance = float(balance_list) if balance_list else 0.0
-
-            friend_id = friend.get("id")
-            first_name = friend.get("first_name", "")
-            last_name = friend.get("last_name", "")
-            friend_name = f"{first_name} {last_name}".strip() or f"User {friend_id}"
-
-            # Show amount owed (negative balance means user owes, positive means friend owes user)
-            amount_owed = abs(balance) if balance < 0 else 0
-            amount_owed_to_user = abs(balance) if balance > 0 else 0
-
-            friends_list.append({
-                "friendId": friend_id,
-                "friendName": friend_name,
-                "amountOwed": round(amount_owed, 2),
-                "owesYou": round(amount_owed_to_user, 2)
-            })
-
-        # Sort by amount owed descending (those you owe first, then others)
-        friends_list.sort(key=lambda x: x["amountOwed"], reverse=True)
+        friends_list = [{"friendId": friend_id, "friendName": friend_name, "amountOwed": amount_owed, "owesYou": owes_you}
+                        for friend_id, friend_name, amount_owed, owes_you in rows]
 
         return jsonify({"creditors": friends_list})
 
@@ -7337,6 +7757,33 @@ def api_splitwise_get_creditors():
         print(f"❌ Error fetching creditors: {e}", flush=True)
         return jsonify({"error": str(e)}), 500
 
+# Stored balances fund pockets only while they're as fresh as the friends cache; older ones are re-read from Splitwise
+SPLITWISE_STORED_FRIENDS_MAX_AGE = SPLITWISE_FRIENDS_CACHE_TTL
+
+def stored_splitwise_friend_info(client_friends):
+    """{friend_id: {name, balance}} for the friends the client picked, from splitwise_friends_cache.
+    None unless every friend is stored, recent, and owed the same amount the client showed (the caller then asks Splitwise)."""
+    friend_ids = list(client_friends)
+    placeholders = ", ".join("?" * len(friend_ids))
+    with db_read_pool.acquire() as conn:
+        rows = conn.execute(f"""SELECT friend_id, {SPLITWISE_FRIEND_NAME_SQL}, ROUND(MAX(-balance, 0), 2)
+                                FROM splitwise_friends_cache
+                                WHERE friend_id IN ({placeholders}) AND updated_at >= datetime('now', ?)""",
+                            (*friend_ids, f"-{SPLITWISE_STORED_FRIENDS_MAX_AGE} seconds")).fetchall()
+    if len(rows) != len(friend_ids):
+        return None
+
+    friend_info = {}
+    for friend_id, friend_name, amount_owed in rows:
+        try:
+            client_amount = float(client_friends[friend_id].get("amountOwed"))
+        except (TypeError, ValueError):
+            return None
+        if abs(client_amount - amount_owed) >= 0.005:
+            return None  # Balance moved since the client loaded it
+        friend_info[friend_id] = {"name": friend_name, "balance": amount_owed}
+    return friend_info
+
 @app.route('/api/splitwise/create-pockets', methods=['POST'])
 @login_required
 def api_splitwise_create_pockets():
@@ -7347,28 +7794,29 @@ def api_splitwise_create_pockets():
         if not api_key:
             return jsonify({"error": "Splitwise not configured"}), 400
 
-        # Get list of selected friend IDs to create pockets for
-        selected_friend_ids = request.json.get('friendIds', [])
+        # Selected friends as shown by get-creditors ({friendId, friendName, amountOwed}); older clients send friendIds only
+        data = request.get_json(silent=True) or {}
+        try:
+            client_friends = {int(friend["friendId"]): friend for friend in data.get("friends") or []}
+            selected_friend_ids = list(client_friends) or [int(friend_id) for friend_id in data.get('friendIds') or []]
+        except (KeyError, TypeError, ValueError):
+            return jsonify({"error": "Invalid friend selection"}), 400
 
         if not selected_friend_ids:
             return jsonify({"error": "No friends selected"}), 400
 
-        # Fetch friends list to get names and balances
-        headers = {"Authorization": f"Bearer {api_key}"}
-        response = requests.get(
-            "https://secure.splitwise.com/api/v3.0/get_friends",
-            headers=headers,
-            timeout=30
-        )
-
-        if response.status_code != 200:
+        # Use the stored friends list when it confirms what the client showed; otherwise look names and balances up on
+        # Splitwise (fresh, since the pockets are funded from it)
+        friend_info = stored_splitwise_friend_info(client_friends) if client_friends else None
+        friends = [] if friend_info is not None else fetch_splitwise_friends(api_key, max_age=0)
+        if friends is None:
             return jsonify({"error": "Failed to fetch Splitwise friends"}), 500
 
         # Build map of selected friends with their names and balances
-        friend_info = {}  # friend_id -> {name, balance}
-        friends_data = response.json()
+        if friend_info is None:
+            friend_info = {}  # friend_id -> {name, balance}
 
-        for friend in friends_data.get("friends", []):
+        for friend in friends:
             friend_id = friend.get("id")
 
             # Only process selected friends
@@ -7388,7 +7836,7 @@ def api_splitwise_create_pockets():
             friend_name = f"{first_name} {last_name}".strip() or f"User {friend_id}"
 
             # Create pocket for selected friend with current balance (negative = user owes, positive = friend owes user)
-            initial_amount = abs(balance) if balance < 0 else 0  # Only move money when user owes (balance < 0)
+            initial_amount = max(0.0, -balance)  # Only move money when user owes (balance < 0)
 
             print(f"🔍 {friend_name}: raw_balance={balance}, is_positive={balance > 0}, initial_amount={initial_amount}", flush=True)
 
@@ -7400,9 +7848,8 @@ def api_splitwise_create_pockets():
         if not friend_info:
             return jsonify({"error": "No friends selected"}), 400
 
-        # Create a pocket for each selected friend
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
+        # Create a pocket for each selected friend; rows are saved together once every pocket exists
+        pocket_rows = []
         created_pockets = []
 
         for friend_id, info in friend_info.items():
@@ -7420,27 +7867,26 @@ def api_splitwise_create_pockets():
             if pocket_data.get("error"):
                 error_msg = pocket_data.get("error")
                 print(f"❌ Failed to create pocket for {friend_name}: {error_msg}", flush=True)
-                conn.close()
                 return jsonify({"error": f"Failed to create pocket for {friend_name}: {error_msg}"}), 500
 
             result = pocket_data.get("result", {})
             pocket_id = result.get("id")
 
             if not pocket_id:
-                conn.close()
                 return jsonify({"error": f"Failed to get pocket ID for {friend_name}"}), 500
 
-            # Save to database
-            c.execute("""INSERT OR REPLACE INTO splitwise_pocket_config
-                        (friend_id, friend_name, pocket_id)
-                        VALUES (?, ?, ?)""",
-                      (friend_id, friend_name, pocket_id))
+            pocket_rows.append((friend_id, friend_name, pocket_id))
 
             created_pockets.append({"friendId": friend_id, "name": friend_name, "pocketId": pocket_id})
             print(f"✨ Created pocket for {friend_name}: ${initial_amount:.2f}", flush=True)
 
-        conn.commit()
-        conn.close()
+        # Save to database (one write transaction for every pocket row)
+        with db_pool.acquire() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("""INSERT OR REPLACE INTO splitwise_pocket_config
+                                (friend_id, friend_name, pocket_id)
+                                VALUES (?, ?, ?)""", pocket_rows)
+            conn.commit()
         cache.clear()
 
         return jsonify({
@@ -7453,84 +7899,76 @@ def api_splitwise_create_pockets():
         print(f"❌ Error creating pockets: {e}", flush=True)
         return jsonify({"error": str(e)}), 500
 
+# Friend pockets (as a JSON array, ordered by name), last sync and expense count in one statement
+SPLITWISE_STATUS_SQL = """SELECT
+    (SELECT json_group_array(json_object('friendId', friend_id, 'friendName', friend_name, 'pocketId', pocket_id))
+     FROM (SELECT friend_id, friend_name, pocket_id FROM splitwise_pocket_config ORDER BY friend_name)),
+    (SELECT last_sync FROM splitwise_config LIMIT 1),
+    (SELECT COUNT(*) FROM splitwise_expenses)"""
+
 @app.route('/api/splitwise/status')
 @login_required
 def api_splitwise_status():
     """Get Splitwise integration status"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-
-    # Get all friend pockets
-    c.execute("SELECT friend_id, friend_name, pocket_id FROM splitwise_pocket_config ORDER BY friend_name")
-    pocket_rows = c.fetchall()
-
-    c.execute("SELECT last_sync FROM splitwise_config LIMIT 1")
-    config_row = c.fetchone()
-
-    c.execute("SELECT COUNT(*) FROM splitwise_expenses")
-    expense_row = c.fetchone()
-    expense_count = expense_row[0] if expense_row else 0
-
-    conn.close()
+    with db_read_pool.acquire() as conn:
+        pockets_json, last_sync, expense_count = conn.execute(SPLITWISE_STATUS_SQL).fetchone()
 
-    pockets = [
-        {"friendId": row[0], "friendName": row[1], "pocketId": row[2]}
-        for row in pocket_rows
-    ]
+    pockets = decode_json(pockets_json)
 
     return jsonify({
         "configured": bool(get_splitwise_api_key()),
         "pocketsCreated": len(pockets) > 0,
         "pockets": pockets,
-        "lastSync": config_row[0] if config_row else None,
+        "lastSync": last_sync,
         "totalExpenses": expense_count
     })
 
 @app.route('/api/splitwise/friend-balances')
 @login_required
 def api_splitwise_friend_balances():
-    """Get tracked friend balances from Splitwise API"""
+    """Get tracked friend balances (stored balances when known, refreshed from Splitwise in the background)"""
     try:
         api_key = get_splitwise_api_key()
 
         if not api_key:
             return jsonify({"error": "Splitwise not configured"}), 400
 
-        # Fetch friends list with current balances
-        headers = {"Authorization": f"Bearer {api_key}"}
-        response = requests.get(
-            "https://secure.splitwise.com/api/v3.0/get_friends",
-            headers=headers,
-            timeout=30
-        )
+        # Get tracked friends and the balances stored by the last sync/refresh from database
+        with db_read_pool.acquire() as conn:
+            tracked_rows = conn.execute("SELECT friend_id, friend_name, pocket_id, last_known_balance FROM splitwise_pocket_config").fetchall()
 
-        if response.status_code != 200:
+        if tracked_rows and all(row[3] is not None for row in tracked_rows):
+            # Answer from SQLite and let the next poll see whatever the refresh picks up
+            schedule_splitwise_friend_refresh(api_key)
+            balances = [{"friendId": friend_id, "friendName": friend_name, "balance": round(balance, 2), "pocketId": pocket_id}
+                        for friend_id, friend_name, pocket_id, balance in tracked_rows]
+            balances.sort(key=lambda x: x["balance"], reverse=True)
+            return jsonify({"balances": balances})
+
+        # Fetch friends list with current balances
+        friends = fetch_splitwise_friends(api_key)
+        if friends is None:
             return jsonify({"error": "Failed to fetch friends"}), 500
+        save_splitwise_friend_balances(friends, api_key)
 
-        # Get tracked friend list from database
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("SELECT friend_id, pocket_id FROM splitwise_pocket_config")
-        tracked_friends = {row[0]: row[1] for row in c.fetchall()}
-        conn.close()
+        tracked_friends = {row[0]: row[2] for row in tracked_rows}
 
         # Build response with tracked friends and their balances
         balances = []
-        friends_data = response.json()
 
-        for friend in friends_data.get("friends", []):
+        remaining = set(tracked_friends)
+        for friend in friends:
+            if not remaining:
+                break  # Every tracked friend has been seen
             friend_id = friend.get("id")
 
             # Only include tracked friends
-            if friend_id not in tracked_friends:
+            if friend_id not in remaining:
                 continue
+            remaining.discard(friend_id)
 
-            # Get friend's balance (positive = user owes in Splitwise API)
-            balance_list = friend.get("balance", [])
-            if isinstance(balance_list, list) and len(balance_list) > 0:
-                balance = float(balance_list[0].get("amount", "0"))
-            else:
-                balance = float(balance_list) if balance_list else 0.0
+            # Get friend's balance (positive = they owe you in Splitwise API)
+            balance = splitwise_friend_balance(friend)
 
             first_name = friend.get("first_name", "")
             last_name = friend.get("last_name", "")
@@ -7562,28 +8000,21 @@ def api_splitwise_sync_now():
         if not api_key:
             return jsonify({"error": "Splitwise not configured"}), 400
 
-        # Fetch friends list with current balances
-        headers = {"Authorization": f"Bearer {api_key}"}
-        response = requests.get(
-            "https://secure.splitwise.com/api/v3.0/get_friends",
-            headers=headers,
-            timeout=30
-        )
-
-        if response.status_code != 200:
+        # Fetch friends list with current balances (fresh, since pocket transfers are based on it)
+        friends = fetch_splitwise_friends(api_key, max_age=0)
+        if friends is None:
             return jsonify({"error": "Failed to fetch Splitwise friends"}), 500
+        save_splitwise_friend_balances(friends, api_key)
 
         # Get tracked friends with their pocket IDs
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("SELECT friend_id, friend_name, pocket_id FROM splitwise_pocket_config")
-        tracked_friends = {row[0]: {"name": row[1], "pocket_id": row[2]} for row in c.fetchall()}
+        with db_pool.acquire() as conn:
+            tracked_friends = {row[0]: {"name": row[1], "pocket_id": row[2]}
+                               for row in conn.execute("SELECT friend_id, friend_name, pocket_id FROM splitwise_pocket_config")}
 
-        # Update sync timestamp (use subquery to get the actual row id)
-        c.execute("UPDATE splitwise_config SET last_sync = ? WHERE id = (SELECT MIN(id) FROM splitwise_config)",
-                  (datetime.now().isoformat(),))
-        conn.commit()
-        conn.close()
+            # Update sync timestamp (use subquery to get the actual row id)
+            conn.execute("UPDATE splitwise_config SET last_sync = ? WHERE id = (SELECT MIN(id) FROM splitwise_config)",
+                         (datetime.now().isoformat(),))
+            conn.commit()
 
         if not tracked_friends:
             return jsonify({"success": True, "synced": 0, "message": "No tracked friends"})
@@ -7596,65 +8027,24 @@ def api_splitwise_sync_now():
             return jsonify({"error": "Crew credentials not configured"}), 400
 
         synced_count = 0
-        friends_data = response.json()
-
-        for friend in friends_data.get("friends", []):
-            friend_id = friend.get("id")
-
-            # Only sync tracked friends
-            if friend_id not in tracked_friends:
-                continue
-
-            tracked = tracked_friends[friend_id]
-            pocket_id = tracked["pocket_id"]
-            friend_name = tracked["name"]
-
-            # Get friend's balance from Splitwise
-            # Negative balance = user owes money (we need to save for this)
-            # Positive balance = friend owes user (they owe you)
-            balance_list = friend.get("balance", [])
-            if isinstance(balance_list, list) and len(balance_list) > 0:
-                splitwise_balance = float(balance_list[0].get("amount", "0"))
-            else:
-                splitwise_balance = float(balance_list) if balance_list else 0.0
-
-            # Amount user owes (negative in Splitwise = user owes)
-            amount_owed = abs(splitwise_balance) if splitwise_balance < 0 else 0
-
-            # Get current pocket balance from Crew
-            query_string = """query GetSubaccount($id: ID!) { node(id: $id) { ... on Subaccount { id overallBalance } } }"""
-            pocket_response = requests.post(URL, headers=crew_headers, json={
-                "operationName": "GetSubaccount",
-                "variables": {"id": pocket_id},
-                "query": query_string
-            })
-            pocket_data = pocket_response.json()
-            current_balance_cents = pocket_data.get("data", {}).get("node", {}).get("overallBalance", 0)
-            current_balance = current_balance_cents / 100.0
-
-            # Calculate difference
-            difference = amount_owed - current_balance
 
-            if abs(difference) < 0.01:
+        plans = plan_splitwise_transfers(friends, tracked_friends, crew_headers)
+        for friend_name, _, amount_owed, current_balance in plans:
+            if current_balance is not None and abs(amount_owed - current_balance) < 0.01:
                 print(f"✅ {friend_name}: Already synced (${current_balance:.2f})", flush=True)
-                continue
 
+        for friend_name, difference, amount_owed, result in apply_splitwise_transfers(plans, checking_id):
             if difference > 0:
-                # Need to add money to pocket (user owes more than pocket has)
-                result = move_money(checking_id, pocket_id, difference, f"Splitwise sync: {friend_name}")
                 if result.get("error"):
                     print(f"❌ Failed to add ${difference:.2f} to {friend_name}'s pocket: {result['error']}", flush=True)
                 else:
                     print(f"➕ Added ${difference:.2f} to {friend_name}'s pocket (now ${amount_owed:.2f})", flush=True)
                     synced_count += 1
             else:
-                # Need to remove money from pocket (user owes less than pocket has)
-                amount_to_remove = abs(difference)
-                result = move_money(pocket_id, checking_id, amount_to_remove, f"Splitwise sync: {friend_name}")
                 if result.get("error"):
-                    print(f"❌ Failed to remove ${amount_to_remove:.2f} from {friend_name}'s pocket: {result['error']}", flush=True)
+                    print(f"❌ Failed to remove ${abs(difference):.2f} from {friend_name}'s pocket: {result['error']}", flush=True)
                 else:
-                    print(f"➖ Removed ${amount_to_remove:.2f} from {friend_name}'s pocket (now ${amount_owed:.2f})", flush=True)
+                    print(f"➖ Removed ${abs(difference):.2f} from {friend_name}'s pocket (now ${amount_owed:.2f})", flush=True)
                     synced_count += 1
 
         cache.clear()
@@ -7664,47 +8054,78 @@ def api_splitwise_sync_now():
         print(f"❌ Error syncing Splitwise: {e}", flush=True)
         return jsonify({"error": str(e)}), 500
 
+def release_splitwise_pocket(friend_name, pocket_id, balance, checking_id, headers):
+    """Return a friend pocket's balance to Checking (balance looked up if None; errors are logged, not raised)"""
+    try:
+        if balance is None:
+            balance = read_pocket_balance(pocket_id, headers)
+        if balance is None:
+            print(f"⚠️ Could not read {friend_name} pocket balance; its funds were not returned", flush=True)
+        elif balance > 0.01:
+            move_money(pocket_id, checking_id, str(balance), f"Splitwise: {friend_name} disconnected")
+            print(f"✅ Returned ${balance:.2f} from {friend_name} pocket", flush=True)
+    except Exception as e:
+        print(f"⚠️ Error returning {friend_name} pocket balance: {e}", flush=True)
+
 @app.route('/api/splitwise/disconnect', methods=['POST'])
 @login_required
 def api_splitwise_disconnect():
     """Disconnect Splitwise integration and delete all friend pockets"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-
         # Get all friend pockets
-        c.execute("SELECT friend_name, pocket_id FROM splitwise_pocket_config")
-        pocket_rows = c.fetchall()
+        with db_read_pool.acquire() as conn:
+            pocket_rows = conn.execute("SELECT friend_name, pocket_id FROM splitwise_pocket_config").fetchall()
 
         checking_id = get_primary_account_id()
         headers = get_crew_headers()
 
-        # Try to return money from each pocket to Checking
-        for friend_name, pocket_id in pocket_rows:
-            if checking_id and pocket_id and headers:
+        # Try to return money from each pocket to Checking; pockets are independent, so release them concurrently
+        if checking_id and headers:
+            # Read every pocket's balance in one request
+            try:
+                pocket_balances = fetch_pocket_balances([pocket_id for _, pocket_id in pocket_rows if pocket_id], headers)
+            except Exception as e:
+                print(f"⚠️ Batched Splitwise pocket balance lookup failed, falling back to one request per pocket: {e}", flush=True)
+                pocket_balances = {}
+
+            # Pockets with a known balance go back to Checking in one aliased mutation
+            batch = [(friend_name, pocket_id, pocket_balances[pocket_id]) for friend_name, pocket_id in pocket_rows
+                     if pocket_id and pocket_balances.get(pocket_id) is not None and pocket_balances[pocket_id] > 0.01]
+            results = None
+            if batch:
                 try:
-                    query_string = """query GetSubaccount($id: ID!) { node(id: $id) { ... on Subaccount { id overallBalance } } }"""
-                    response = requests.post(URL, headers=headers, json={
-                        "operationName": "GetSubaccount",
-                        "variables": {"id": pocket_id},
-                        "query": query_string
-                    })
-
-                    if response.status_code == 200:
-                        data = response.json()
-                        balance = data.get("data", {}).get("node", {}).get("overallBalance", 0) / 100.0
-                        if balance > 0.01:
-                            move_money(pocket_id, checking_id, str(balance), f"Splitwise: {friend_name} disconnected")
-                            print(f"✅ Returned ${balance:.2f} from {friend_name} pocket", flush=True)
+                    results = move_money_batch([(pocket_id, checking_id, str(balance), f"Splitwise: {friend_name} disconnected")
+                                                for friend_name, pocket_id, balance in batch], headers)
                 except Exception as e:
-                    print(f"⚠️ Error returning {friend_name} pocket balance: {e}", flush=True)
-
-        # Clear all Splitwise data
-        c.execute("DELETE FROM splitwise_config")
-        c.execute("DELETE FROM splitwise_pocket_config")
-        c.execute("DELETE FROM splitwise_expenses")
-        conn.commit()
-        conn.close()
+                    print(f"⚠️ Error returning Splitwise pocket balances: {e}", flush=True)
+                    results = [{"error": str(e)}] * len(batch)
+            if results is not None:
+                for (friend_name, _, balance), result in zip(batch, results):
+                    if "error" in result:
+                        print(f"⚠️ Error returning {friend_name} pocket balance: {result['error']}", flush=True)
+                    else:
+                        print(f"✅ Returned ${balance:.2f} from {friend_name} pocket", flush=True)
+                handled = {pocket_id for _, pocket_id, _ in batch}
+            else:
+                handled = set()
+
+            # Anything left (balance unknown, or the batched mutation was rejected) is released one pocket at a time, concurrently
+            futures = [crew_io_executor.submit(release_splitwise_pocket, friend_name, pocket_id, pocket_balances.get(pocket_id),
+                                               checking_id, headers)
+                       for friend_name, pocket_id in pocket_rows
+                       if pocket_id and pocket_id not in handled
+                       and (pocket_balances.get(pocket_id) is None or pocket_balances[pocket_id] > 0.01)]
+            for future in futures:
+                future.result()
+
+        # Clear all Splitwise data (the connection is only held for the deletes, not the Crew round trips above)
+        with db_pool.acquire() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM splitwise_config")
+            conn.execute("DELETE FROM splitwise_pocket_config")
+            conn.execute("DELETE FROM splitwise_expenses")
+            conn.execute("DELETE FROM splitwise_friends_cache")
+            conn.commit()
 
         cache.clear()
         print(f"✅ Splitwise disconnected - deleted {len(pocket_rows)} pockets", flush=True)
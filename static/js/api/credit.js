@@ -1394,9 +1394,13 @@ function syncNow() {
 
     fetch('/api/simplefin/sync-now', {
         method: 'POST',
-        headers: {'Content-Type': 'application/json'}
+        headers: {'Content-Type': 'application/json', 'Accept': 'application/x-ndjson'}
+    })
+    .then(res => {
+        const contentType = res.headers.get('Content-Type') || '';
+        if (!contentType.includes('application/x-ndjson') || !res.body) return res.json();
+        return readSyncProgress(res, btn);
     })
-    .then(res => res.json())
     .then(data => {
         if (data.success) {
             appAlert(`✅ ${data.message}`, 'Success');
@@ -1417,6 +1421,47 @@ function syncNow() {
     });
 }
 
+/**
+ * Read the sync-now NDJSON stream, showing per-account progress on the button; resolves to the summary line
+ */
+async function readSyncProgress(res, btn) {
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = '';
+    let total = 0;
+    let finished = 0;
+    let failed = 0;
+    let summary = null;
+
+    const handleLine = (line) => {
+        if (!line.trim()) return;
+        const event = JSON.parse(line);
+        if (event.total !== undefined) {
+            total = event.total;
+        } else if (event.account !== undefined) {
+            finished++;
+            if (event.status === 'error') failed++;
+            btn.textContent = failed
+                ? `⏳ Syncing... ${finished}/${total} (${failed} failed)`
+                : `⏳ Syncing... ${finished}/${total}`;
+        } else {
+            summary = event;
+        }
+    };
+
+    while (true) {
+        const {value, done} = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, {stream: true});
+        const lines = buffered.split('\n');
+        buffered = lines.pop();
+        lines.forEach(handleLine);
+    }
+    handleLine(buffered);
+
+    return summary || {error: 'Sync ended without a result'};
+}
+
 /**
  * Create a manual credit card account (no sync provider)
  */
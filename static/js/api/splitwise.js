@@ -123,6 +123,8 @@ function showCreditorSelection() {
                 const input = document.createElement('input');
                 input.type = 'checkbox';
                 input.value = friend.friendId;
+                input.dataset.friendName = friend.friendName;
+                input.dataset.amountOwed = friend.amountOwed;
                 input.style.marginRight = '12px';
                 input.style.cursor = 'pointer';
 
@@ -159,7 +161,13 @@ function showCreditorSelection() {
  */
 function createSelectedCreditorPockets() {
     const checkboxes = document.querySelectorAll('#splitwise-creditor-select input[type="checkbox"]:checked');
-    const selectedFriendIds = Array.from(checkboxes).map(cb => parseInt(cb.value));
+    // Send names and amounts as shown so the server can skip re-reading Splitwise when they still match
+    const selectedFriends = Array.from(checkboxes).map(cb => ({
+        friendId: parseInt(cb.value),
+        friendName: cb.dataset.friendName,
+        amountOwed: parseFloat(cb.dataset.amountOwed)
+    }));
+    const selectedFriendIds = selectedFriends.map(friend => friend.friendId);
 
     if (selectedFriendIds.length === 0) {
         appAlert('Please select at least one person');
@@ -171,7 +179,7 @@ function createSelectedCreditorPockets() {
     fetch('/api/splitwise/create-pockets', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({friendIds: selectedFriendIds})
+        body: JSON.stringify({friends: selectedFriends})
     })
     .then(res => res.json())
     .then(data => {